@@ -0,0 +1,226 @@
+import argparse
+import io
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    import resource  # POSIX only; the per-worker memory cap is skipped on Windows
+except ImportError:
+    resource = None
+
+from content_spec import SLIDE_SIZE_NAMES, iter_specs, output_name
+from slide_templates import render_spec_stamped
+from build_cache import SlideCache, build_incremental
+import images
+from part_store import PartStore
+import profiling
+from profiling import stage
+from stream_writer import stream_spec
+
+# --- Configuration ---
+DEFAULT_WORKERS = os.cpu_count() or 1
+DEFAULT_MAX_MEMORY_MB = 1024   # Address-space cap per worker process
+DEFAULT_TASKS_PER_WORKER = 50  # Recycle workers so python-pptx garbage never piles up
+IN_FLIGHT_PER_WORKER = 4       # Specs queued ahead per worker; bounds parent memory on huge feeds
+
+# --- Worker side ---
+def _init_worker(max_memory_mb, image_dpi, image_cache, image_workers):
+    if resource is not None and max_memory_mb:
+        limit = max_memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    images.configure(image_dpi, image_cache, image_workers)
+
+def _render_task(name, spec, output_path, cache_dir=None, stream=False, store_dir=None, profile=None):
+    """
+    Runs in a worker: never raises, so one bad deck cannot stop the batch.
+    profile: None, or {"memory": bool} to return the deck's profiling data under "profile".
+    """
+    start = time.perf_counter()
+    result = {"spec": name, "output": output_path, "slides": 0, "ok": False, "error": None}
+    if profile is not None:
+        profiling.enable(**profile)
+    try:
+        with stage("deck", cat="deck", deck=os.path.basename(output_path), slides=len(spec["slides"])):
+            _render(result, spec, output_path, cache_dir, stream, store_dir)
+        result["slides"] = len(spec["slides"])
+        result["ok"] = True
+    except MemoryError:
+        result["error"] = "MemoryError: worker memory cap exceeded"
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        if profile is not None:
+            result["profile"] = profiling.disable().export()
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+def _render(result, spec, output_path, cache_dir, stream, store_dir):
+    """Renders one deck the way run_batch was asked to; fills in mode-specific result fields"""
+    if cache_dir:
+        result["rendered"], result["reused"] = build_incremental(spec, output_path, SlideCache(cache_dir))
+    elif store_dir:
+        # The deck only exists as parts in the store; see part_store.py
+        buf = io.BytesIO()
+        if stream:
+            stream_spec(spec, buf)
+        else:
+            prs = render_spec_stamped(spec)
+            with stage("save"):
+                prs.save(buf)
+        deck_name = os.path.basename(output_path)
+        result["output"] = f"{store_dir}:{deck_name}"
+        with stage("store"):
+            result["bytes_added"] = PartStore(store_dir).add_deck(deck_name, buf)["bytes_added"]
+    elif stream:
+        stream_spec(spec, output_path)
+    else:
+        prs = render_spec_stamped(spec)
+        with stage("save"):
+            prs.save(output_path)
+
+def _failed(name, error):
+    return {"spec": name, "output": None, "slides": 0, "ok": False, "error": error, "seconds": 0.0}
+
+def _output_path(output_dir, name):
+    """
+    (output_dir/name, its normalized absolute form) for one deck;
+    ValueError when name is absolute or resolves outside output_dir
+    """
+    root = os.path.normcase(os.path.abspath(output_dir))
+    resolved = os.path.normcase(os.path.abspath(os.path.join(root, name)))
+    if os.path.isabs(name) or os.path.splitdrive(name)[0] or resolved == root or \
+            os.path.commonpath([root, resolved]) != root:
+        raise ValueError(f"output {name!r} is not a path inside the output directory")
+    return os.path.join(output_dir, name), resolved
+
+def _done(value):
+    """Already-resolved future, so spec load errors keep their place in the result order"""
+    future = Future()
+    future.set_result(value)
+    return future
+
+# --- Driver ---
+def run_batch(decks, output_dir, workers=DEFAULT_WORKERS, max_memory_mb=DEFAULT_MAX_MEMORY_MB,
+              tasks_per_worker=DEFAULT_TASKS_PER_WORKER, cache_dir=None, stream=False, slide_size=None,
+              store_dir=None, profile=None, image_dpi=images.IMAGE_DPI, image_cache=None):
+    """
+    Renders an iterable of content_spec.DeckSpec entries across a process pool.
+    Specs are pulled lazily with a bounded number in flight, and results come back
+    in input order whatever order the workers finish in.
+    With cache_dir set, decks are rebuilt incrementally (see build_cache.py); with stream
+    set, slides are flushed to disk as they are rendered (see stream_writer.py).
+    slide_size overrides every spec's canvas ("16:9" / "4:3"); each worker solves a
+    layout once per canvas (see box_layout.py) and reuses it for all its decks.
+    With store_dir set, decks go into that part store instead of output_dir, so parts
+    shared across decks are kept once (see part_store.py).
+    With profile set ({"memory": bool}), each result carries its deck's profiling data
+    under "profile" (see profiling.py).
+    Project images are downscaled to image_dpi; with image_cache set, prepared images
+    are shared by all workers through that directory (see images.py).
+    """
+    if store_dir:
+        PartStore(store_dir)
+    else:
+        os.makedirs(output_dir, exist_ok=True)
+    results = []
+    pending = deque()
+    claimed = {}  # Output (path, or deck name in a store) -> spec name, so no two decks share one
+
+    def collect_oldest():
+        name, future = pending.popleft()
+        try:
+            results.append(future.result())
+        except BrokenProcessPool as e:
+            # A worker was killed outright (e.g. by the OS); report the deck instead of aborting
+            results.append(_failed(name, f"BrokenProcessPool: {e}"))
+
+    # Each worker prepares a deck's images on its own threads; keep the total near the core count
+    image_workers = max(1, (os.cpu_count() or 1) // workers)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(max_memory_mb, image_dpi, image_cache, image_workers),
+                             max_tasks_per_child=tasks_per_worker) as pool:
+        for deck in decks:
+            if not deck.error:
+                try:
+                    output_path, resolved = _output_path(output_dir, output_name(deck))
+                    key = os.path.basename(resolved) if store_dir else resolved
+                    if key in claimed:
+                        # Concurrent workers would overwrite each other's deck and all report ok
+                        raise ValueError(f"output {output_name(deck)!r} is already written by {claimed[key]}")
+                    claimed[key] = deck.name
+                except ValueError as e:
+                    deck = deck._replace(error=f"{type(e).__name__}: {e}")
+            if deck.error:
+                pending.append((deck.name, _done(_failed(deck.name, deck.error))))
+            else:
+                spec = dict(deck.spec, slide_size=slide_size) if slide_size else deck.spec
+                pending.append((deck.name, pool.submit(_render_task, deck.name, spec, output_path,
+                                                          cache_dir, stream, store_dir, profile)))
+            if len(pending) >= workers * IN_FLIGHT_PER_WORKER:
+                collect_oldest()
+        while pending:
+            collect_oldest()
+    return results
+
+def print_report(results, elapsed):
+    failed = [r for r in results if not r["ok"]]
+    for r in failed:
+        print(f"  FAILED {r['spec']}: {r['error']}")
+    print(f"Rendered {len(results) - len(failed)}/{len(results)} decks in {elapsed:.1f}s "
+          f"({len(failed)} failed)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render many styled decks from content specs.")
+    parser.add_argument("source", help="Spec directory, *.jsonl feed, single spec or manifest file")
+    parser.add_argument("-o", "--output-dir", default=os.path.join(os.getcwd(), "output"))
+    parser.add_argument("-j", "--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--max-memory-mb", type=int, default=DEFAULT_MAX_MEMORY_MB,
+                        help="Per-worker memory cap, 0 to disable (POSIX only)")
+    parser.add_argument("--tasks-per-worker", type=int, default=DEFAULT_TASKS_PER_WORKER)
+    parser.add_argument("--cache-dir", help="Reuse unchanged slides from this build cache")
+    parser.add_argument("--stream", action="store_true",
+                        help="Flush slides to disk as they are rendered (flat memory for huge decks)")
+    parser.add_argument("--slide-size", choices=SLIDE_SIZE_NAMES,
+                        help="Render every deck on this canvas instead of the spec's own")
+    parser.add_argument("--store", help="Write decks into this part store instead of .pptx files "
+                                        "(see part_store.py)")
+    parser.add_argument("--image-dpi", type=int, default=images.IMAGE_DPI,
+                        help="Downscale project images to this many pixels per inch of their box")
+    parser.add_argument("--image-cache", help="Share prepared images across workers and runs in this directory")
+    parser.add_argument("--profile", metavar="TRACE",
+                        help="Profile every deck; write a Chrome trace-event JSON here and print a summary")
+    parser.add_argument("--profile-no-memory", action="store_true",
+                        help="With --profile, skip tracemalloc allocation tracking (timings only)")
+    parser.add_argument("--report", help="Write per-deck results as JSON to this path")
+    args = parser.parse_args(argv)
+    if args.store and args.cache_dir:
+        parser.error("--store and --cache-dir cannot be combined")
+
+    start = time.perf_counter()
+    results = run_batch(iter_specs(args.source), args.output_dir, args.workers, args.max_memory_mb,
+                        args.tasks_per_worker, args.cache_dir, args.stream, args.slide_size, args.store,
+                        {"memory": not args.profile_no_memory} if args.profile else None,
+                        args.image_dpi, args.image_cache)
+    print_report(results, time.perf_counter() - start)
+
+    if args.profile:
+        tracer = profiling.Tracer(memory=not args.profile_no_memory)
+        for r in results:
+            if "profile" in r:
+                tracer.merge(r.pop("profile"))
+        print(tracer.format_summary())
+        tracer.write_trace(args.profile)
+        print(f"Trace written to {args.profile}")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0 if all(r["ok"] for r in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,403 @@
+"""
+Benchmarks for deck generation, extraction and patching.
+
+Every case runs on synthetic content (see synthetic_spec / synthetic_docx) scaled by
+slide count and text length, so results are comparable across machines and versions:
+
+    builder       create_styled_slide / create_problems_slide / create_plan_slide, slides/sec
+    deck_build    generate_ppt_styled.main() in a fresh process, seconds and peak RSS
+    extract_pptx  extract_info.extract_pptx_info(), seconds per file
+    extract_docx  extract_info.extract_docx_info(), seconds per file
+    extract_pptx_cached / extract_docx_cached   the same with a warm parse_cache.ParseCache
+    patch         fix_ppt_final.process_ppt(), seconds per deck
+    rebuild_noop  build_cache.build_incremental() on an unchanged spec, seconds
+    rebuild_image the same after an image the spec names is overwritten in place; fails if
+                  the rebuilt deck still carries the old image
+
+Results are written as JSON ({"meta": ..., "results": [...]}); --compare flags cases that
+got slower than a previous run by more than --threshold and exits 1 if any did.
+
+    python benchmark.py -o bench.json
+    python benchmark.py --quick --compare bench.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+
+try:
+    import resource  # POSIX only; peak RSS is reported as null on Windows
+except ImportError:
+    resource = None
+
+import pptx
+from lxml import etree
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# --- Configuration ---
+DEFAULT_SLIDE_COUNTS = (10, 50, 200)
+DEFAULT_TEXT_LENGTHS = (20, 80)   # Characters per bullet
+QUICK_SLIDE_COUNTS = (10,)
+QUICK_TEXT_LENGTHS = (20,)
+DEFAULT_REPEAT = 3                # Best of N; deck_build runs once per size (it is its own process)
+DEFAULT_THRESHOLD = 0.10          # --compare: relative slowdown that counts as a regression
+
+# Titles fix_ppt_final.process_ppt looks for
+PATCH_TITLES = ("交接中心", "桌面布局")
+
+# --- Synthetic content ---
+_WORDS = ["平台", "效能", "自动化", "日志", "协作", "版本", "迭代", "合规", "校验", "交付",
+          "AI", "LLM", "性能", "稳定性", "体验", "数据", "流程", "覆盖率", "成本", "质量"]
+
+def _text(rng, length):
+    words = []
+    while sum(map(len, words)) < length:
+        words.append(rng.choice(_WORDS))
+    return "".join(words)[:length]
+
+def _project(rng, title, text_len):
+    return {
+        "type": "project",
+        "title": title,
+        "work_content": [f"{_text(rng, 6)}：{_text(rng, text_len)}" for _ in range(3)],
+        "work_insights": [f"{_text(rng, 4)}：{_text(rng, text_len)}" for _ in range(2)],
+        "key_metrics": [f"{_text(rng, 6)}：{rng.randint(10, 999)}人天" for _ in range(2)],
+    }
+
+def _problems(rng, title, text_len):
+    return {"type": "problems", "title": title, "problems": [
+        {key: _text(rng, text_len // 2 if key == "title" else text_len)
+         for key in ("title", "desc", "impact", "solution")} for _ in range(2)]}
+
+def _plan(rng, title, text_len):
+    return {"type": "plan", "title": title, "modules": [
+        {"title": _text(rng, 8), "items": [{"sub": _text(rng, 8), "detail": _text(rng, text_len)}
+                                           for _ in range(3)]} for _ in range(3)]}
+
+_KINDS = {"project": _project, "problems": _problems, "plan": _plan}
+
+def synthetic_spec(slides, text_len, kinds=("project", "problems", "plan"), seed=0):
+    """A valid content spec of `slides` slides cycling through kinds, bullets of text_len chars"""
+    rng = random.Random(seed)
+    titles = list(PATCH_TITLES)
+    spec_slides = []
+    for i in range(slides):
+        kind = kinds[i % len(kinds)]
+        title = titles.pop(0) if kind == "project" and titles else f"{_text(rng, 6)} {i + 1}"
+        spec_slides.append(_KINDS[kind](rng, title, text_len))
+    return {"version": 1, "slides": spec_slides}
+
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>')
+_DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="word/document.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+    '</Relationships>')
+
+def synthetic_docx(path, sections, text_len, seed=0):
+    """Writes a summary-like .docx: per section a heading, bullet paragraphs and a small table"""
+    rng = random.Random(seed)
+    w = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+    document = etree.Element(f"{{{w}}}document", nsmap={"w": w})
+    body = etree.SubElement(document, f"{{{w}}}body")
+
+    def paragraph(parent, text, style=None):
+        p = etree.SubElement(parent, f"{{{w}}}p")
+        if style:
+            p_pr = etree.SubElement(p, f"{{{w}}}pPr")
+            etree.SubElement(p_pr, f"{{{w}}}pStyle").set(f"{{{w}}}val", style)
+        etree.SubElement(etree.SubElement(p, f"{{{w}}}r"), f"{{{w}}}t").text = text
+
+    for i in range(sections):
+        paragraph(body, f"{i + 1}. {_text(rng, 8)}", "Heading1")
+        for _ in range(5):
+            paragraph(body, f"{_text(rng, 6)}：{_text(rng, text_len)}")
+        tbl = etree.SubElement(body, f"{{{w}}}tbl")
+        for _ in range(3):
+            tr = etree.SubElement(tbl, f"{{{w}}}tr")
+            for _ in range(3):
+                paragraph(etree.SubElement(tr, f"{{{w}}}tc"), _text(rng, 10))
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _DOCX_CONTENT_TYPES)
+        zf.writestr("_rels/.rels", _DOCX_RELS)
+        zf.writestr("word/document.xml", etree.tostring(document, xml_declaration=True,
+                                                        encoding="UTF-8", standalone=True))
+
+def _write_spec(path, spec):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(spec, f, ensure_ascii=False)
+
+# --- Measurement ---
+def _best_of(fn, repeat):
+    """Best wall time of repeat calls; fn's prints are swallowed"""
+    best = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KB on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def _result(case, params, value, unit, better, **extra):
+    return dict({"case": case, "params": params, "value": round(value, 6), "unit": unit,
+                 "better": better}, **extra)
+
+# --- Cases ---
+def bench_builders(slide_counts, text_lengths, repeat):
+    from generate_ppt_styled import (create_plan_slide, create_presentation, create_problems_slide,
+                                     create_styled_slide)
+
+    builders = {
+        "create_styled_slide": ("project", lambda prs, s: create_styled_slide(
+            prs, s["title"], s["work_content"], s["work_insights"], s["key_metrics"])),
+        "create_problems_slide": ("problems", lambda prs, s: create_problems_slide(
+            prs, s["title"], s["problems"])),
+        "create_plan_slide": ("plan", lambda prs, s: create_plan_slide(prs, s["title"], s["modules"])),
+    }
+    results = []
+    for name, (kind, build) in builders.items():
+        for slides in slide_counts:
+            for text_len in text_lengths:
+                spec_slides = synthetic_spec(slides, text_len, kinds=(kind,))["slides"]
+
+                def run():
+                    prs = create_presentation()
+                    for s in spec_slides:
+                        build(prs, s)
+
+                seconds = _best_of(run, repeat)
+                results.append(_result("builder", {"builder": name, "slides": slides, "text_len": text_len},
+                                       slides / seconds, "slides/s", "higher"))
+    return results
+
+def _deck_build_child(spec_path):
+    """Runs in a fresh interpreter so peak RSS belongs to this one deck build"""
+    import generate_ppt_styled
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        generate_ppt_styled.main(spec_path)
+        seconds = time.perf_counter() - start
+    print(json.dumps({"seconds": seconds, "peak_rss_mb": _peak_rss_mb()}))
+
+def bench_deck_build(slide_counts, text_lengths, work_dir):
+    results = []
+    for slides in slide_counts:
+        for text_len in text_lengths:
+            spec = synthetic_spec(slides, text_len)
+            spec["output"] = os.path.join(work_dir, f"deck_{slides}_{text_len}.pptx")
+            spec_path = os.path.join(work_dir, f"deck_{slides}_{text_len}.json")
+            _write_spec(spec_path, spec)
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), "--deck-build-child", spec_path],
+                                 cwd=BASE_DIR, check=True, capture_output=True, text=True).stdout
+            child = json.loads(out.strip().splitlines()[-1])
+            results.append(_result("deck_build", {"slides": slides, "text_len": text_len},
+                                   child["seconds"], "s", "lower", peak_rss_mb=child["peak_rss_mb"]))
+    return results
+
+def _synthetic_deck(work_dir, slides, text_len):
+    from slide_templates import render_spec_stamped
+
+    path = os.path.join(work_dir, f"input_{slides}_{text_len}.pptx")
+    if not os.path.exists(path):
+        render_spec_stamped(synthetic_spec(slides, text_len)).save(path)
+    return path
+
+def bench_extract(slide_counts, text_lengths, repeat, work_dir):
+    from extract_info import extract_docx_info, extract_pptx_info
+    from parse_cache import ParseCache
+
+    results = []
+    with ParseCache(os.path.join(work_dir, "parse_cache.sqlite")) as cache:
+        for slides in slide_counts:
+            for text_len in text_lengths:
+                deck = _synthetic_deck(work_dir, slides, text_len)
+                params = {"slides": slides, "text_len": text_len}
+                results.append(_result("extract_pptx", params,
+                                       _best_of(lambda: extract_pptx_info(deck), repeat), "s", "lower"))
+                # One extra run fills the cache; the best time is then a warm one
+                results.append(_result("extract_pptx_cached", params,
+                                       _best_of(lambda: extract_pptx_info(deck, cache), repeat + 1), "s", "lower"))
+                docx = os.path.join(work_dir, f"input_{slides}_{text_len}.docx")
+                synthetic_docx(docx, slides, text_len)
+                params = {"sections": slides, "text_len": text_len}
+                results.append(_result("extract_docx", params,
+                                       _best_of(lambda: extract_docx_info(docx), repeat), "s", "lower"))
+                results.append(_result("extract_docx_cached", params,
+                                       _best_of(lambda: extract_docx_info(docx, cache), repeat + 1), "s", "lower"))
+    return results
+
+def bench_patch(slide_counts, text_lengths, repeat, work_dir):
+    from fix_ppt_final import process_ppt
+
+    results = []
+    for slides in slide_counts:
+        for text_len in text_lengths:
+            # process_ppt writes <name>_Corrected.pptx next to its input
+            deck = os.path.join(work_dir, f"patch_{slides}_{text_len}.pptx")
+            shutil.copyfile(_synthetic_deck(work_dir, slides, text_len), deck)
+            results.append(_result("patch", {"slides": slides, "text_len": text_len},
+                                   _best_of(lambda: process_ppt(deck), repeat), "s", "lower"))
+    return results
+
+def _media(path):
+    with zipfile.ZipFile(path) as zf:
+        return {zf.read(name) for name in zf.namelist() if name.startswith("ppt/media/")}
+
+def bench_rebuild(slide_counts, text_lengths, repeat, work_dir):
+    from PIL import Image
+
+    from build_cache import SlideCache, build_incremental
+
+    results = []
+    image = os.path.join(work_dir, "shot.png")
+    for slides in slide_counts:
+        for text_len in text_lengths:
+            spec = synthetic_spec(slides, text_len)
+            spec["slides"][0]["image"] = image
+            output = os.path.join(work_dir, f"rebuild_{slides}_{text_len}.pptx")
+            cache = SlideCache(os.path.join(work_dir, "build_cache"))
+            Image.new("RGB", (320, 200), (200, 40, 40)).save(image)
+            build_incremental(spec, output, cache)
+            params = {"slides": slides, "text_len": text_len}
+            results.append(_result("rebuild_noop", params,
+                                   _best_of(lambda: build_incremental(spec, output, cache), repeat), "s", "lower"))
+
+            best = None
+            for i in range(repeat):
+                before = _media(output)
+                # Same path, new content (and size): only the image bytes tell the rebuild
+                Image.new("RGB", (320 + 16 * (i + 1), 200), (40, 40 + 40 * i % 200, 200)).save(image)
+                start = time.perf_counter()
+                rendered, _ = build_incremental(spec, output, cache)
+                elapsed = time.perf_counter() - start
+                if not rendered or _media(output) == before:
+                    raise RuntimeError(f"rebuild kept the old image in {output}")
+                best = elapsed if best is None else min(best, elapsed)
+            results.append(_result("rebuild_image", params, best, "s", "lower"))
+    return results
+
+CASES = ("builder", "deck_build", "extract", "patch", "rebuild")
+
+def run_benchmarks(cases=CASES, slide_counts=DEFAULT_SLIDE_COUNTS, text_lengths=DEFAULT_TEXT_LENGTHS,
+                   repeat=DEFAULT_REPEAT):
+    """Runs the selected cases; returns {"meta": ..., "results": [...]}"""
+    results = []
+    with tempfile.TemporaryDirectory(prefix="deck_bench_") as work_dir:
+        if "builder" in cases:
+            results += bench_builders(slide_counts, text_lengths, repeat)
+        if "deck_build" in cases:
+            results += bench_deck_build(slide_counts, text_lengths, work_dir)
+        if "extract" in cases:
+            results += bench_extract(slide_counts, text_lengths, repeat, work_dir)
+        if "patch" in cases:
+            results += bench_patch(slide_counts, text_lengths, repeat, work_dir)
+        if "rebuild" in cases:
+            results += bench_rebuild(slide_counts, text_lengths, repeat, work_dir)
+    return {"meta": _meta(repeat), "results": results}
+
+def _meta(repeat):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=BASE_DIR, capture_output=True,
+                                text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "git_commit": commit,
+            "python": platform.python_version(), "python_pptx": pptx.__version__,
+            "lxml": ".".join(map(str, etree.LXML_VERSION)), "platform": platform.platform(),
+            "cpu_count": os.cpu_count(), "repeat": repeat}
+
+# --- Reporting ---
+def _key(r):
+    return r["case"], json.dumps(r["params"], sort_keys=True)
+
+def compare(old, new, threshold=DEFAULT_THRESHOLD):
+    """(result, old value, relative slowdown) for every case slower than threshold"""
+    previous = {_key(r): r for r in old["results"]}
+    regressions = []
+    for r in new["results"]:
+        before = previous.get(_key(r))
+        if before is None or not before["value"] or not r["value"]:
+            continue
+        ratio = before["value"] / r["value"] if r["better"] == "higher" else r["value"] / before["value"]
+        if ratio - 1 > threshold:
+            regressions.append((r, before["value"], ratio - 1))
+    return regressions
+
+def print_results(report):
+    for r in report["results"]:
+        params = " ".join(f"{k}={v}" for k, v in r["params"].items())
+        rss = f"  peak {r['peak_rss_mb']} MB" if r.get("peak_rss_mb") is not None else ""
+        print(f"{r['case']:<19} {params:<52} {r['value']:>12.4f} {r['unit']}{rss}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark deck generation, extraction and patching.")
+    parser.add_argument("-o", "--output", default=os.path.join(os.getcwd(), "bench_results.json"),
+                        help="Write results as JSON to this path")
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument("--slides", type=int, nargs="+", help="Slide counts (default: %s)" %
+                        " ".join(map(str, DEFAULT_SLIDE_COUNTS)))
+    parser.add_argument("--text-len", type=int, nargs="+", help="Characters per bullet (default: %s)" %
+                        " ".join(map(str, DEFAULT_TEXT_LENGTHS)))
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--quick", action="store_true", help="Smallest sizes, one repeat (smoke test)")
+    parser.add_argument("--compare", help="Previous results JSON; exit 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative slowdown counted as a regression (default 0.10)")
+    parser.add_argument("--deck-build-child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.deck_build_child:
+        _deck_build_child(args.deck_build_child)
+        return 0
+
+    slide_counts = args.slides or (QUICK_SLIDE_COUNTS if args.quick else DEFAULT_SLIDE_COUNTS)
+    text_lengths = args.text_len or (QUICK_TEXT_LENGTHS if args.quick else DEFAULT_TEXT_LENGTHS)
+    repeat = 1 if args.quick else args.repeat
+    report = run_benchmarks(args.cases, slide_counts, text_lengths, repeat)
+    print_results(report)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            old = json.load(f)
+        regressions = compare(old, report, args.threshold)
+        for r, before, slowdown in regressions:
+            params = " ".join(f"{k}={v}" for k, v in r["params"].items())
+            print(f"  REGRESSION {r['case']} {params}: {before:.4f} -> {r['value']:.4f} {r['unit']} "
+                  f"({slowdown:+.0%})")
+        print(f"{len(regressions)} regressions against {args.compare} (threshold {args.threshold:.0%})")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
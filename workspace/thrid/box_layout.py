@@ -0,0 +1,174 @@
+"""
+Box layout for the slide archetypes.
+
+Each archetype is described as grids of column and row tracks on the design canvas
+(13.333 x 7.5 in). A track is fixed (margins, gaps, rows of text) or flex; flex tracks
+share whatever the fixed tracks leave, in proportion to their design size, so on the
+design canvas every box lands exactly where the builders always put it and on other
+canvases (4:3) the flexible columns narrow instead of running off the slide. Boxes name
+a span of tracks, optionally with their own height.
+
+    boxes = slide_layout("problems", prs.slide_width, prs.slide_height, 2)
+    left, top, width, height = boxes["impact_1"]
+
+Solved layouts are memoized per (archetype, slide size, key), where the key carries the
+item counts the archetype depends on, so identical layouts are solved once per process.
+"""
+from collections import namedtuple
+from functools import lru_cache
+
+from pptx.util import Inches
+
+DESIGN_WIDTH = Inches(13.333)
+DESIGN_HEIGHT = Inches(7.5)
+SLIDE_SIZES = {
+    "16:9": (DESIGN_WIDTH, DESIGN_HEIGHT),
+    "4:3": (Inches(10), Inches(7.5)),
+}
+
+Box = namedtuple("Box", ["left", "top", "width", "height"])
+
+# --- Engine ---
+# size: design size in EMU; flex tracks share the space left by the fixed ones
+Track = namedtuple("Track", ["size", "flex"])
+
+def fixed(inches):
+    return Track(Inches(inches), False)
+
+def flex(inches):
+    return Track(Inches(inches), True)
+
+# cols / rows: lists of Tracks; boxes: name -> (first col, last col, first row, last row[, height])
+Grid = namedtuple("Grid", ["cols", "rows", "boxes"])
+
+def solve_tracks(tracks, total, design_total):
+    """
+    Offsets (len(tracks) + 1 of them) of tracks laid end to end in total EMU. Whatever the
+    tracks leave of design_total becomes a trailing flex track, so flex tracks keep their
+    exact design sizes on the design canvas and scale together everywhere else.
+    """
+    rest = max(design_total - sum(t.size for t in tracks), 0)
+    flex_design = sum(t.size for t in tracks if t.flex) + rest
+    flex_space = max(total - sum(t.size for t in tracks if not t.flex), 0)
+
+    offsets, pos = [0], 0
+    for t in tracks:
+        if t.flex:
+            pos += t.size * flex_space // flex_design
+        else:
+            pos += t.size
+        offsets.append(pos)
+    return offsets
+
+def solve_grid(grid, width, height):
+    """{box name: Box} for one grid on a width x height slide"""
+    xs = solve_tracks(grid.cols, width, DESIGN_WIDTH)
+    ys = solve_tracks(grid.rows, height, DESIGN_HEIGHT)
+    boxes = {}
+    for name, span in grid.boxes.items():
+        c0, c1, r0, r1 = span[:4]
+        box_height = span[4] if len(span) > 4 else ys[r1 + 1] - ys[r0]
+        boxes[name] = Box(xs[c0], ys[r0], xs[c1 + 1] - xs[c0], box_height)
+    return boxes
+
+# --- Slide archetypes: key -> list of Grids ---
+def _title_bar():
+    cols = [fixed(0.5), flex(10), flex(2.33)]
+    rows = [fixed(0.4), fixed(0.8), fixed(0.1), fixed(0.02)]
+    return Grid(cols, rows, {"title": (1, 1, 1, 1), "title_rule": (1, 2, 3, 3)})
+
+def _project(key):
+    """key: (metric kinds ("pair" / "single" / "tile"), has content, has insights, has image)"""
+    metric_kinds, has_content, has_insights, has_image = key
+    cols = [fixed(0.5), flex(7.5), fixed(0.5), flex(4.3)]
+    grids = [_title_bar()]
+    if has_image:
+        # Screenshot / diagram on top of the left column, content below it
+        rows = [fixed(1.8), fixed(2.4), fixed(0.2), fixed(0.5), fixed(2.6)]
+        grids.append(Grid(cols, rows, {"image": (1, 1, 1, 1), "content_header": (1, 1, 3, 3),
+                                       "content": (1, 1, 4, 4)}))
+    elif has_content:
+        rows = [fixed(1.8), fixed(0.5), fixed(5.0)]
+        grids.append(Grid(cols, rows, {"content_header": (1, 1, 1, 1), "content": (1, 1, 2, 2)}))
+
+    rows, boxes = [fixed(1.8)], {}
+    def add(name, inches):
+        boxes[name] = (3, 3, len(rows), len(rows))
+        rows.append(fixed(inches))
+    if metric_kinds:
+        add("metrics_header", 0.5)
+        for i, kind in enumerate(metric_kinds):
+            if kind == "pair":
+                add(f"metric_label_{i}", 0.3)
+                add(f"metric_value_{i}", 0.5)
+            elif kind == "tile":
+                add(f"metric_tile_{i}", 0.8)
+                rows.append(fixed(0.15))
+            else:
+                add(f"metric_{i}", 0.4)
+        rows.append(fixed(0.3))
+    if has_insights:
+        add("insights_header", 0.5)
+        add("insights", 3.0)
+    grids.append(Grid(cols, rows, boxes))
+    return grids
+
+def _problems(count):
+    # Card padding, then per column a 3.0 in header span and the rest of the column
+    cols = [fixed(0.4), fixed(0.1),
+            flex(3.0), flex(0.5), fixed(0.2),
+            flex(3.0), flex(0.5), fixed(0.2),
+            flex(3.0), flex(1.5), fixed(0.5)]
+    column_spans = [(2, 3), (5, 6), (8, 9)]
+    rows = [fixed(1.1), fixed(0.4)]
+    boxes = {f"column_header_{i}": (c0, c0, 1, 1) for i, (c0, _) in enumerate(column_spans)}
+    for n in range(count):
+        card = len(rows)
+        rows += [fixed(0.2), fixed(1.8), fixed(0.2), fixed(0.3)]
+        boxes[f"card_{n}"] = (1, 10, card, card + 2)
+        for role, (c0, c1) in zip(("problem", "impact", "solution"), column_spans):
+            boxes[f"{role}_{n}"] = (c0, c1, card + 1, card + 1)
+    return [_title_bar(), Grid(cols, rows, boxes)]
+
+def _plan(count):
+    cols = [fixed(0.5)]
+    boxes = {}
+    for i in range(count):
+        if i:
+            cols.append(fixed(0.4))
+        boxes[f"plan_header_{i}"] = (len(cols), len(cols), 1, 1)
+        boxes[f"plan_body_{i}"] = (len(cols), len(cols), 2, 2)
+        cols.append(flex(3.8))
+    rows = [fixed(1.5), fixed(0.6), fixed(5.0)]
+    return [_title_bar(), Grid(cols, rows, boxes)]
+
+def _directory(key):
+    """key: one flag per entry, True for indented sub-entries"""
+    title = Grid([fixed(0.5), flex(5)], [fixed(0.4), fixed(1)], {"title": (1, 1, 1, 1)})
+    rows, boxes = [fixed(2.0)], {}
+    for i, sub in enumerate(key):
+        # Entry boxes are 0.5 in tall but sub-entries advance by 0.4 in, so boxes overlap
+        boxes[f"entry_{i}"] = (1, 1, len(rows), len(rows), Inches(0.5))
+        rows.append(fixed(0.4 if sub else 0.6))
+    return [title, Grid([fixed(1.5), flex(8)], rows, boxes)]
+
+def _chart(key):
+    """key: unused, charts fill the area below the title bar"""
+    return [_title_bar(), Grid([fixed(0.5), flex(12.333), fixed(0.5)], [fixed(1.5), flex(5.5)],
+                               {"chart": (1, 1, 1, 1)})]
+
+ARCHETYPES = {
+    "project": _project,
+    "problems": _problems,
+    "plan": _plan,
+    "directory": _directory,
+    "chart": _chart,
+}
+
+@lru_cache(maxsize=4096)
+def slide_layout(archetype, width, height, key):
+    """{box name: Box} for one archetype on a width x height slide (memoized)"""
+    boxes = {}
+    for grid in ARCHETYPES[archetype](key):
+        boxes.update(solve_grid(grid, width, height))
+    return boxes
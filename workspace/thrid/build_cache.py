@@ -0,0 +1,172 @@
+"""
+Incremental deck rebuilds.
+
+Each slide of a content spec is hashed together with the renderer source. The rendered
+slide XML part is stored under that hash, so a rebuild only runs the builders for
+slides whose content (or the renderer) changed. Clean slides are rendered as blank
+placeholders and their cached parts are written back into the package byte-for-byte.
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+import zipfile
+
+from content_spec import DEFAULT_SLIDE_SIZE, load_spec
+from generate_ppt_styled import create_presentation
+from images import prefetch_images, source_digest
+from layout_plan import plan_slides
+from profiling import stage
+from slide_templates import stamp_slide
+
+DEFAULT_CACHE_DIR = os.path.join(os.getcwd(), ".build_cache")
+BLANK_LAYOUT = 6
+
+# Source files whose changes must invalidate every cached slide
+RENDERER_MODULES = ["generate_ppt_styled.py", "slide_templates.py", "text_fit.py", "layout_plan.py",
+                    "box_layout.py", "theme.py", "metrics.py", "images.py"]
+
+def _renderer_hash():
+    h = hashlib.sha256()
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    for name in RENDERER_MODULES:
+        with open(os.path.join(base_dir, name), "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+RENDERER_HASH = _renderer_hash()
+
+def slide_key(slide_spec, prs):
+    """Content hash of one slide spec, including canvas size, renderer version and image bytes"""
+    # The spec only names the image, so an image overwritten in place must change the key too
+    image = slide_spec.get("image")
+    image_digest = source_digest(image) if image else None
+    payload = json.dumps([RENDERER_HASH, prs.slide_width, prs.slide_height, slide_spec, image_digest],
+                         ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class SlideCache:
+    """Slide XML parts on disk, one file per content hash"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.slide_dir = os.path.join(cache_dir, "slides")
+        self.deck_dir = os.path.join(cache_dir, "decks")
+        os.makedirs(self.slide_dir, exist_ok=True)
+        os.makedirs(self.deck_dir, exist_ok=True)
+
+    def _slide_path(self, key):
+        return os.path.join(self.slide_dir, key + ".xml")
+
+    def get(self, key):
+        try:
+            with open(self._slide_path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key, blob):
+        _atomic_write(self._slide_path(key), blob)
+
+    def _deck_path(self, output_path):
+        name = hashlib.sha256(os.path.abspath(output_path).encode("utf-8")).hexdigest()
+        return os.path.join(self.deck_dir, name + ".json")
+
+    def deck_is_current(self, output_path, keys):
+        """True when output_path was last built from exactly these slide keys and is untouched"""
+        try:
+            with open(self._deck_path(output_path), encoding="utf-8") as f:
+                info = json.load(f)
+            st = os.stat(output_path)
+        except (FileNotFoundError, ValueError):
+            return False
+        return info["keys"] == keys and info["size"] == st.st_size and info["mtime_ns"] == st.st_mtime_ns
+
+    def record_deck(self, output_path, keys):
+        st = os.stat(output_path)
+        info = {"keys": keys, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        _atomic_write(self._deck_path(output_path), json.dumps(info).encode("utf-8"))
+
+def _atomic_write(path, blob):
+    # Several batch workers may share one cache directory
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(blob)
+    os.replace(tmp_path, path)
+
+def build_incremental(spec, output_path, cache):
+    """
+    Builds spec into output_path, re-rendering only dirty slides.
+    Returns (rendered, reused) slide counts; (0, 0) means the output was already current.
+    """
+    prs = create_presentation(spec.get("slide_size", DEFAULT_SLIDE_SIZE))
+    slides = plan_slides(spec["slides"], prs.slide_width, prs.slide_height)
+    keys = [slide_key(s, prs) for s in slides]
+    if cache.deck_is_current(output_path, keys):
+        return 0, 0
+    # Slides with images own a media part, so they are never cached and always rebuilt
+    prefetch_images(slides, prs.slide_width, prs.slide_height)
+
+    cached = [cache.get(k) for k in keys]
+    partnames = []
+    for slide_spec, blob in zip(slides, cached):
+        if blob is None:
+            with stage("slide." + slide_spec["type"]):
+                stamp_slide(prs, slide_spec)
+        else:
+            prs.slides.add_slide(prs.slide_layouts[BLANK_LAYOUT])
+        # Each builder adds exactly one slide; remember where its part lands in the zip
+        slide = prs.slides[len(prs.slides) - 1]
+        partnames.append((slide.part.partname.lstrip("/"), len(slide.part.rels) == 1))
+
+    buf = io.BytesIO()
+    with stage("save"):
+        prs.save(buf)
+
+    replacements = {}
+    rendered = 0
+    with zipfile.ZipFile(buf) as src:
+        for key, blob, (partname, cacheable) in zip(keys, cached, partnames):
+            if blob is not None:
+                replacements[partname] = blob
+                continue
+            rendered += 1
+            # Slides with their own relationships (images, charts) only match their own package
+            if cacheable:
+                cache.put(key, src.read(partname))
+
+        # Written aside and renamed, so an interrupted build never leaves a truncated deck
+        # behind that record_deck's keys would still vouch for
+        tmp_path = f"{output_path}.{os.getpid()}.tmp"
+        try:
+            with stage("save"), zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as dst:
+                for info in src.infolist():
+                    dst.writestr(info, replacements.get(info.filename) or src.read(info.filename))
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    cache.record_deck(output_path, keys)
+    return rendered, len(keys) - rendered
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild a deck, re-rendering only changed slides.")
+    parser.add_argument("spec", help="Content spec (see content_spec.py)")
+    parser.add_argument("-o", "--output", help="Output .pptx (default: the spec's output name)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    args = parser.parse_args(argv)
+
+    spec = load_spec(args.spec)
+    output_path = args.output or os.path.join(os.getcwd(), spec.get("output", "deck.pptx"))
+    rendered, reused = build_incremental(spec, output_path, SlideCache(args.cache_dir))
+    if rendered == reused == 0:
+        print(f"Up to date: {output_path}")
+    else:
+        print(f"Built {output_path}: {rendered} slides rendered, {reused} reused from cache")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""
+Apply many content edits to many decks, one open/save per deck.
+
+A patch set is JSON (a list) or JSONL (one patch per line):
+
+    {"deck": "decks/zhang_san.pptx", "slide": "交接中心", "role": "content",
+     "items": ["流程标准化：...", "资产管理：..."]}
+    {"deck": "decks/zhang_san.pptx", "slide": "交接中心", "role": "metric_value", "index": 1,
+     "items": ["千万级"]}
+    {"deck": "decks/zhang_san.pptx", "slide": "交接中心", "role": "metrics_header", "action": "delete"}
+
+slide is a title (exact match first, then substring) or a 1-based slide number. role is
+a deck_index role; index picks one shape (0-based, negative from the end) when several
+share the role (default: all).
+Patches are grouped by deck, each package is opened once, edits are applied to the slide
+XML directly and the package is written once. Decks are processed in parallel.
+Patches are validated as they are loaded; invalid ones are reported one by one and
+skipped, the rest are applied.
+"""
+import argparse
+import copy
+import json
+import os
+import sys
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from lxml import etree
+
+from deck_index import classify_shapes, slide_title
+from pptx_parts import NS, slide_partnames, top_level_shapes
+
+A = "{%s}" % NS["a"]
+ACTIONS = ("replace", "delete")
+
+class PatchError(ValueError):
+    """A patch whose fields are missing or of the wrong type"""
+
+def validate_patch(patch):
+    """Checks one patch's fields and types; returns it unchanged"""
+    if not isinstance(patch, dict):
+        raise PatchError(f"expected an object, got {type(patch).__name__}")
+    for key in ("deck", "slide", "role"):
+        if key not in patch:
+            raise PatchError(f"missing field '{key}'")
+    if not isinstance(patch["deck"], str) or not patch["deck"]:
+        raise PatchError(f"deck: expected a path, got {patch['deck']!r}")
+    slide = patch["slide"]
+    # bool is an int subclass; True is not slide 1
+    if isinstance(slide, bool) or not isinstance(slide, (str, int)) or slide == "" or \
+            (isinstance(slide, int) and slide < 1):
+        raise PatchError(f"slide: expected a title or a 1-based slide number, got {slide!r}")
+    if not isinstance(patch["role"], str) or not patch["role"]:
+        raise PatchError(f"role: expected a role name, got {patch['role']!r}")
+    if "index" in patch and (isinstance(patch["index"], bool) or not isinstance(patch["index"], int)):
+        raise PatchError(f"index: expected an integer, got {patch['index']!r}")
+    action = patch.get("action", "replace")
+    if action not in ACTIONS:
+        raise PatchError(f"action: expected one of {', '.join(ACTIONS)}, got {action!r}")
+    if action == "replace":
+        if "items" not in patch:
+            raise PatchError("missing field 'items'")
+        items = patch["items"]
+        if not isinstance(items, list) or not all(isinstance(item, str) for item in items):
+            raise PatchError("items: expected a list of strings")
+    return patch
+
+def load_patches(path):
+    """
+    (patches, errors) from a patch set: the valid patches in file order, and
+    (location, message) for each invalid one, so one bad patch does not stop the run
+    """
+    patches, errors = [], []
+
+    def add(where, load):
+        try:
+            patches.append(validate_patch(load()))
+        except ValueError as e:  # json.JSONDecodeError and PatchError are ValueErrors
+            errors.append((where, f"{type(e).__name__}: {e}"))
+
+    with open(path, encoding="utf-8") as f:
+        if path.lower().endswith(".jsonl"):
+            for line_no, line in enumerate(f, 1):
+                if line.strip():
+                    add(f"{path}:{line_no}", lambda l=line: json.loads(l))
+            return patches, errors
+        data = json.load(f)
+    if not isinstance(data, list):
+        raise PatchError("expected a list of patches")
+    for i, patch in enumerate(data):
+        add(f"{path}[{i}]", lambda p=patch: p)
+    return patches, errors
+
+def group_by_deck(patches):
+    """OrderedDict deck path -> patches, keeping the patch-set order within each deck"""
+    groups = OrderedDict()
+    for patch in patches:
+        groups.setdefault(patch["deck"], []).append(patch)
+    return groups
+
+# --- XML edits ---
+def _new_paragraph(template, text):
+    """Copy of template paragraph (keeping pPr and the first run's rPr) holding text"""
+    p = copy.deepcopy(template)
+    runs = p.findall(A + "r")
+    for el in list(p):
+        if el.tag in (A + "r", A + "br", A + "fld"):
+            p.remove(el)
+    first_run = runs[0] if runs else etree.Element(A + "r")
+    end = p.find(A + "endParaRPr")
+
+    # "\n" becomes a line break, like python-pptx's paragraph.text
+    for i, line in enumerate(text.split("\n")):
+        if i:
+            br = etree.Element(A + "br")
+            _insert_before(p, br, end)
+        r = copy.deepcopy(first_run) if i == 0 else etree.Element(A + "r")
+        for t in r.findall(A + "t"):
+            r.remove(t)
+        etree.SubElement(r, A + "t").text = line
+        _insert_before(p, r, end)
+    return p
+
+def _insert_before(parent, el, anchor):
+    if anchor is None:
+        parent.append(el)
+    else:
+        anchor.addprevious(el)
+
+def replace_text(sp, items):
+    """Replaces the paragraphs of a shape with one paragraph per item, keeping its styling"""
+    tx_body = sp.find("p:txBody", NS)
+    if tx_body is None:
+        raise ValueError("shape has no text body")
+    paragraphs = tx_body.findall(A + "p")
+    styled = [p for p in paragraphs if p.find(A + "r") is not None]
+    template = styled[-1] if styled else paragraphs[-1]
+
+    # Builder-made lists start with an empty paragraph; keep it so spacing stays the same
+    keep_leading = len(paragraphs) > 1 and paragraphs[0].find(A + "r") is None
+    for p in paragraphs[1:] if keep_leading else paragraphs:
+        tx_body.remove(p)
+    for item in items:
+        tx_body.append(_new_paragraph(template, item))
+
+def _find_slide(entries, key):
+    """entries: [(partname, root, title)]; key is a title or a 1-based slide number"""
+    if isinstance(key, int):
+        return entries[key - 1] if 0 < key <= len(entries) else None
+    exact = next((e for e in entries if e[2] == key), None)
+    return exact or next((e for e in entries if e[2] and key in e[2]), None)
+
+def patch_deck(deck_path, patches, output_path):
+    """Applies all patches of one deck; returns a result dict (never raises)"""
+    result = {"deck": deck_path, "output": output_path, "applied": 0, "missing": [], "error": None}
+    tmp_path = output_path + ".tmp"
+    try:
+        with zipfile.ZipFile(deck_path) as src:
+            entries = []
+            for partname in slide_partnames(src):
+                root = etree.fromstring(src.read(partname))
+                entries.append((partname, root, slide_title(classify_shapes(top_level_shapes(root)))))
+
+            dirty = {}
+            for patch in patches:
+                entry = _find_slide(entries, patch["slide"])
+                if entry is None:
+                    result["missing"].append(f"slide {patch['slide']!r}")
+                    continue
+                partname, root, _ = entry
+                shapes = [sp for sp, role in classify_shapes(top_level_shapes(root)) if role == patch["role"]]
+                if "index" in patch:
+                    # -1 + 1 would end the slice at 0; None keeps negative indexes working
+                    shapes = shapes[patch["index"]:patch["index"] + 1 or None]
+                if not shapes:
+                    result["missing"].append(f"{patch['slide']}/{patch['role']}")
+                    continue
+                for sp in shapes:
+                    if patch.get("action", "replace") == "delete":
+                        sp.getparent().remove(sp)
+                    else:
+                        replace_text(sp, patch["items"])
+                dirty[partname] = root
+                result["applied"] += 1
+
+            with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as dst:
+                for info in src.infolist():
+                    if info.filename in dirty:
+                        blob = etree.tostring(dirty[info.filename], xml_declaration=True,
+                                              encoding="UTF-8", standalone=True)
+                    else:
+                        blob = src.read(info.filename)
+                    dst.writestr(info, blob)
+        os.replace(tmp_path, output_path)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return result
+
+def default_output(deck_path, suffix):
+    if not suffix:
+        return deck_path
+    stem, ext = os.path.splitext(deck_path)
+    return stem + suffix + ext
+
+def _patch_group(args):
+    return patch_deck(*args)
+
+def run_patches(patches, workers=os.cpu_count() or 1, suffix="_Patched"):
+    """Patches every deck in parallel; results are in first-seen deck order. See validate_patch"""
+    jobs = [(deck, group, default_output(deck, suffix)) for deck, group in group_by_deck(patches).items()]
+    if workers <= 1:
+        return [_patch_group(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_patch_group, jobs, chunksize=8))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply a patch set to many decks.")
+    parser.add_argument("patches", help="Patch set (.json list or .jsonl)")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--suffix", default="_Patched", help="Output name suffix ('' to patch in place)")
+    args = parser.parse_args(argv)
+
+    try:
+        patches, invalid = load_patches(args.patches)
+    except (OSError, ValueError) as e:
+        print(f"Cannot read {args.patches}: {e}")
+        return 2
+    for where, error in invalid:
+        print(f"  invalid patch {where}: {error}")
+
+    results = run_patches(patches, args.workers, args.suffix)
+    failed = 0
+    for r in results:
+        if r["error"] or r["missing"]:
+            failed += 1
+            print(f"  {r['deck']}: {r['error'] or 'not found: ' + ', '.join(r['missing'])}")
+    print(f"Patched {len(results)} decks ({failed} with problems, {len(invalid)} invalid patches skipped)")
+    return 1 if failed or invalid else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
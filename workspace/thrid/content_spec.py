@@ -0,0 +1,233 @@
+"""
+Declarative content specs for the styled year-end deck.
+
+A spec is plain data (JSON, or YAML when PyYAML is installed), one deck per document:
+
+    {
+      "version": 1,
+      "output": "2025_Year_End_Summary_Final_Styled.pptx",   # optional
+      "slide_size": "4:3",                                     # optional, default "16:9"
+      "slides": [
+        {"type": "directory", "content": ["01. 年度工作总结", "    1.1 vCube 协作平台"]},
+        {"type": "project", "title": "...", "work_content": [...], "work_insights": [...],
+         "key_metrics": ["研发测试节省：140.6人天"]},                  # key_metrics optional
+        {"type": "problems", "title": "...",
+         "problems": [{"title": "...", "desc": "...", "impact": "...", "solution": "..."}]},
+        {"type": "plan", "title": "...",
+         "modules": [{"title": "...", "items": [{"sub": "...", "detail": "..."}]}]},
+        {"type": "chart", "title": "...", "chart": "bar",                # or "line"
+         "categories": ["..."], "series": [{"name": "...", "values": [1.5]}],
+         "unit": "人天"},                                               # unit optional
+        {"type": "chart", "title": "...", "chart": "bar", "from_metrics": "人天"}
+      ]
+    }
+
+Project slides take an optional "metrics_display": "text" (default) or "tiles", and an
+optional "image" path (a screenshot or diagram, see images.py). A chart
+slide either has categories and series or charts the deck's metrics in the
+"from_metrics" unit (see metrics.py).
+
+This module only handles data and deliberately does not import python-pptx.
+"""
+import json
+import os
+from collections import namedtuple
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+SPEC_VERSION = 1
+SPEC_EXTENSIONS = (".json", ".yaml", ".yml")
+# Canvas names; the dimensions live in box_layout.SLIDE_SIZES
+SLIDE_SIZE_NAMES = ("16:9", "4:3")
+DEFAULT_SLIDE_SIZE = "16:9"
+
+# --- Schema ---
+# Field name -> expected shape. "str" / "str_list" / "num_list" / a tuple of allowed strings /
+# nested record schemas (in a list).
+PROBLEM_FIELDS = {"title": "str", "desc": "str", "impact": "str", "solution": "str"}
+PLAN_ITEM_FIELDS = {"sub": "str", "detail": "str"}
+PLAN_MODULE_FIELDS = {"title": "str", "items": [PLAN_ITEM_FIELDS]}
+CHART_SERIES_FIELDS = {"name": "str", "values": "num_list"}
+METRICS_DISPLAYS = ("text", "tiles")
+CHART_KINDS = ("bar", "line")
+
+SLIDE_SCHEMAS = {
+    "directory": {"required": {}, "optional": {"title": "str", "content": "str_list"}},
+    "project": {
+        "required": {"title": "str", "work_content": "str_list", "work_insights": "str_list"},
+        "optional": {"key_metrics": "str_list", "metrics_display": METRICS_DISPLAYS, "image": "str"},
+    },
+    "problems": {"required": {"title": "str", "problems": [PROBLEM_FIELDS]}, "optional": {}},
+    "plan": {"required": {"title": "str", "modules": [PLAN_MODULE_FIELDS]}, "optional": {}},
+    "chart": {
+        "required": {"title": "str", "chart": CHART_KINDS},
+        "optional": {"categories": "str_list", "series": [CHART_SERIES_FIELDS], "unit": "str",
+                     "from_metrics": "str"},
+    },
+}
+
+class SpecError(ValueError):
+    """Raised when a spec does not match the schema; the message carries the field path"""
+
+def _check(value, shape, path):
+    if shape == "str":
+        if not isinstance(value, str):
+            raise SpecError(f"{path}: expected a string, got {type(value).__name__}")
+    elif shape == "str_list":
+        if not isinstance(value, list):
+            raise SpecError(f"{path}: expected a list of strings, got {type(value).__name__}")
+        for i, item in enumerate(value):
+            _check(item, "str", f"{path}[{i}]")
+    elif shape == "num_list":
+        if not isinstance(value, list):
+            raise SpecError(f"{path}: expected a list of numbers, got {type(value).__name__}")
+        for i, item in enumerate(value):
+            if isinstance(item, bool) or not isinstance(item, (int, float)):
+                raise SpecError(f"{path}[{i}]: expected a number, got {type(item).__name__}")
+    elif isinstance(shape, tuple):
+        if value not in shape:
+            raise SpecError(f"{path}: expected one of {', '.join(shape)}, got {value!r}")
+    elif isinstance(shape, list):
+        if not isinstance(value, list):
+            raise SpecError(f"{path}: expected a list, got {type(value).__name__}")
+        for i, item in enumerate(value):
+            _check(item, shape[0], f"{path}[{i}]")
+    elif isinstance(shape, dict):
+        if not isinstance(value, dict):
+            raise SpecError(f"{path}: expected an object, got {type(value).__name__}")
+        for key, sub_shape in shape.items():
+            if key not in value:
+                raise SpecError(f"{path}: missing field '{key}'")
+            _check(value[key], sub_shape, f"{path}.{key}")
+
+def validate_spec(spec):
+    """Checks a loaded spec against the schema and returns it unchanged"""
+    if not isinstance(spec, dict):
+        raise SpecError("spec: expected an object")
+    version = spec.get("version", SPEC_VERSION)
+    if version != SPEC_VERSION:
+        raise SpecError(f"spec.version: unsupported version {version!r}")
+    if "output" in spec:
+        _check(spec["output"], "str", "spec.output")
+    if spec.get("slide_size", DEFAULT_SLIDE_SIZE) not in SLIDE_SIZE_NAMES:
+        raise SpecError(f"spec.slide_size: expected one of {', '.join(SLIDE_SIZE_NAMES)}, "
+                        f"got {spec['slide_size']!r}")
+    if "slides" not in spec:
+        raise SpecError("spec: missing field 'slides'")
+    _check(spec["slides"], [{}], "spec.slides")
+
+    for i, slide in enumerate(spec["slides"]):
+        path = f"spec.slides[{i}]"
+        # Slides are objects by now (see _check above); a non-string type must not reach the lookup
+        slide_type = slide.get("type")
+        schema = SLIDE_SCHEMAS.get(slide_type) if isinstance(slide_type, str) else None
+        if schema is None:
+            raise SpecError(f"{path}.type: unknown slide type {slide.get('type')!r}")
+        for key, shape in schema["required"].items():
+            if key not in slide:
+                raise SpecError(f"{path}: missing field '{key}'")
+            _check(slide[key], shape, f"{path}.{key}")
+        for key, shape in schema["optional"].items():
+            if slide.get(key) is not None:
+                _check(slide[key], shape, f"{path}.{key}")
+        if slide["type"] == "chart":
+            _check_chart(slide, path)
+    return spec
+
+def _check_chart(slide, path):
+    if slide.get("from_metrics") is not None:
+        return
+    categories, series = slide.get("categories"), slide.get("series")
+    if not categories or not series:
+        raise SpecError(f"{path}: a chart needs 'categories' and 'series', or 'from_metrics'")
+    for i, s in enumerate(series):
+        if len(s["values"]) != len(categories):
+            raise SpecError(f"{path}.series[{i}].values: expected {len(categories)} values "
+                            f"(one per category), got {len(s['values'])}")
+
+# --- Loading ---
+def parse_spec(text, fmt="json"):
+    if fmt == "json":
+        return validate_spec(json.loads(text))
+    if yaml is None:
+        raise SpecError("YAML specs need PyYAML (pip install pyyaml)")
+    try:
+        spec = yaml.safe_load(text)
+    except yaml.YAMLError as e:
+        raise SpecError(f"invalid YAML: {e}") from e
+    return validate_spec(spec)
+
+def load_spec(path):
+    fmt = "json" if path.lower().endswith(".json") else "yaml"
+    with open(path, encoding="utf-8") as f:
+        return parse_spec(f.read(), fmt)
+
+# One entry per deck; exactly one of spec / error is set
+DeckSpec = namedtuple("DeckSpec", ["name", "spec", "error"])
+
+def _load_entry(name, loader):
+    try:
+        return DeckSpec(name, loader(), None)
+    except (OSError, ValueError) as e:  # json.JSONDecodeError and SpecError are ValueErrors
+        return DeckSpec(name, None, f"{type(e).__name__}: {e}")
+
+def iter_specs(source):
+    """
+    Streams deck specs one at a time, so only the deck being handed out is in memory.
+
+    source can be:
+      - a directory: every *.json / *.yaml / *.yml file, sorted by name
+      - a *.jsonl file: one deck spec per line
+      - a single *.json / *.yaml spec
+      - any other file: a manifest with one spec path per line ('#' comments),
+        relative to the manifest
+    Broken specs are yielded with error set instead of stopping the stream.
+    """
+    if os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            if name.lower().endswith(SPEC_EXTENSIONS):
+                path = os.path.join(source, name)
+                yield _load_entry(path, lambda p=path: load_spec(p))
+        return
+
+    lower = source.lower()
+    if lower.endswith(".jsonl"):
+        with open(source, encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                if line.strip():
+                    yield _load_entry(f"{source}:{line_no}", lambda l=line: parse_spec(l))
+        return
+
+    if lower.endswith(SPEC_EXTENSIONS):
+        yield _load_entry(source, lambda: load_spec(source))
+        return
+
+    base_dir = os.path.dirname(os.path.abspath(source))
+    with open(source, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                path = os.path.join(base_dir, line)
+                yield _load_entry(path, lambda p=path: load_spec(p))
+
+def output_name(deck):
+    """File name for a DeckSpec: the spec's "output" or the source name with .pptx"""
+    if deck.spec and deck.spec.get("output"):
+        return deck.spec["output"]
+    base, _, line_no = os.path.basename(deck.name).partition(":")
+    stem = os.path.splitext(base)[0]
+    return f"{stem}_{line_no}.pptx" if line_no else stem + ".pptx"
+
+if __name__ == "__main__":
+    import sys
+    ok = True
+    for deck in iter_specs(sys.argv[1] if len(sys.argv) > 1 else "specs"):
+        if deck.error:
+            ok = False
+            print(f"INVALID {deck.name}: {deck.error}")
+        else:
+            print(f"OK      {deck.name} ({len(deck.spec['slides'])} slides)")
+    sys.exit(0 if ok else 1)
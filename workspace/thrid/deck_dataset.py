@@ -0,0 +1,317 @@
+"""
+Shape-level dataset of many decks, for analytics without reopening the .pptx files.
+
+Every deck under a directory is read in parallel at the zip/XML level and flattened to
+one row per top-level shape:
+
+    deck, slide, layout, title, shape, role, left, top, width, height, text, font_size,
+    label, number, unit
+
+role comes from the shape's role tag, or deck_index's heuristics for untagged decks.
+Geometry is in EMU and font_size in points. For key metrics (roles metric, metric_value
+and metric_tile) label, number and unit hold the parsed metric (see metrics.py), so
+"total 人天 saved company-wide" is a sum over one column:
+
+    python deck_dataset.py extract output/ -o shapes.parquet
+    python deck_dataset.py metrics shapes.parquet --unit 人天
+
+The dataset is columnar. It is written as Parquet when pyarrow is installed, as a NumPy
+structured array (.npz) when numpy is, and otherwise as a zip of column files (.zip):
+numbers as packed arrays, strings dictionary-encoded. Missing values are nulls in
+Parquet; in the other formats missing strings are empty / null, missing numbers NaN and
+missing geometry MISSING_INT.
+"""
+import argparse
+import array
+import json
+import math
+import os
+import sys
+import zipfile
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from lxml import etree
+
+from deck_index import classify_shapes, slide_title
+from metrics import parse_metric
+from pptx_parts import NS, read_rels, slide_partnames, top_level_shapes
+from pptx_reader import RT_SLIDE_LAYOUT, sp_text
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# (name, type), in column order
+COLUMNS = [
+    ("deck", "str"), ("slide", "int32"), ("layout", "str"), ("title", "str"), ("shape", "str"),
+    ("role", "str"), ("left", "int64"), ("top", "int64"), ("width", "int64"), ("height", "int64"),
+    ("text", "str"), ("font_size", "float32"), ("label", "str"), ("number", "float64"), ("unit", "str"),
+]
+METRIC_ROLES = ("metric", "metric_value", "metric_tile")
+MISSING_INT = -2 ** 63
+FORMATS = {"parquet": ".parquet", "npz": ".npz", "zip": ".zip"}
+
+A = "{%s}" % NS["a"]
+P = "{%s}" % NS["p"]
+# Where sp/pic/cxnSp, grpSp and graphicFrame keep their own position
+_XFRM_PATHS = (f"{P}spPr/{A}xfrm", f"{P}grpSpPr/{A}xfrm", f"{P}xfrm")
+
+# --- Extraction ---
+def _geometry(el):
+    """(left, top, width, height) in EMU from the shape's own xfrm, else Nones"""
+    for path in _XFRM_PATHS:
+        xfrm = el.find(path)
+        if xfrm is not None:
+            off, ext = xfrm.find(f"{A}off"), xfrm.find(f"{A}ext")
+            if off is not None and ext is not None:
+                return int(off.get("x")), int(off.get("y")), int(ext.get("cx")), int(ext.get("cy"))
+    return None, None, None, None
+
+def _font_size(el):
+    """First explicit run size in the shape, in points"""
+    for r_pr in el.iter(f"{A}rPr", f"{A}defRPr"):
+        if r_pr.get("sz"):
+            return int(r_pr.get("sz")) / 100
+    return None
+
+def _metric(role, text, last_label):
+    """(label, number, unit) of a metric shape; Nones for other roles"""
+    if role not in METRIC_ROLES:
+        return None, None, None
+    value, _, rest = text.partition("\n")
+    metric = parse_metric(value.strip())
+    if role == "metric_tile":
+        label = rest.strip() or None  # Tiles put the label under the value
+    elif role == "metric_value":
+        label = last_label
+    else:
+        label = metric.label
+    return label, metric.number, metric.unit
+
+def extract_deck(path, deck=None):
+    """Column name -> list of values for every top-level shape of the deck at path"""
+    deck = deck or os.path.basename(path)
+    columns = {name: [] for name, _ in COLUMNS}
+    layouts = {}
+    with zipfile.ZipFile(path) as zf:
+        for index, partname in enumerate(slide_partnames(zf), 1):
+            layout = None
+            for reltype, target, external in read_rels(zf, partname).values():
+                if reltype == RT_SLIDE_LAYOUT and not external:
+                    if target not in layouts:
+                        c_sld = etree.fromstring(zf.read(target)).find("p:cSld", NS)
+                        layouts[target] = c_sld.get("name") if c_sld is not None else None
+                    layout = layouts[target]
+            classified = classify_shapes(top_level_shapes(etree.fromstring(zf.read(partname))))
+            title = slide_title(classified)
+            last_label = None
+            for el, role in classified:
+                text = sp_text(el)
+                label, number, unit = _metric(role, text, last_label)
+                # Heuristically classified decks tag the label shape "metric"; without a number it
+                # is the name of the metric_value that follows
+                if role == "metric_label" or (role == "metric" and number is None):
+                    last_label = text.strip()
+                row = (deck, index, layout, title, etree.QName(el).localname, role, *_geometry(el),
+                       text, _font_size(el), label, number, unit)
+                for (name, _), value in zip(COLUMNS, row):
+                    columns[name].append(value)
+    return columns
+
+def _extract_task(args):
+    path, deck = args
+    try:
+        return deck, extract_deck(path, deck), None
+    except (OSError, KeyError, zipfile.BadZipFile, etree.XMLSyntaxError) as e:
+        return deck, None, f"{type(e).__name__}: {e}"
+
+def find_decks(root):
+    """(path, deck name relative to root) for every .pptx under root, sorted"""
+    if not os.path.isdir(root):
+        return [(root, os.path.basename(root))]
+    decks = []
+    for directory, dirs, files in os.walk(root):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith(".pptx") and not name.startswith("~$"):
+                path = os.path.join(directory, name)
+                decks.append((path, os.path.relpath(path, root).replace(os.sep, "/")))
+    return decks
+
+def _iter_extracted(decks, workers):
+    if workers <= 1 or len(decks) <= 1:
+        yield from map(_extract_task, decks)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_extract_task, decks, chunksize=8)
+
+def extract_decks(decks, workers=os.cpu_count() or 1):
+    """
+    Extracts [(path, deck name)] in parallel.
+    Returns (columns for all decks, in input order; [(deck, error)] for unreadable decks).
+    """
+    columns = {name: [] for name, _ in COLUMNS}
+    failed = []
+    for deck, deck_columns, error in _iter_extracted(decks, workers):
+        if error:
+            failed.append((deck, error))
+            continue
+        for name, values in deck_columns.items():
+            columns[name].extend(values)
+    return columns, failed
+
+# --- Storage ---
+def default_format():
+    return "parquet" if pyarrow else "npz" if numpy else "zip"
+
+def _format_of(path):
+    """The format path's extension names; ValueError when unknown or its library is missing"""
+    fmt = next((fmt for fmt, ext in FORMATS.items() if path.endswith(ext)), None)
+    if fmt is None:
+        raise ValueError(f"unknown dataset format: {path} (expected {', '.join(FORMATS.values())})")
+    if fmt == "parquet" and pyarrow is None:
+        raise ValueError("Parquet datasets need pyarrow (pip install pyarrow)")
+    if fmt == "npz" and numpy is None:
+        raise ValueError(".npz datasets need numpy (pip install numpy)")
+    return fmt
+
+def _write_parquet(columns, path):
+    types = {"str": pyarrow.string(), "int32": pyarrow.int32(), "int64": pyarrow.int64(),
+             "float32": pyarrow.float32(), "float64": pyarrow.float64()}
+    table = pyarrow.table({name: pyarrow.array(columns[name], types[kind]) for name, kind in COLUMNS})
+    # Dictionary-encode the low-cardinality string columns (deck, layout, role, unit...)
+    pyarrow.parquet.write_table(table, path, compression="zstd", use_dictionary=True)
+
+def _missing(kind):
+    return "" if kind == "str" else math.nan if kind.startswith("float") else MISSING_INT
+
+def _write_npz(columns, path):
+    dtype = []
+    for name, kind in COLUMNS:
+        if kind == "str":
+            width = max((len(v) for v in columns[name] if v), default=1)
+            dtype.append((name, f"U{width}"))
+        else:
+            dtype.append((name, kind))
+    rows = numpy.empty(len(columns["deck"]), dtype=dtype)
+    for name, kind in COLUMNS:
+        missing = _missing(kind)
+        rows[name] = [missing if v is None else v for v in columns[name]]
+    numpy.savez_compressed(path, shapes=rows)
+
+_ARRAY_CODES = {"int32": "i", "int64": "q", "float32": "f", "float64": "d"}
+
+def _write_zip(columns, path):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("schema.json", json.dumps({"columns": COLUMNS, "rows": len(columns["deck"])}))
+        for name, kind in COLUMNS:
+            if kind == "str":
+                codes = {}
+                for v in columns[name]:
+                    if v is not None and v not in codes:
+                        codes[v] = len(codes)
+                zf.writestr(f"{name}.dict.json", json.dumps(list(codes), ensure_ascii=False))
+                zf.writestr(f"{name}.codes", array.array("i", (-1 if v is None else codes[v]
+                                                               for v in columns[name])).tobytes())
+            else:
+                missing = _missing(kind)
+                zf.writestr(f"{name}.bin", array.array(_ARRAY_CODES[kind],
+                                                       (missing if v is None else v for v in columns[name])).tobytes())
+
+def write_dataset(columns, path):
+    """Writes columns in the format path's extension names (see FORMATS)"""
+    fmt = _format_of(path)
+    {"parquet": _write_parquet, "npz": _write_npz, "zip": _write_zip}[fmt](columns, path)
+
+def read_dataset(path):
+    """Column name -> list of values; missing values are None whatever the format"""
+    fmt = _format_of(path)
+    if fmt == "parquet":
+        columns = pyarrow.parquet.read_table(path).to_pydict()
+    elif fmt == "npz":
+        with numpy.load(path) as data:
+            rows = data["shapes"]
+            columns = {name: rows[name].tolist() for name, _ in COLUMNS}
+    else:
+        columns = {}
+        with zipfile.ZipFile(path) as zf:
+            for name, kind in COLUMNS:
+                if kind == "str":
+                    values = json.loads(zf.read(f"{name}.dict.json"))
+                    codes = array.array("i", zf.read(f"{name}.codes"))
+                    columns[name] = [None if c < 0 else values[c] for c in codes]
+                else:
+                    columns[name] = array.array(_ARRAY_CODES[kind], zf.read(f"{name}.bin")).tolist()
+    for name, kind in COLUMNS:
+        values = columns[name]
+        if kind == "str":
+            columns[name] = [v or None for v in values]
+        elif kind.startswith("float"):
+            columns[name] = [None if v is None or math.isnan(v) else v for v in values]
+        else:
+            columns[name] = [None if v is None or v == MISSING_INT else v for v in values]
+    return columns
+
+# --- Queries ---
+def metric_totals(columns, unit=None):
+    """{unit: (total, metric count, deck count)}, or only unit's entry when given"""
+    totals = defaultdict(lambda: [0, 0, set()])
+    for role, number, metric_unit, deck in zip(columns["role"], columns["number"], columns["unit"],
+                                               columns["deck"]):
+        if role in METRIC_ROLES and number is not None and (unit is None or metric_unit == unit):
+            total = totals[metric_unit]
+            total[0] += number
+            total[1] += 1
+            total[2].add(deck)
+    return {u: (t[0], t[1], len(t[2])) for u, t in totals.items()}
+
+def _number(value):
+    return f"{value:,.0f}" if float(value).is_integer() else f"{value:,.1f}"
+
+# --- CLI ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Flatten decks to a shape-level columnar dataset and query it.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    extract = commands.add_parser("extract", help="Extract every .pptx under a directory")
+    extract.add_argument("source", help="Directory of decks (searched recursively) or one .pptx")
+    extract.add_argument("-o", "--output", help="Dataset file: .parquet, .npz or .zip "
+                                                f"(default: shapes{FORMATS[default_format()]})")
+    extract.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1)
+    query = commands.add_parser("metrics", help="Total key metrics by unit")
+    query.add_argument("dataset")
+    query.add_argument("--unit", help="Only this unit (e.g. 人天)")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "extract":
+            output = args.output or os.path.join(os.getcwd(), "shapes" + FORMATS[default_format()])
+            _format_of(output)
+            decks = find_decks(args.source)
+            columns, failed = extract_decks(decks, args.workers)
+            write_dataset(columns, output)
+            for deck, error in failed:
+                print(f"  FAILED {deck}: {error}")
+            print(f"Wrote {len(columns['deck'])} shapes from {len(decks) - len(failed)}/{len(decks)} decks "
+                  f"to {output} ({os.path.getsize(output) / 1024:.1f} KB)")
+            return 1 if failed else 0
+
+        totals = metric_totals(read_dataset(args.dataset), args.unit)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    if not totals:
+        print("No metrics" + (f" in {args.unit}" if args.unit else ""))
+    for unit, (total, count, decks) in sorted(totals.items(), key=lambda t: -t[1][2]):
+        print(f"{unit or '(no unit)'}: {_number(total)} across {count} metrics in {decks} decks")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
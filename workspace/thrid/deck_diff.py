@@ -0,0 +1,340 @@
+"""
+Structural diff of generated decks, slide by slide and shape by shape.
+
+Slides are first compared by the CRC-32 and size the zip directory already stores for
+every part, so identical slides are skipped without being decompressed or parsed. The
+remaining slides are aligned (by content, then by title), parsed, and compared on a
+normalized form that ignores shape ids and relationship ids; only slides that still
+differ are walked shape by shape. Shapes are matched by role tag (see tag_role), else
+by name, and each change is reported as text, geometry or style.
+
+    python deck_diff.py 2025_Year_End_Summary_Final.pptx 2025_Year_End_Summary_Final_Styled.pptx
+    python deck_diff.py previous_run/ output/ -j 8      # regression gate: exit code 1 on any change
+
+Charts, media and other parts a slide references are compared too, by the CRC-32 and size
+of each part and of the parts it references in turn; the slide size is checked, layouts,
+masters and notes are not.
+"""
+import argparse
+import difflib
+import glob
+import hashlib
+import json
+import os
+import sys
+import zipfile
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import zip_longest
+
+from lxml import etree
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+
+from deck_index import classify_shapes, slide_title, tagged_role
+from pptx_parts import NS, read_rels, slide_partnames, slide_size, top_level_shapes
+from pptx_reader import sp_text
+
+EMU_PER_INCH = 914400
+
+P_C_NV_PR = f"{{{NS['p']}}}cNvPr"
+A = "{%s}" % NS["a"]
+R = "{%s}" % NS["r"]
+# Ids that renumber when a shape or relationship is added elsewhere on the slide; they are
+# compared by the key of the part they point to instead
+_VOLATILE_ATTRS = (R + "id", R + "embed", R + "link", R + "pict")
+# Relationships outside the slide's own content
+_IGNORED_RELS = (RT.SLIDE_LAYOUT, RT.NOTES_SLIDE)
+
+# status: "same" / "changed" / "added" / "removed"; indexes are 1-based, None when absent
+SlideDiff = namedtuple("SlideDiff", ["status", "old_index", "new_index", "title", "changes"])
+# kind: "added" / "removed" / "text" / "geometry" / "style" / "part" (a referenced chart, image... changed)
+ShapeChange = namedtuple("ShapeChange", ["shape", "kind", "old", "new"])
+
+# --- Slide summaries ---
+class _Slide:
+    """
+    One parsed slide: normalized digest, title, and shape summaries keyed by role/name.
+    related: {rId: (target, part key)} of the slide's relationships (see _Deck.related).
+    """
+
+    def __init__(self, blob, related):
+        root = etree.fromstring(blob)
+        shapes = top_level_shapes(root)
+        # Untagged decks get their title from deck_index's heuristics, for alignment only
+        self.title = slide_title(classify_shapes(shapes))
+        self.shapes = {}
+        counts = {}
+        for el in shapes:
+            key = tagged_role(el) or _shape_name(el) or etree.QName(el).localname
+            n = counts[key] = counts.get(key, 0) + 1
+            self.shapes[key if n == 1 else f"{key}#{n}"] = _summarize(el, related)
+
+        for el in root.iter(P_C_NV_PR):
+            el.attrib.pop("id", None)
+        for el in root.iter():
+            for attr in _VOLATILE_ATTRS:
+                if attr in el.attrib:
+                    el.set(attr, related.get(el.get(attr), ("", ""))[1])
+        self.digest = hashlib.sha1(etree.tostring(root, method="c14n")).hexdigest()
+
+def _shape_name(el):
+    c_nv_pr = next(el.iter(P_C_NV_PR), None)
+    return c_nv_pr.get("name") if c_nv_pr is not None else None
+
+def _geometry(el):
+    xfrm = el.find(".//a:xfrm", NS)
+    if xfrm is None:
+        return None
+    off, ext = xfrm.find("a:off", NS), xfrm.find("a:ext", NS)
+    if off is None or ext is None:
+        return None
+    return tuple(int(v) for v in (off.get("x"), off.get("y"), ext.get("cx"), ext.get("cy")))
+
+def _color(el):
+    clr = el.find("a:solidFill/a:srgbClr", NS) if el is not None else None
+    return clr.get("val") if clr is not None else None
+
+def _run_props(r_pr):
+    if r_pr is None:
+        return None, None, None, None
+    latin = r_pr.find("a:latin", NS)
+    return r_pr.get("sz"), r_pr.get("b"), _color(r_pr), latin.get("typeface") if latin is not None else None
+
+def _style(el):
+    """Shape fill plus (size, bold, color, Latin face) per paragraph; run values win over paragraph defaults"""
+    paragraphs = []
+    for p in el.iter(A + "p"):
+        run = _run_props(p.find("a:r/a:rPr", NS))
+        default = _run_props(p.find("a:pPr/a:defRPr", NS))
+        paragraphs.append(tuple(d if r is None else r for r, d in zip(run, default)))
+    return _color(el.find("p:spPr", NS)), tuple(paragraphs)
+
+def _parts(el, related):
+    """(target, part key) of every relationship the shape uses, in document order"""
+    return tuple(related.get(node.get(attr), (node.get(attr), ""))
+                 for node in el.iter() for attr in _VOLATILE_ATTRS if attr in node.attrib)
+
+def _summarize(el, related):
+    return {"text": sp_text(el), "geometry": _geometry(el), "style": _style(el), "parts": _parts(el, related)}
+
+_STYLE_FIELDS = ("sz", "b", "color", "font")
+
+def _style_delta(a, b):
+    """Only the differing style fields of two shapes, as ("p2.sz=1600", ...) per side"""
+    old, new = [], []
+    if a[0] != b[0]:
+        old.append(f"fill={a[0]}")
+        new.append(f"fill={b[0]}")
+    empty = (None,) * len(_STYLE_FIELDS)
+    for n, (pa, pb) in enumerate(zip_longest(a[1], b[1], fillvalue=empty), 1):
+        for field, va, vb in zip(_STYLE_FIELDS, pa, pb):
+            if va != vb:
+                old.append(f"p{n}.{field}={va}")
+                new.append(f"p{n}.{field}={vb}")
+    return " ".join(old), " ".join(new)
+
+# --- Comparison ---
+def _inches(geometry):
+    return None if geometry is None else tuple(round(v / EMU_PER_INCH, 2) for v in geometry)
+
+def diff_shapes(old, new):
+    """[ShapeChange] between two parsed slides"""
+    changes = []
+    for key, a in old.shapes.items():
+        if key not in new.shapes:
+            changes.append(ShapeChange(key, "removed", a["text"], None))
+    for key, b in new.shapes.items():
+        a = old.shapes.get(key)
+        if a is None:
+            changes.append(ShapeChange(key, "added", None, b["text"]))
+            continue
+        if a["text"] != b["text"]:
+            changes.append(ShapeChange(key, "text", a["text"], b["text"]))
+        if a["geometry"] != b["geometry"]:
+            changes.append(ShapeChange(key, "geometry", _inches(a["geometry"]), _inches(b["geometry"])))
+        if a["style"] != b["style"]:
+            changes.append(ShapeChange(key, "style", *_style_delta(a["style"], b["style"])))
+        if a["parts"] != b["parts"]:
+            changes.append(ShapeChange(key, "part", " ".join(t for t, _ in a["parts"]),
+                                       " ".join(t for t, _ in b["parts"])))
+    return changes
+
+class _Deck:
+    def __init__(self, path):
+        self.zip = zipfile.ZipFile(path)
+        self.size = slide_size(self.zip)
+        self.partnames = slide_partnames(self.zip)
+        self._slide_numbers = {partname: n for n, partname in enumerate(self.partnames, 1)}
+        self._part_keys = {}
+        self.related = [self._related(partname) for partname in self.partnames]
+        # CRC-32 and size from the central directory: equal keys mean equal bytes (in practice)
+        self.keys = [(info.CRC, info.file_size, tuple(sorted((rId, key) for rId, (_, key) in related.items())))
+                     for info, related in zip(map(self.zip.getinfo, self.partnames), self.related)]
+        self._parsed = {}
+
+    def _related(self, partname):
+        """{rId: (target, part key)} for the relationships of partname that carry content"""
+        related = {}
+        for rId, (reltype, target, external) in read_rels(self.zip, partname).items():
+            if reltype in _IGNORED_RELS:
+                continue
+            if external:
+                related[rId] = (target, target)
+            elif target in self._slide_numbers:
+                # Links to other slides: by position, not by that slide's content
+                related[rId] = (target, f"slide {self._slide_numbers[target]}")
+            else:
+                related[rId] = (target, self._part_key(target))
+        return related
+
+    def _part_key(self, partname):
+        """CRC-32 and size of a part and, recursively, of the parts it references"""
+        key = self._part_keys.get(partname)
+        if key is None:
+            self._part_keys[partname] = ""  # Breaks reference cycles
+            try:
+                info = self.zip.getinfo(partname)
+            except KeyError:
+                key = self._part_keys[partname] = "missing"
+                return key
+            h = hashlib.sha1(f"{info.CRC} {info.file_size}".encode("ascii"))
+            for rId, (_, child) in sorted(self._related(partname).items()):
+                h.update(f" {rId}={child}".encode("utf-8"))
+            key = self._part_keys[partname] = h.hexdigest()
+        return key
+
+    def slide(self, i):
+        parsed = self._parsed.get(i)
+        if parsed is None:
+            parsed = self._parsed[i] = _Slide(self.zip.read(self.partnames[i]), self.related[i])
+        return parsed
+
+def _compare(old, new, i, j):
+    a, b = old.slide(i), new.slide(j)
+    if a.digest == b.digest:
+        return SlideDiff("same", i + 1, j + 1, b.title, [])
+    return SlideDiff("changed", i + 1, j + 1, b.title, diff_shapes(a, b))
+
+def _diff_block(old, new, i1, i2, j1, j2):
+    """Slides in a run that differs byte-wise: pair by title, then by position"""
+    diffs = []
+    titles_a = [old.slide(i).title for i in range(i1, i2)]
+    titles_b = [new.slide(j).title for j in range(j1, j2)]
+    matcher = difflib.SequenceMatcher(None, titles_a, titles_b, autojunk=False)
+    for tag, a1, a2, b1, b2 in matcher.get_opcodes():
+        pairs = list(zip(range(i1 + a1, i1 + a2), range(j1 + b1, j1 + b2)))
+        diffs.extend(_compare(old, new, i, j) for i, j in pairs)
+        for i in range(i1 + a1 + len(pairs), i1 + a2):
+            diffs.append(SlideDiff("removed", i + 1, None, old.slide(i).title, []))
+        for j in range(j1 + b1 + len(pairs), j1 + b2):
+            diffs.append(SlideDiff("added", None, j + 1, new.slide(j).title, []))
+    return diffs
+
+def diff_decks(old_path, new_path):
+    """Returns (size change or None, [SlideDiff]) in new-deck order"""
+    old, new = _Deck(old_path), _Deck(new_path)
+    try:
+        diffs = []
+        matcher = difflib.SequenceMatcher(None, old.keys, new.keys, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                diffs.extend(SlideDiff("same", i + 1, j + 1, None, [])
+                             for i, j in zip(range(i1, i2), range(j1, j2)))
+            else:
+                diffs.extend(_diff_block(old, new, i1, i2, j1, j2))
+        size_change = None if old.size == new.size else (_inches(old.size), _inches(new.size))
+        return size_change, diffs
+    finally:
+        old.zip.close()
+        new.zip.close()
+
+# --- Reporting ---
+def _short(value, limit=60):
+    text = str(value).replace("\n", " / ").replace("\v", " ")
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+def format_diff(old_path, new_path, size_change, diffs):
+    counts = {status: sum(d.status == status for d in diffs) for status in ("same", "changed", "added", "removed")}
+    lines = [f"{old_path} -> {new_path}: {len(diffs)} slides, {counts['same']} identical, "
+             f"{counts['changed']} changed, {counts['added']} added, {counts['removed']} removed"]
+    if size_change:
+        lines.append(f"  slide size {size_change[0]} -> {size_change[1]} in")
+    for d in diffs:
+        if d.status == "same":
+            continue
+        where = f"slide {d.new_index}" if d.new_index else f"old slide {d.old_index}"
+        lines.append(f"  {where} \"{d.title or ''}\" {d.status}")
+        for c in d.changes:
+            if c.kind in ("added", "removed"):
+                lines.append(f"    {c.shape}: {c.kind} \"{_short(c.old if c.old is not None else c.new)}\"")
+            elif c.kind == "part" and c.old == c.new:
+                lines.append(f"    {c.shape}: part {c.old} content changed")
+            elif c.kind == "text":
+                lines.append(f"    {c.shape}: text \"{_short(c.old)}\" -> \"{_short(c.new)}\"")
+            else:
+                lines.append(f"    {c.shape}: {c.kind} {_short(c.old, 80)} -> {_short(c.new, 80)}")
+    return "\n".join(lines)
+
+def _is_identical(size_change, diffs):
+    return size_change is None and all(d.status == "same" for d in diffs)
+
+def _diff_task(pair):
+    old_path, new_path = pair
+    try:
+        size_change, diffs = diff_decks(old_path, new_path)
+    except (OSError, KeyError, zipfile.BadZipFile, etree.XMLSyntaxError) as e:
+        return {"old": old_path, "new": new_path, "identical": False, "error": f"{type(e).__name__}: {e}",
+                "text": f"{old_path} -> {new_path}: FAILED {type(e).__name__}: {e}", "slides": []}
+    return {"old": old_path, "new": new_path, "identical": _is_identical(size_change, diffs), "error": None,
+            "text": format_diff(old_path, new_path, size_change, diffs),
+            "slides": [d._asdict() | {"changes": [c._asdict() for c in d.changes]}
+                       for d in diffs if d.status != "same"]}
+
+def pair_directories(old_dir, new_dir):
+    """([(old, new)] for decks in both, [only in old], [only in new]) by file name"""
+    names = lambda d: {os.path.basename(p) for p in glob.glob(os.path.join(d, "*.pptx"))
+                       if not os.path.basename(p).startswith("~$")}
+    old_names, new_names = names(old_dir), names(new_dir)
+    pairs = [(os.path.join(old_dir, n), os.path.join(new_dir, n)) for n in sorted(old_names & new_names)]
+    return pairs, sorted(old_names - new_names), sorted(new_names - old_names)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two decks (or two directories of decks) slide by slide.")
+    parser.add_argument("old", help="Deck or directory from the previous run")
+    parser.add_argument("new", help="Deck or directory to check")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--summary", action="store_true", help="One line per deck pair, no shape details")
+    parser.add_argument("--report", help="Write per-deck results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    if os.path.isdir(args.old) != os.path.isdir(args.new):
+        parser.error("compare a deck with a deck, or a directory with a directory")
+    if os.path.isdir(args.old):
+        pairs, removed, added = pair_directories(args.old, args.new)
+    else:
+        pairs, removed, added = [(args.old, args.new)], [], []
+
+    if args.workers <= 1 or len(pairs) <= 1:
+        results = [_diff_task(pair) for pair in pairs]
+    else:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(_diff_task, pairs, chunksize=4))
+
+    for r in results:
+        print(r["text"].split("\n", 1)[0] if args.summary else r["text"])
+    for name in removed:
+        print(f"  missing from {args.new}: {name}")
+    for name in added:
+        print(f"  new in {args.new}: {name}")
+    changed = sum(not r["identical"] for r in results)
+    if len(pairs) > 1 or removed or added:
+        print(f"{len(results) - changed}/{len(results)} decks identical, {changed} differ, "
+              f"{len(removed)} missing, {len(added)} new")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({"decks": results, "missing": removed, "new": added}, f, ensure_ascii=False, indent=2)
+    return 0 if not changed and not removed and not added else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
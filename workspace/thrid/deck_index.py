@@ -0,0 +1,116 @@
+"""
+One-pass index of a deck: slide title -> slide, and per slide a role -> shapes map.
+
+Decks built by generate_ppt_styled.py name every shape "role:<role>" (see tag_role), so
+roles are read straight from the shape XML. Decks generated before the tags existed fall
+back to the geometry/font heuristics the patchers used to hard-code, kept in one place
+here. The index works on lxml shape trees, so the zip-level patcher can share it.
+
+Roles of a project slide: title, title_rule, content_header, content, metrics_header,
+metric_label, metric_value, metric, insights_header, insights.
+"""
+from collections import defaultdict
+
+from pptx.oxml.ns import qn
+
+from generate_ppt_styled import ROLE_PREFIX
+
+EMU_PER_INCH = 914400
+
+def shape_text(sp):
+    """Text of a shape element, paragraphs joined with newlines"""
+    return "\n".join("".join(t.text or "" for t in p.iter(qn("a:t"))) for p in sp.iter(qn("a:p")))
+
+def tagged_role(sp):
+    c_nv_pr = sp.find(".//" + qn("p:cNvPr"))
+    name = c_nv_pr.get("name", "") if c_nv_pr is not None else ""
+    return name[len(ROLE_PREFIX):] if name.startswith(ROLE_PREFIX) else None
+
+def _offset(sp):
+    off = sp.find(qn("p:spPr") + "/" + qn("a:xfrm") + "/" + qn("a:off"))
+    if off is None:
+        return 0, 0
+    return int(off.get("x")) / EMU_PER_INCH, int(off.get("y")) / EMU_PER_INCH
+
+def _font_size(sp):
+    for tag in ("a:defRPr", "a:rPr"):
+        for el in sp.iter(qn(tag)):
+            if el.get("sz"):
+                return int(el.get("sz")) / 100
+    return None
+
+def infer_role(sp, project_slide):
+    """Role of an untagged shape from the styled builder geometry (legacy decks)"""
+    text = shape_text(sp).strip()
+    if not text:
+        return None
+    left, top = _offset(sp)
+    if top < 1.3:
+        return "title"
+    if not project_slide:
+        return None
+
+    if left < 8:
+        return "content_header" if text.startswith("■") else "content"
+    if text.startswith("■ 关键成效"):
+        return "metrics_header"
+    if text.startswith("■ 工作心得"):
+        return "insights_header"
+    size = _font_size(sp)
+    if size == 12:
+        return "metric_label"
+    if size == 22:
+        return "metric_value"
+    return "insights" if len(sp.findall(".//" + qn("a:p"))) > 1 else "metric"
+
+def classify_shapes(shape_elements):
+    """Returns [(element, role)] for the shapes of one slide, in z-order"""
+    shape_elements = list(shape_elements)
+    roles = [tagged_role(sp) for sp in shape_elements]
+    if any(roles):
+        return list(zip(shape_elements, roles))
+
+    project_slide = any(shape_text(sp).startswith("■ 工作内容") for sp in shape_elements)
+    return [(sp, infer_role(sp, project_slide)) for sp in shape_elements]
+
+def slide_title(classified):
+    for sp, role in classified:
+        if role == "title":
+            return shape_text(sp).strip()
+    return None
+
+class DeckIndex:
+    """Built once per python-pptx Presentation; lookups afterwards do not rescan shapes"""
+
+    def __init__(self, prs):
+        self._by_title = {}
+        self._roles = {}
+        self.slides = list(prs.slides)
+        for slide in self.slides:
+            shapes = {sp._element: sp for sp in slide.shapes}
+            classified = classify_shapes(shapes)
+            roles = defaultdict(list)
+            for element, role in classified:
+                if role:
+                    roles[role].append(shapes[element])
+            self._roles[slide.slide_id] = roles
+            title = slide_title(classified)
+            if title and title not in self._by_title:
+                self._by_title[title] = slide
+
+    def titles(self):
+        return list(self._by_title)
+
+    def slide(self, title):
+        """Slide with this exact title, else the first whose title contains it; None if absent"""
+        slide = self._by_title.get(title)
+        if slide is None:
+            slide = next((s for t, s in self._by_title.items() if title in t), None)
+        return slide
+
+    def shapes(self, slide, role):
+        """Shapes of slide with the given role, in z-order (empty list if none)"""
+        return self._roles[slide.slide_id].get(role, [])
+
+    def roles(self, slide):
+        return dict(self._roles[slide.slide_id])
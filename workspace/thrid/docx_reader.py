@@ -0,0 +1,214 @@
+"""
+Streaming DOCX reader working straight from word/document.xml.
+
+document.xml is parsed incrementally with iterparse; each top-level paragraph or table
+is yielded as soon as it is complete and then freed, so memory stays constant whatever
+the document length. Works on a .docx file or an unzipped folder (e.g. temp_docx/).
+
+    for block in iter_docx("25年年终总结.docx"):
+        if block.kind == "paragraph":
+            print(block.heading_level, block.list_level, block.number, block.text)
+        else:
+            print(block.rows)
+"""
+import os
+import re
+import zipfile
+from collections import namedtuple
+from contextlib import contextmanager
+
+from lxml import etree
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+W = "{%s}" % W_NS
+W_VAL = W + "val"
+
+# heading_level: 0 for Title, 1.. for Heading 1..; list_level: w:ilvl of numbered/bulleted
+# paragraphs; number: list label ("1.", "•") or a typed section number ("1.", "二、")
+Paragraph = namedtuple("Paragraph", ["kind", "text", "style", "heading_level", "list_level", "number"])
+Table = namedtuple("Table", ["kind", "rows"])
+
+# Section numbers typed as text, e.g. "1. vCube平台" / "二、 各模块工作详述"
+SECTION_NUMBER_RE = re.compile(r"^\s*((?:\d+\.)+\d*|[一二三四五六七八九十]+、)\s*")
+
+# w:outlineLvl 9 (and anything above) marks body text, not a heading
+BODY_TEXT_LEVEL = 9
+
+_TEXT_TAGS = {W + "t": None, W + "tab": "\t", W + "br": "\n", W + "cr": "\n"}
+
+@contextmanager
+def _open_part(source, name):
+    """File object for a part of a .docx file or an unzipped .docx folder; None if absent"""
+    if os.path.isdir(source):
+        path = os.path.join(source, *name.split("/"))
+        if not os.path.exists(path):
+            yield None
+            return
+        with open(path, "rb") as f:
+            yield f
+        return
+    with zipfile.ZipFile(source) as zf:
+        if name not in zf.namelist():
+            yield None
+            return
+        with zf.open(name) as f:
+            yield f
+
+def _outline_heading(outline):
+    """Heading level of a w:outlineLvl element; None for body text"""
+    level = int(outline.get(W_VAL))
+    return level + 1 if level < BODY_TEXT_LEVEL else None
+
+def _resolve(own, based_on):
+    """Follows basedOn chains so every style inherits its nearest ancestor's value"""
+    resolved = {}
+    for style_id in set(own) | set(based_on):
+        current, seen = style_id, set()
+        while current is not None and current not in own and current not in seen:
+            seen.add(current)
+            current = based_on.get(current)
+        if current in own:
+            resolved[style_id] = own[current]
+    return resolved
+
+def load_styles(source):
+    """
+    From word/styles.xml: (styleId -> heading level, styleId -> (numId, ilvl)).
+    Heading levels come from the style's outline level (Title counts as 0); list
+    styles such as "List Number" carry their numbering in the style itself.
+    """
+    with _open_part(source, "word/styles.xml") as f:
+        if f is None:
+            return {}, {}
+        root = etree.parse(f).getroot()
+
+    headings, lists, based_on = {}, {}, {}
+    for style in root.iterfind(W + "style"):
+        if style.get(W + "type") != "paragraph":
+            continue
+        style_id = style.get(W + "styleId")
+        name = style.find(W + "name")
+        parent = style.find(W + "basedOn")
+        if parent is not None:
+            based_on[style_id] = parent.get(W_VAL)
+        outline = style.find(f"{W}pPr/{W}outlineLvl")
+        if outline is not None:
+            # Kept even when None, so a body-text style does not inherit a heading level
+            headings[style_id] = _outline_heading(outline)
+        elif name is not None and name.get(W_VAL, "").lower() == "title":
+            headings[style_id] = 0
+        num_id = style.find(f"{W}pPr/{W}numPr/{W}numId")
+        if num_id is not None:
+            ilvl = style.find(f"{W}pPr/{W}numPr/{W}ilvl")
+            lists[style_id] = (num_id.get(W_VAL), ilvl.get(W_VAL) if ilvl is not None else "0")
+    return _resolve(headings, based_on), _resolve(lists, based_on)
+
+def load_numbering(source):
+    """(numId, ilvl) -> numFmt from word/numbering.xml"""
+    with _open_part(source, "word/numbering.xml") as f:
+        if f is None:
+            return {}
+        root = etree.parse(f).getroot()
+    abstract = {}
+    for ab in root.iterfind(W + "abstractNum"):
+        abstract[ab.get(W + "abstractNumId")] = {
+            lvl.get(W + "ilvl"): lvl.find(W + "numFmt").get(W_VAL) if lvl.find(W + "numFmt") is not None else "decimal"
+            for lvl in ab.iterfind(W + "lvl")
+        }
+    formats = {}
+    for num in root.iterfind(W + "num"):
+        ab_id = num.find(W + "abstractNumId")
+        for ilvl, fmt in abstract.get(ab_id.get(W_VAL) if ab_id is not None else None, {}).items():
+            formats[(num.get(W + "numId"), ilvl)] = fmt
+    return formats
+
+def _list_label(fmt, n):
+    if fmt == "bullet":
+        return "•"
+    if fmt == "lowerLetter":
+        return chr(ord("a") + (n - 1) % 26) + "."
+    if fmt == "upperLetter":
+        return chr(ord("A") + (n - 1) % 26) + "."
+    return f"{n}."
+
+def paragraph_text(p):
+    """Run text of a w:p, including hyperlinks and tracked insertions but not text boxes"""
+    parts = []
+    for r in p.iterfind(f".//{W}r"):
+        if r.getparent() is not p and etree.QName(r.getparent()).localname not in ("hyperlink", "ins", "smartTag"):
+            continue  # Runs of text boxes and other nested content
+        for el in r:
+            if el.tag in _TEXT_TAGS:
+                parts.append((el.text or "") if _TEXT_TAGS[el.tag] is None else _TEXT_TAGS[el.tag])
+    return "".join(parts)
+
+class _ParagraphReader:
+    """Turns w:p elements into Paragraph tuples, tracking list counters across the document"""
+
+    def __init__(self, source):
+        self.heading_levels, self.style_lists = load_styles(source)
+        self.numbering = load_numbering(source)
+        self.counters = {}
+
+    def read(self, p):
+        text = paragraph_text(p)
+        ppr = p.find(W + "pPr")
+        style = heading = number = None
+        num = list_level = None
+        if ppr is not None:
+            style_el = ppr.find(W + "pStyle")
+            if style_el is not None:
+                style = style_el.get(W_VAL)
+                heading = self.heading_levels.get(style)
+                num = self.style_lists.get(style)
+            outline = ppr.find(W + "outlineLvl")
+            if outline is not None:
+                heading = _outline_heading(outline)
+            num_pr = ppr.find(W + "numPr")
+            if num_pr is not None and num_pr.find(W + "numId") is not None:
+                ilvl_el = num_pr.find(W + "ilvl")
+                num = (num_pr.find(W + "numId").get(W_VAL), ilvl_el.get(W_VAL) if ilvl_el is not None else "0")
+        if num is not None and num[0] != "0":  # numId 0 switches numbering off
+            list_level = int(num[1])
+            number = self._next_label(num[0], list_level)
+        if number is None:
+            match = SECTION_NUMBER_RE.match(text)
+            if match:
+                number = match.group(1)
+        return Paragraph("paragraph", text, style, heading, list_level, number)
+
+    def _next_label(self, num_id, level):
+        counts = self.counters.setdefault(num_id, {})
+        counts[level] = counts.get(level, 0) + 1
+        for deeper in [l for l in counts if l > level]:
+            del counts[deeper]  # A new parent item restarts its sub-list
+        return _list_label(self.numbering.get((num_id, str(level)), "decimal"), counts[level])
+
+def _table_rows(tbl):
+    rows = []
+    for tr in tbl.iterfind(W + "tr"):
+        rows.append(["\n".join(paragraph_text(p) for p in tc.iterfind(W + "p")) for tc in tr.iterfind(W + "tc")])
+    return rows
+
+def iter_docx(source):
+    """Yields Paragraph and Table tuples for the top-level body content, in document order"""
+    reader = _ParagraphReader(source)
+    with _open_part(source, "word/document.xml") as f:
+        if f is None:
+            raise FileNotFoundError(f"{source}: no word/document.xml")
+        for _, el in etree.iterparse(f, events=("end",), tag=(W + "p", W + "tbl")):
+            parent = el.getparent()
+            if parent is None or parent.tag != W + "body":
+                continue  # Cell paragraphs are read with their table
+            if el.tag == W + "p":
+                yield reader.read(el)
+            else:
+                yield Table("table", _table_rows(el))
+            el.clear()
+            while el.getprevious() is not None:
+                del parent[0]
+
+def iter_paragraphs(source):
+    for block in iter_docx(source):
+        if block.kind == "paragraph":
+            yield block
@@ -1,39 +1,87 @@
+import argparse
 import os
-from pptx import Presentation
-from docx import Document
+import sys
 
-def extract_pptx_info(filepath):
+from docx_reader import Paragraph, Table, iter_docx
+from parse_cache import DEFAULT_CACHE_PATH, DEFAULT_MAX_BYTES, ParseCache
+from pptx_reader import LazyDeck
+
+BASE_SKILL_DIR = r"C:\Users\11101526\.config\opencode\skills\年终总结ppt-skill"
+REFERENCE_FILES = [
+    os.path.join(BASE_SKILL_DIR, "reference", "output example", "个人年度工作总结--刘家玮.pptx"),
+    os.path.join(BASE_SKILL_DIR, "reference", "input", "25年年终总结.docx"),
+    os.path.join(BASE_SKILL_DIR, "reference", "input", "快应用政务服务-2025工作总结.docx"),
+]
+
+# --- Parsing (plain data, so results can be kept in the parse cache) ---
+def read_pptx(filepath):
+    """Slide size and (index, layout, texts) per slide"""
+    with LazyDeck(filepath) as deck:
+        return {"slide_count": deck.slide_count, "slide_width": deck.slide_width,
+                "slide_height": deck.slide_height,
+                "slides": [[s.index, s.layout, s.texts] for s in deck.iter_slides()]}
+
+def read_docx(filepath):
+    """docx_reader blocks as lists"""
+    return [list(block) for block in iter_docx(filepath)]
+
+def _parse(filepath, kind, read, cache):
+    return cache.get_or_parse(filepath, kind, read) if cache is not None else read(filepath)
+
+# --- Reports ---
+def extract_pptx_info(filepath, cache=None):
     print(f"--- Analyzing PPTX: {filepath} ---")
     if not os.path.exists(filepath):
         print("File not found.")
         return
 
-    prs = Presentation(filepath)
-    print(f"Total Slides: {len(prs.slides)}")
-    print(f"Slide Width: {prs.slide_width}, Height: {prs.slide_height}")
-    
-    for i, slide in enumerate(prs.slides):
-        print(f"\nSlide {i+1} Layout: {slide.slide_layout.name}")
-        for shape in slide.shapes:
-            if hasattr(shape, "text"):
-                print(f"  - Text: {shape.text[:50]}..." if len(shape.text) > 50 else f"  - Text: {shape.text}")
-
-def extract_docx_info(filepath):
+    info = _parse(filepath, "pptx", read_pptx, cache)
+    print(f"Total Slides: {info['slide_count']}")
+    print(f"Slide Width: {info['slide_width']}, Height: {info['slide_height']}")
+
+    for index, layout, texts in info["slides"]:
+        print(f"\nSlide {index} Layout: {layout}")
+        for text in texts:
+            print(f"  - Text: {text[:50]}..." if len(text) > 50 else f"  - Text: {text}")
+
+def extract_docx_info(filepath, cache=None):
     print(f"\n--- Extracting DOCX: {filepath} ---")
     if not os.path.exists(filepath):
         print("File not found.")
         return
 
-    doc = Document(filepath)
-    for para in doc.paragraphs:
-        if para.text.strip():
-            print(f"Para: {para.text}")
+    for fields in _parse(filepath, "docx", read_docx, cache):
+        block = Table(*fields) if fields[0] == "table" else Paragraph(*fields)
+        if block.kind == "table":
+            for row in block.rows:
+                print("Table: " + " | ".join(cell.replace("\n", " ") for cell in row))
+        elif block.text.strip():
+            print(f"Para: {block.text}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print the text structure of reference decks and documents.")
+    parser.add_argument("files", nargs="*", default=REFERENCE_FILES,
+                        help=".pptx / .docx files (default: the reference example deck and inputs)")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH, help="Parse cache (SQLite file)")
+    parser.add_argument("--no-cache", action="store_true", help="Parse every file from scratch")
+    parser.add_argument("--cache-max-mb", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help="Evict least recently used parses beyond this size")
+    parser.add_argument("--verify", action="store_true",
+                        help="Hash every file even when its size and mtime are unchanged")
+    args = parser.parse_args(argv)
 
-base_skill_dir = r"C:\Users\11101526\.config\opencode\skills\年终总结ppt-skill"
-example_ppt = os.path.join(base_skill_dir, "reference", "output example", "个人年度工作总结--刘家玮.pptx")
-input_doc1 = os.path.join(base_skill_dir, "reference", "input", "25年年终总结.docx")
-input_doc2 = os.path.join(base_skill_dir, "reference", "input", "快应用政务服务-2025工作总结.docx")
+    cache = None if args.no_cache else ParseCache(args.cache, args.cache_max_mb * 1024 * 1024, args.verify)
+    try:
+        for path in args.files:
+            if path.lower().endswith(".docx"):
+                extract_docx_info(path, cache)
+            else:
+                extract_pptx_info(path, cache)
+    finally:
+        if cache is not None:
+            cache.close()
+            print(f"Parse cache: {cache.hits} reused, {cache.misses} parsed", file=sys.stderr)
+    return 0
 
-extract_pptx_info(example_ppt)
-extract_docx_info(input_doc1)
-extract_docx_info(input_doc2)
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""
+Image stage for project slides: downscale, recompress and deduplicate before embedding.
+
+Project slides may name a screenshot or architecture diagram ("image": "shots/vcube.png",
+relative to the working directory); it is drawn at the top of the left column. Embedding
+full-resolution PNGs makes decks tens of MB, so every image is first resized to its box
+at the slide's effective DPI (IMAGE_DPI pixels per inch of box) and re-encoded:
+
+  - JPEG sources (photos) as progressive JPEG at JPEG_QUALITY
+  - everything else as PNG, with an exact palette when the resized image has
+    at most 256 colors (diagrams, flat UI), so screenshots stay lossless
+  - the source bytes are kept when re-encoding would not make them smaller
+
+Prepared images are keyed by the SHA-256 of the source bytes and the target size, so an
+image used on many slides or in many decks is processed once. They are kept in memory
+and, with configure(cache_dir=...), on disk for the batch's other worker processes.
+Identical prepared bytes become one media part: python-pptx shares image parts by hash
+within a deck, and part_store.py across decks.
+
+prefetch_images() prepares all images of a planned deck on a thread pool (Pillow releases
+the GIL while decoding, resizing and encoding) before the builders run.
+"""
+import hashlib
+import io
+import os
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+from PIL import Image
+
+from box_layout import slide_layout
+
+IMAGE_DPI = 150
+JPEG_QUALITY = 85
+MEMORY_CACHE_SIZE = 512        # Cache entries per process (two per prepared image)
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+
+EMU_PER_INCH = 914400
+
+# blob: encoded bytes; width / height: pixels
+PreparedImage = namedtuple("PreparedImage", ["blob", "ext", "width", "height"])
+
+_settings = {"dpi": IMAGE_DPI, "cache_dir": None, "workers": DEFAULT_WORKERS}
+_memory = OrderedDict()
+_memory_lock = Lock()
+_digests = {}                  # (path, mtime, size) -> SHA-256 of the source bytes
+
+def configure(dpi=IMAGE_DPI, cache_dir=None, workers=DEFAULT_WORKERS):
+    """Sets the target DPI, the optional on-disk cache shared across processes and the thread count"""
+    _settings["dpi"] = dpi
+    _settings["cache_dir"] = cache_dir
+    _settings["workers"] = workers
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+
+# --- Encoding ---
+def _target_pixels(box_width, box_height, dpi):
+    return max(1, round(box_width / EMU_PER_INCH * dpi)), max(1, round(box_height / EMU_PER_INCH * dpi))
+
+def _encode(img, source, target):
+    """Downscales img to fit within target (never upscales) and re-encodes it"""
+    source_format = img.format
+    resized = img.width > target[0] or img.height > target[1]
+    if resized:
+        # In place on the unloaded image, so JPEGs are decoded at reduced scale (draft mode)
+        img.thumbnail(target, Image.LANCZOS)
+
+    out = io.BytesIO()
+    has_alpha = img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info
+    if has_alpha:
+        img.convert("RGBA").save(out, "PNG")
+        ext = "png"
+    elif source_format == "JPEG":
+        img.convert("RGB").save(out, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+        ext = "jpg"
+    else:
+        rgb = img.convert("RGB")
+        colors = rgb.getcolors(256)
+        if colors is not None:
+            # Diagrams and flat UI: an exact palette, so still lossless
+            rgb = rgb.convert("P", palette=Image.Palette.ADAPTIVE, colors=len(colors))
+        # Default zlib level: optimize=True costs ~4x the time for ~1% smaller screenshots
+        rgb.save(out, "PNG")
+        ext = "png"
+
+    blob = out.getvalue()
+    if not resized and len(source) <= len(blob) and source_format in ("PNG", "JPEG"):
+        return PreparedImage(source, "jpg" if source_format == "JPEG" else "png", img.width, img.height)
+    return PreparedImage(blob, ext, img.width, img.height)
+
+# --- Caches ---
+def _disk_path(key, ext):
+    return os.path.join(_settings["cache_dir"], f"{key}.{ext}")
+
+def _disk_get(key):
+    if not _settings["cache_dir"]:
+        return None
+    for ext in ("png", "jpg"):
+        try:
+            with open(_disk_path(key, ext), "rb") as f:
+                blob = f.read()
+        except FileNotFoundError:
+            continue
+        with Image.open(io.BytesIO(blob)) as img:
+            return PreparedImage(blob, ext, img.width, img.height)
+    return None
+
+def _disk_put(key, prepared):
+    if not _settings["cache_dir"]:
+        return
+    path = _disk_path(key, prepared.ext)
+    # Several batch workers may prepare the same image at once
+    tmp_path = f"{path}.{os.getpid()}.{id(prepared)}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(prepared.blob)
+    os.replace(tmp_path, path)
+
+def _remember(key):
+    with _memory_lock:
+        prepared = _memory.get(key)
+        if prepared is not None:
+            _memory.move_to_end(key)
+        return prepared
+
+def _memorize(keys, prepared):
+    with _memory_lock:
+        for key in keys:
+            _memory[key] = prepared
+        while len(_memory) > MEMORY_CACHE_SIZE:
+            _memory.popitem(last=False)
+
+def source_digest(path):
+    """SHA-256 of the image file at path; re-read only when its size or mtime changes"""
+    st = os.stat(path)
+    stat_key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    digest = _digests.get(stat_key)
+    if digest is None:
+        with open(path, "rb") as f:
+            digest = _digests[stat_key] = hashlib.sha256(f.read()).hexdigest()
+    return digest
+
+def prepare_image(path, box_width, box_height):
+    """PreparedImage for the image at path, sized for a box_width x box_height (EMU) box"""
+    target = _target_pixels(box_width, box_height, _settings["dpi"])
+    # The path key skips re-reading and re-hashing files the builders ask for again
+    st = os.stat(path)
+    path_key = (os.path.abspath(path), st.st_mtime_ns, st.st_size, target)
+    prepared = _remember(path_key)
+    if prepared is not None:
+        return prepared
+
+    with open(path, "rb") as f:
+        source = f.read()
+    key = hashlib.sha256(source).hexdigest() + f"_{target[0]}x{target[1]}"
+    prepared = _remember(key) or _disk_get(key)
+    if prepared is None:
+        with Image.open(io.BytesIO(source)) as img:
+            prepared = _encode(img, source, target)
+        _disk_put(key, prepared)
+    _memorize((path_key, key), prepared)
+    return prepared
+
+# --- Placement ---
+def fit_box(prepared, box):
+    """(left, top, width, height) of the image scaled into box, centered, aspect ratio kept"""
+    left, top, width, height = box
+    if prepared.width * height > prepared.height * width:
+        fitted = (width, width * prepared.height // prepared.width)
+    else:
+        fitted = (height * prepared.width // prepared.height, height)
+    return left + (width - fitted[0]) // 2, top + (height - fitted[1]) // 2, fitted[0], fitted[1]
+
+def image_box(slide, width, height):
+    """The image box of a planned project slide (see box_layout._project)"""
+    # The left column does not depend on the metrics or insights on the right
+    return slide_layout("project", width, height, ((), bool(slide["work_content"]), False, True))["image"]
+
+def prefetch_images(slides, width, height, workers=None):
+    """Prepares every image of a planned deck on a thread pool; returns how many were prepared"""
+    workers = workers or _settings["workers"]
+    jobs = {}
+    for slide in slides:
+        if slide["type"] == "project" and slide.get("image"):
+            box = image_box(slide, width, height)
+            jobs[(slide["image"], box.width, box.height)] = None
+    if not jobs:
+        return 0
+    if len(jobs) == 1 or workers <= 1:
+        for args in jobs:
+            prepare_image(*args)
+        return len(jobs)
+    with ThreadPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        # list() so a missing or broken image raises here rather than halfway through a deck
+        list(pool.map(lambda args: prepare_image(*args), jobs))
+    return len(jobs)
@@ -0,0 +1,113 @@
+"""
+Encoding-aware ingestion of raw content dumps.
+
+The dumps in this folder come in mixed encodings: temp_content.txt and (despite its name)
+full_content_utf8.txt are GBK, second/content_dump.txt is UTF-8. ingest detects the
+encoding from a small prefix sample, decodes the file in streaming chunks and writes a
+normalized UTF-8 copy (LF newlines, no BOM) into a cache keyed by the raw bytes' hash.
+Repeat runs only hash the file and read the cached copy back.
+
+.docx inputs are accepted too and flattened to one line per paragraph via docx_reader,
+so the section parser sees the same line stream whatever the source format.
+"""
+import codecs
+import hashlib
+import io
+import os
+import sys
+
+from docx_reader import iter_docx
+
+DEFAULT_CACHE_DIR = os.path.join(os.getcwd(), ".ingest_cache")
+SAMPLE_SIZE = 64 * 1024
+CHUNK_SIZE = 1024 * 1024
+
+_BOMS = [
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+def detect_encoding(sample):
+    """Encoding of a byte prefix: BOM, else UTF-8 if it decodes strictly, else GB18030 (a GBK superset)"""
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+    try:
+        # final=False: a multi-byte character cut off by the sample boundary is not an error
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    try:
+        codecs.getincrementaldecoder("gb18030")().decode(sample, final=False)
+        return "gb18030"
+    except UnicodeDecodeError:
+        return "utf-8"  # Undecodable either way; decode() falls back to replacement characters
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _decode_chunks(path, encoding, errors="strict"):
+    """Yields normalized text chunks (universal newlines) decoded incrementally"""
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(encoding)(errors), translate=True)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            yield decoder.decode(chunk)
+    yield decoder.decode(b"", final=True)
+
+def _write_normalized(path, encoding, out_path):
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8", newline="\n") as out:
+            for text in _decode_chunks(path, encoding):
+                out.write(text)
+    except UnicodeDecodeError:
+        # The prefix looked like UTF-8 but a later chunk was not: retry as GB18030, then give up gracefully
+        fallback = "gb18030" if encoding.startswith("utf-8") else "utf-8"
+        with open(tmp_path, "w", encoding="utf-8", newline="\n") as out:
+            for text in _decode_chunks(path, fallback, errors="replace"):
+                out.write(text)
+        encoding = fallback
+    os.replace(tmp_path, out_path)
+    return encoding
+
+def normalize(path, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Returns (utf8_path, encoding) for a text dump, decoding it only on a cache miss.
+    encoding is None when the cached copy was reused.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    out_path = os.path.join(cache_dir, file_hash(path) + ".txt")
+    if os.path.exists(out_path):
+        return out_path, None
+    with open(path, "rb") as f:
+        encoding = detect_encoding(f.read(SAMPLE_SIZE))
+    return out_path, _write_normalized(path, encoding, out_path)
+
+def iter_lines(path, cache_dir=DEFAULT_CACHE_DIR):
+    """Streams the lines (without newlines) of a text dump or a .docx, as UTF-8 text"""
+    if path.lower().endswith(".docx"):
+        for block in iter_docx(path):
+            if block.kind == "paragraph":
+                yield block.text
+            else:
+                for row in block.rows:
+                    yield "\t".join(row)
+        return
+    utf8_path, _ = normalize(path, cache_dir)
+    with open(utf8_path, encoding="utf-8") as f:
+        for line in f:
+            yield line.rstrip("\n")
+
+def read_text(path, cache_dir=DEFAULT_CACHE_DIR):
+    return "\n".join(iter_lines(path, cache_dir))
+
+if __name__ == "__main__":
+    for path in sys.argv[1:]:
+        utf8_path, encoding = normalize(path)
+        print(f"{path}: {encoding or 'cached'} -> {utf8_path}")
@@ -0,0 +1,208 @@
+"""
+Typography shared with the builders, and the pagination planner built on it.
+
+Slide positions come from box_layout's solved grids, which size boxes to the canvas but
+do not know how much text a box holds, so a list that is too long simply runs off the
+7.5-inch slide. plan_slides() walks a content spec once, before any shape is created,
+measures every list with the builders' own boxes and font sizes (via text_fit's glyph
+tables) and splits overlong ones into "（续）" continuation slides:
+
+  - project:   work_content by the content box height (shorter under an image),
+               work_insights by the space left under the metrics; key_metrics and the
+               image stay on the first slide
+  - problems:  as many cards as fit above the slide bottom
+  - plan:      PLAN_COLUMNS columns per slide, items by the column body height
+  - directory: as many entries as fit above the slide bottom
+  - chart:     never split; "from_metrics" charts are given their data from the deck's
+               project metrics here (see metrics.py)
+"""
+from pptx.util import Inches, Pt
+
+from box_layout import slide_layout
+from content_spec import SpecError
+from metrics import metric_chart_data
+from profiling import profiled
+from text_fit import DEFAULT_INSETS, LEVEL_INDENT, line_count, line_height
+from theme import DEFAULT_THEME, STYLES
+
+CONTINUED_SUFFIX = "（续）"
+
+# --- Builder typography (positions: see box_layout.py, text styles: see theme.py) ---
+CONTENT_SIZE = STYLES["body"].size
+CONTENT_SPACE_AFTER = Pt(10)
+INSIGHT_SIZE = STYLES["insight"].size
+INSIGHT_SPACE_AFTER = Pt(8)
+
+PLAN_COLUMNS = 3
+PLAN_BODY_MARGIN = Inches(0.2)
+PLAN_SUB_SIZE = STYLES["plan_sub"].size
+PLAN_DETAIL_SIZE = STYLES["plan_detail"].size
+PLAN_SUB_SPACE_BEFORE = Pt(12)
+
+def is_sub_entry(line):
+    """Indented directory lines are rendered as sub-entries"""
+    return line.startswith("    ")
+
+def metric_layout_key(metrics, display="text"):
+    """Project layout key for the metrics stack: "label：value" pairs take two boxes, tiles one"""
+    if display == "tiles":
+        return ("tile",) * len(metrics or ())
+    return tuple("pair" if "：" in m else "single" for m in metrics or ())
+
+# Text boxes start with an empty paragraph at the default 18pt before the first item
+_LEADING_LINE = line_height(1800)
+_INSET_X = DEFAULT_INSETS[0] + DEFAULT_INSETS[2]
+_INSET_Y = DEFAULT_INSETS[1] + DEFAULT_INSETS[3]
+
+def _hundredths(size):
+    return round(size.pt * 100)
+
+def _item_height(text, size, width, theme, space_before=0, space_after=0, bold=False):
+    lines = line_count(text, _hundredths(size), width, theme.font_latin, theme.font_ea, bold)
+    return lines * line_height(_hundredths(size)) + space_before + space_after
+
+def _chunk(heights, first_capacity, next_capacity):
+    """
+    Greedy split of consecutive items into pages; returns index lists. An item taller
+    than a whole page gets a page of its own (text_fit shrinks it).
+    """
+    pages, current, used = [], [], 0
+    capacity = first_capacity
+    for i, height in enumerate(heights):
+        if current and used + height > capacity:
+            pages.append(current)
+            current, used, capacity = [], 0, next_capacity
+        current.append(i)
+        used += height
+    if current or not pages:
+        pages.append(current)
+    return pages
+
+def _continued(title, page):
+    return title if page == 0 else title + CONTINUED_SUFFIX
+
+def _capacity(box, height, insets):
+    """Text height a box holds on the slide, below the leading empty paragraph"""
+    return min(box.top + box.height, height) - box.top - insets - _LEADING_LINE
+
+# --- Planners: slide spec -> list of slide specs ---
+def _plan_project(slide, width, height, theme):
+    metrics = slide.get("key_metrics") or []
+    metrics_key = metric_layout_key(metrics, slide.get("metrics_display", "text"))
+    # An image sits above the first slide's content and shortens it
+    has_image = bool(slide.get("image"))
+    first_content_box = slide_layout("project", width, height, ((), True, False, has_image))["content"]
+    content_box = slide_layout("project", width, height, ((), True, False, False))["content"]
+    first_box = slide_layout("project", width, height, (metrics_key, True, True, has_image))["insights"]
+    next_box = slide_layout("project", width, height, ((), True, True, False))["insights"]
+
+    content = slide["work_content"]
+    content_capacity = _capacity(content_box, height, _INSET_Y)
+    content_pages = _chunk([_item_height(item, CONTENT_SIZE, content_box.width - _INSET_X, theme,
+                                         space_after=CONTENT_SPACE_AFTER) for item in content],
+                           _capacity(first_content_box, height, _INSET_Y), content_capacity)
+
+    insights = slide["work_insights"]
+    insight_pages = _chunk([_item_height(item, INSIGHT_SIZE, first_box.width - _INSET_X, theme,
+                                         space_after=INSIGHT_SPACE_AFTER) for item in insights],
+                           _capacity(first_box, height, _INSET_Y), _capacity(next_box, height, _INSET_Y))
+
+    pages = max(len(content_pages), len(insight_pages))
+    if pages == 1:
+        return [slide]
+    planned = []
+    for page in range(pages):
+        part = dict(slide, title=_continued(slide["title"], page))
+        part["work_content"] = [content[i] for i in content_pages[page]] if page < len(content_pages) else []
+        part["work_insights"] = [insights[i] for i in insight_pages[page]] if page < len(insight_pages) else []
+        part["key_metrics"] = slide.get("key_metrics") if page == 0 else None
+        if page:
+            part.pop("image", None)
+        planned.append(part)
+    return planned
+
+def _plan_problems(slide, width, height, theme):
+    problems = slide["problems"]
+    per_slide = 1
+    while per_slide < len(problems):
+        card = slide_layout("problems", width, height, per_slide + 1)[f"card_{per_slide}"]
+        if card.top + card.height > height:
+            break
+        per_slide += 1
+    if len(problems) <= per_slide:
+        return [slide]
+    return [dict(slide, title=_continued(slide["title"], page), problems=problems[start:start + per_slide])
+            for page, start in enumerate(range(0, len(problems), per_slide))]
+
+def _plan_body_heights(items, column_width, theme):
+    text_width = column_width - PLAN_BODY_MARGIN - DEFAULT_INSETS[2]
+    return [_item_height("• " + item["sub"], PLAN_SUB_SIZE, text_width, theme,
+                         space_before=PLAN_SUB_SPACE_BEFORE, bold=True)
+            + _item_height(item["detail"], PLAN_DETAIL_SIZE, text_width - LEVEL_INDENT, theme)
+            for item in items]
+
+def _plan_plan(slide, width, height, theme):
+    modules = slide["modules"]
+    pages = []
+    for start in range(0, len(modules), PLAN_COLUMNS):
+        group = modules[start:start + PLAN_COLUMNS]
+        body = slide_layout("plan", width, height, len(group))["plan_body_0"]
+        capacity = _capacity(body, height, PLAN_BODY_MARGIN + DEFAULT_INSETS[3])
+        item_pages = [_chunk(_plan_body_heights(m["items"], body.width, theme), capacity, capacity) for m in group]
+        for page in range(max(len(p) for p in item_pages)):
+            pages.append([dict(m, items=[m["items"][i] for i in p[page]])
+                          for m, p in zip(group, item_pages) if page < len(p)])
+    # No modules means no pages; the slide still renders with its title alone
+    if len(pages) <= 1:
+        return [slide]
+    return [dict(slide, title=_continued(slide["title"], page), modules=page_modules)
+            for page, page_modules in enumerate(pages)]
+
+def _plan_directory(slide, width, height, theme):
+    content = slide.get("content")
+    if not content:
+        return [slide]
+    boxes = slide_layout("directory", width, height, tuple(is_sub_entry(line) for line in content))
+    # Entry tops only depend on the entries above them, so each page restarts at entry 0's top
+    pages, current, shift = [], [], 0
+    for i, line in enumerate(content):
+        box = boxes[f"entry_{i}"]
+        if current and box.top - shift + box.height > height:
+            pages.append(current)
+            current, shift = [], box.top - boxes["entry_0"].top
+        current.append(line)
+    pages.append(current)
+    if len(pages) == 1:
+        return [slide]
+    title = slide.get("title") or "目录"
+    return [dict(slide, title=_continued(title, page), content=lines) for page, lines in enumerate(pages)]
+
+def _plan_chart(slide, width, height, theme):
+    return [slide]
+
+PLANNERS = {
+    "directory": _plan_directory,
+    "project": _plan_project,
+    "problems": _plan_problems,
+    "plan": _plan_plan,
+    "chart": _plan_chart,
+}
+
+def _resolve_metric_chart(slide, slides):
+    """A "from_metrics" chart slide with its categories and series filled in from the deck"""
+    unit = slide["from_metrics"]
+    categories, values = metric_chart_data(slides, unit)
+    if not categories:
+        raise SpecError(f"chart '{slide['title']}': no project metric is in {unit!r}")
+    return dict(slide, categories=categories, series=[{"name": unit, "values": values}],
+                unit=slide.get("unit", unit))
+
+@profiled()
+def plan_slides(slides, width, height, theme=DEFAULT_THEME):
+    """Slide specs of a deck with overlong lists split into continuation slides (measured in theme's fonts)"""
+    planned = []
+    for slide in slides:
+        if slide["type"] == "chart" and slide.get("from_metrics"):
+            slide = _resolve_metric_chart(slide, slides)
+        planned.extend(PLANNERS[slide["type"]](slide, width, height, theme))
+    return planned
@@ -0,0 +1,416 @@
+"""
+Roll-up decks: merge many generated .pptx files into one without re-rendering.
+
+Slides are copied at the zip/XML level, one part at a time, so a roll-up of thousands
+of slides is built in a single pass with flat memory (only part names and hashes are
+kept). The first deck provides the package skeleton (masters, layouts, theme, document
+properties). For every other deck:
+
+  - slide masters are matched by content (master, theme, layouts and their media); decks
+    built from the same template reuse the skeleton's layouts, and a deck with a
+    different template has its master, theme and layouts imported once
+  - media, charts and other parts a slide references are copied once per distinct
+    content (and relationship targets), however many slides or decks use them
+  - hyperlinks between slides of the same deck are repointed to the merged slides
+
+Each source deck becomes a named section of the roll-up. Speaker notes are not carried
+over. All decks must share the first deck's slide size.
+
+    python merge_decks.py -o rollup.pptx output/
+    python merge_decks.py -o rollup.pptx alice.pptx bob.pptx --no-sections
+"""
+import argparse
+import hashlib
+import os
+import posixpath
+import re
+import sys
+import uuid
+import zipfile
+
+from lxml import etree
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+
+from pptx_parts import NS, R_ID, read_rels, rels_path, slide_partnames, slide_size
+from stream_writer import NS_CT, add_presentation_slides, rels_xml
+
+NS_P14 = "http://schemas.microsoft.com/office/powerpoint/2010/main"
+SECTION_EXT_URI = "{521415D9-36F7-43E2-AB2F-B90AF26B5E84}"
+FIRST_MASTER_ID = 2147483648  # sldMasterId / sldLayoutId values start here (ECMA-376)
+
+# Parts regenerated from the merged slide list rather than copied
+_GENERATED = ("[Content_Types].xml", "ppt/presentation.xml", "ppt/_rels/presentation.xml.rels")
+_SKIPPED_RELS = (RT.NOTES_SLIDE,)
+
+_NUMBERED_RE = re.compile(r"^(.*?)(\d*)(\.[^.]*)$")
+
+def _tostring(root):
+    return etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+class _Source:
+    """One input deck: its zip, content types and relationships (read lazily)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.zf = zipfile.ZipFile(path)
+        ct = etree.fromstring(self.zf.read("[Content_Types].xml"))
+        self.defaults = {d.get("Extension").lower(): d.get("ContentType")
+                         for d in ct.iterfind(f"{{{NS_CT}}}Default")}
+        self.overrides = {o.get("PartName").lstrip("/"): o.get("ContentType")
+                          for o in ct.iterfind(f"{{{NS_CT}}}Override")}
+        self._rels = {}
+
+    def content_type(self, partname):
+        return self.overrides.get(partname) or self.defaults[posixpath.splitext(partname)[1][1:].lower()]
+
+    def rels(self, partname):
+        rels = self._rels.get(partname)
+        if rels is None:
+            rels = self._rels[partname] = read_rels(self.zf, partname)
+        return rels
+
+    def masters(self):
+        """Slide master part names in presentation order"""
+        pres = etree.fromstring(self.zf.read("ppt/presentation.xml"))
+        rels = self.rels("ppt/presentation.xml")
+        return [rels[m.get(R_ID)][1] for m in pres.iterfind("p:sldMasterIdLst/p:sldMasterId", NS)]
+
+    def layouts(self, master):
+        """Layout part names of a master, in its sldLayoutIdLst order"""
+        root = etree.fromstring(self.zf.read(master))
+        rels = self.rels(master)
+        return [rels[l.get(R_ID)][1] for l in root.iterfind("p:sldLayoutIdLst/p:sldLayoutId", NS)]
+
+    def template_digest(self, master):
+        """Hash of a master and everything it reaches (theme, layouts, their media)"""
+        digest = hashlib.sha1()
+        seen = set()
+        stack = [master]
+        while stack:
+            partname = stack.pop()
+            if partname in seen:
+                continue
+            seen.add(partname)
+            digest.update(self.zf.read(partname))
+            for rId, (reltype, target, external) in sorted(self.rels(partname).items(), reverse=True):
+                digest.update(f"{rId} {reltype} {target if external else ''}".encode("utf-8"))
+                if not external:
+                    stack.append(target)
+        return digest.hexdigest()
+
+    def close(self):
+        self.zf.close()
+
+class DeckMerger:
+    """Writes the merged package as decks are added; see the module docstring"""
+
+    def __init__(self, output_path, sections=True):
+        self._zip = zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED)
+        self._sections = [] if sections else None
+        self._names = set()          # Zip members written so far
+        self._content_types = {}     # Partname -> content type, for every part written
+        self._defaults = None        # Extension -> content type, from the first deck
+        self._written = {}           # Content digest -> partname, so shared parts are stored once
+        self._templates = {}         # Template digest -> output layout partnames, in master order
+        self._new_masters = []       # Imported master partnames, for presentation.xml
+        self._slides = []            # Output slide partnames, in order
+        self._base = None            # (presentation.xml, its .rels, slide size) of the first deck
+        self._next_layout_id = FIRST_MASTER_ID
+        self.reused_parts = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._zip.close()
+
+    @property
+    def slide_count(self):
+        return len(self._slides)
+
+    @property
+    def template_count(self):
+        return len(self._templates)
+
+    # --- Writing parts ---
+    def _fresh_name(self, partname):
+        """An unused member name in partname's directory, numbered like its siblings"""
+        directory, name = posixpath.split(partname)
+        stem, _, ext = _NUMBERED_RE.match(name).groups()
+        n = 1
+        while posixpath.join(directory, f"{stem}{n}{ext}") in self._names:
+            n += 1
+        return posixpath.join(directory, f"{stem}{n}{ext}")
+
+    def _write(self, partname, blob, content_type=None, rels=None):
+        self._zip.writestr(partname, blob)
+        self._names.add(partname)
+        if content_type:
+            self._content_types[partname] = content_type
+        if rels:
+            self._zip.writestr(rels_path(partname), rels_xml(rels))
+            self._names.add(rels_path(partname))
+
+    def _rel_entry(self, rId, reltype, target, external, partname):
+        if external:
+            return rId, reltype, target, True
+        return rId, reltype, posixpath.relpath(target, posixpath.dirname(partname)), False
+
+    def _copy_part(self, src, partname, renamed):
+        """
+        Copies a part a slide references (image, chart, embedding...) with its own related
+        parts; identical content is written once. renamed: source -> output partnames
+        already decided (layouts, slides). Returns the output partname.
+        """
+        if partname in renamed:
+            return renamed[partname]
+        blob = src.zf.read(partname)
+        rels = []
+        for rId, (reltype, target, external) in sorted(src.rels(partname).items()):
+            if not external:
+                target = self._copy_part(src, target, renamed)
+            rels.append((rId, reltype, target, external))
+
+        digest = hashlib.sha1(blob + repr(rels).encode("utf-8")).hexdigest()
+        out = self._written.get(digest)
+        if out is not None:
+            self.reused_parts += 1
+        else:
+            out = self._written[digest] = self._fresh_name(partname)
+            self._write(out, blob, src.content_type(partname),
+                        [self._rel_entry(*rel, out) for rel in rels])
+        renamed[partname] = out
+        return out
+
+    # --- Templates ---
+    def _add_base(self, src):
+        """Copies the first deck's skeleton: every part not owned by its slides"""
+        slides = set(slide_partnames(src.zf))
+        keep, stack = set(), ["", "ppt/presentation.xml"]
+        while stack:
+            partname = stack.pop()
+            for reltype, target, external in src.rels(partname).values():
+                if external or target in keep or target in slides:
+                    continue
+                keep.add(target)
+                stack.append(target)
+
+        self._defaults = dict(src.defaults)
+        self._content_types["ppt/presentation.xml"] = src.content_type("ppt/presentation.xml")
+        for info in src.zf.infolist():
+            name = info.filename
+            owner = name.replace("_rels/", "")[:-len(".rels")] if name.endswith(".rels") else name
+            if name in _GENERATED or (owner not in keep and name != "_rels/.rels"):
+                continue
+            self._zip.writestr(name, src.zf.read(name))
+            self._names.add(name)
+            if owner == name:
+                self._content_types[name] = src.content_type(name)
+        for master_id in etree.fromstring(src.zf.read("ppt/presentation.xml")).iterfind(
+                "p:sldMasterIdLst/p:sldMasterId", NS):
+            self._next_layout_id = max(self._next_layout_id, int(master_id.get("id")) + 1)
+        for master in src.masters():
+            for layout_id in etree.fromstring(src.zf.read(master)).iterfind("p:sldLayoutIdLst/p:sldLayoutId", NS):
+                self._next_layout_id = max(self._next_layout_id, int(layout_id.get("id")) + 1)
+            self._templates.setdefault(src.template_digest(master), src.layouts(master))
+        self._base = (src.zf.read("ppt/presentation.xml"), src.zf.read("ppt/_rels/presentation.xml.rels"),
+                      slide_size(src.zf))
+
+    def _import_master(self, src, master):
+        """Copies a master the output does not have yet, with its theme and layouts"""
+        layouts = src.layouts(master)
+        renamed = {master: self._fresh_name(master)}
+        for layout in layouts:
+            renamed[layout] = self._fresh_name(layout)
+            self._names.add(renamed[layout])  # Reserve, so the next layout gets a new number
+        self._names.add(renamed[master])
+
+        root = etree.fromstring(src.zf.read(master))
+        # Layout ids must be unique across the presentation's masters
+        for layout_id in root.iterfind("p:sldLayoutIdLst/p:sldLayoutId", NS):
+            layout_id.set("id", str(self._next_layout_id))
+            self._next_layout_id += 1
+        for partname in layouts + [master]:
+            blob = _tostring(root) if partname == master else src.zf.read(partname)
+            rels = []
+            for rId, (reltype, target, external) in sorted(src.rels(partname).items()):
+                if not external:
+                    target = self._copy_part(src, target, renamed)
+                rels.append(self._rel_entry(rId, reltype, target, external, renamed[partname]))
+            self._write(renamed[partname], blob, src.content_type(partname), rels)
+        self._new_masters.append(renamed[master])
+        return [renamed[layout] for layout in layouts]
+
+    def _layout_map(self, src):
+        """Source layout partname -> output layout partname, importing unknown templates"""
+        mapping = {}
+        for master in src.masters():
+            digest = src.template_digest(master)
+            layouts = self._templates.get(digest)
+            if layouts is None:
+                layouts = self._templates[digest] = self._import_master(src, master)
+            mapping.update(zip(src.layouts(master), layouts))
+        return mapping
+
+    # --- Slides ---
+    def add_deck(self, path, section=None):
+        """Appends every slide of the deck at path; returns how many were added"""
+        src = _Source(path)
+        try:
+            if self._base is None:
+                self._add_base(src)
+            elif slide_size(src.zf) != self._base[2]:
+                raise ValueError(f"{path}: slide size {slide_size(src.zf)} differs from {self._base[2]}")
+
+            renamed = self._layout_map(src)
+            slides = slide_partnames(src.zf)
+            for i, slide in enumerate(slides):
+                renamed[slide] = f"ppt/slides/slide{len(self._slides) + i + 1}.xml"
+            for slide in slides:
+                out = renamed[slide]
+                rels = []
+                for rId, (reltype, target, external) in sorted(src.rels(slide).items()):
+                    if reltype in _SKIPPED_RELS:
+                        continue
+                    if reltype == RT.SLIDE_LAYOUT and target not in renamed:
+                        raise ValueError(f"{path}: {slide} uses a layout of no listed slide master")
+                    if not external:
+                        target = self._copy_part(src, target, renamed)
+                    rels.append(self._rel_entry(rId, reltype, target, external, out))
+                self._write(out, src.zf.read(slide), src.content_type(slide), rels)
+                self._slides.append(out)
+        finally:
+            src.close()
+        if self._sections is not None and slides:
+            self._sections.append((section or os.path.splitext(os.path.basename(path))[0], len(slides)))
+        return len(slides)
+
+    # --- Package parts ---
+    def _presentation(self):
+        pres_blob, rels_blob, _ = self._base
+        pres = etree.fromstring(pres_blob)
+        rels = etree.fromstring(rels_blob)
+        # The first deck's own slides were re-added like every other deck's
+        for rel in list(rels):
+            if rel.get("Type") == RT.SLIDE:
+                rels.remove(rel)
+        sld_id_lst = pres.find("p:sldIdLst", NS)
+        if sld_id_lst is not None:
+            pres.remove(sld_id_lst)
+        ext_lst = pres.find("p:extLst", NS)
+        if ext_lst is not None:
+            for ext in ext_lst.iterfind("p:ext", NS):
+                if ext.get("uri") == SECTION_EXT_URI:
+                    ext_lst.remove(ext)
+
+        used = {rel.get("Id") for rel in rels}
+        master_lst = pres.find("p:sldMasterIdLst", NS)
+        n = 1
+        for master in self._new_masters:
+            while f"rId{n}" in used:
+                n += 1
+            rId = f"rId{n}"
+            used.add(rId)
+            etree.SubElement(rels, f"{{{NS['rel']}}}Relationship", Id=rId, Type=RT.SLIDE_MASTER,
+                             Target=posixpath.relpath(master, "ppt"))
+            master_id = etree.SubElement(master_lst, f"{{{NS['p']}}}sldMasterId", id=str(self._next_layout_id))
+            master_id.set(R_ID, rId)
+            self._next_layout_id += 1
+
+        pres_blob, rels_blob = add_presentation_slides(_tostring(pres), _tostring(rels), self._slides)
+        if self._sections:
+            pres_blob = _add_sections(pres_blob, self._sections)
+        return pres_blob, rels_blob
+
+    def _content_types_xml(self):
+        root = etree.Element(f"{{{NS_CT}}}Types", nsmap={None: NS_CT})
+        for ext, content_type in self._defaults.items():
+            etree.SubElement(root, f"{{{NS_CT}}}Default", Extension=ext, ContentType=content_type)
+        for partname, content_type in self._content_types.items():
+            ext = posixpath.splitext(partname)[1][1:].lower()
+            if self._defaults.get(ext) != content_type:
+                etree.SubElement(root, f"{{{NS_CT}}}Override", PartName="/" + partname,
+                                 ContentType=content_type)
+        return _tostring(root)
+
+    def close(self):
+        """Writes presentation.xml, its relationships and the content types; closes the zip"""
+        if self._base is None:
+            self._zip.close()
+            raise ValueError("no decks to merge")
+        pres, pres_rels = self._presentation()
+        self._zip.writestr("ppt/presentation.xml", pres)
+        self._zip.writestr("ppt/_rels/presentation.xml.rels", pres_rels)
+        self._zip.writestr("[Content_Types].xml", self._content_types_xml())
+        self._zip.close()
+
+def _add_sections(pres_blob, sections):
+    """presentation.xml with a PowerPoint 2010 section per (name, slide count), in order"""
+    pres = etree.fromstring(pres_blob)
+    sld_ids = [e.get("id") for e in pres.iterfind("p:sldIdLst/p:sldId", NS)]
+    ext_lst = pres.find("p:extLst", NS)
+    if ext_lst is None:
+        ext_lst = etree.SubElement(pres, f"{{{NS['p']}}}extLst")
+    ext = etree.Element(f"{{{NS['p']}}}ext", uri=SECTION_EXT_URI)
+    ext_lst.insert(0, ext)
+    section_lst = etree.SubElement(ext, f"{{{NS_P14}}}sectionLst", nsmap={"p14": NS_P14})
+    start = 0
+    for name, count in sections:
+        section = etree.SubElement(section_lst, f"{{{NS_P14}}}section", name=name,
+                                   id="{" + str(uuid.uuid4()).upper() + "}")
+        ids = etree.SubElement(section, f"{{{NS_P14}}}sldIdLst")
+        for sld_id in sld_ids[start:start + count]:
+            etree.SubElement(ids, f"{{{NS_P14}}}sldId", id=sld_id)
+        start += count
+    return _tostring(pres)
+
+def merge_decks(paths, output_path, sections=True):
+    """Merges the decks at paths, in order, into output_path; returns the merger's stats"""
+    try:
+        with DeckMerger(output_path, sections) as merger:
+            for path in paths:
+                merger.add_deck(path)
+    except BaseException:
+        # Do not leave a half-written roll-up behind
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        raise
+    return {"decks": len(paths), "slides": merger.slide_count, "templates": merger.template_count,
+            "reused_parts": merger.reused_parts}
+
+def _expand(inputs):
+    """.pptx paths from files and directories (a directory's decks in name order)"""
+    paths = []
+    for path in inputs:
+        if os.path.isdir(path):
+            paths.extend(os.path.join(path, n) for n in sorted(os.listdir(path))
+                         if n.endswith(".pptx") and not n.startswith("~$"))
+        else:
+            paths.append(path)
+    return paths
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Merge generated decks into one roll-up deck without re-rendering.")
+    parser.add_argument("decks", nargs="+", help=".pptx files or directories of them, in roll-up order")
+    parser.add_argument("-o", "--output", required=True, help="Roll-up .pptx to write")
+    parser.add_argument("--no-sections", action="store_true", help="Do not group slides into a section per deck")
+    args = parser.parse_args(argv)
+
+    paths = [p for p in _expand(args.decks) if os.path.abspath(p) != os.path.abspath(args.output)]
+    if not paths:
+        print("No decks to merge", file=sys.stderr)
+        return 1
+    try:
+        stats = merge_decks(paths, args.output, sections=not args.no_sections)
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+        print(f"Merge failed: {e}", file=sys.stderr)
+        return 1
+    print(f"Merged {stats['slides']} slides from {stats['decks']} decks into {args.output} "
+          f"({stats['templates']} template(s), {stats['reused_parts']} shared parts reused)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
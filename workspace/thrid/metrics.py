@@ -0,0 +1,146 @@
+"""
+Key metrics: parsing, deck-level aggregation and native PPTX charts.
+
+A metric string such as "研发测试节省：140.6人天" is parsed once into a Metric with
+its label, display value, number and unit. The builders render metrics as text boxes
+(the default), as KPI tiles (project slides with "metrics_display": "tiles") or as
+native charts ("chart" slides, see content_spec.py). A chart slide either carries its
+own categories and series, or names a unit in "from_metrics" and charts every project's
+metrics in that unit:
+
+    {"type": "chart", "title": "节省人天", "chart": "bar", "from_metrics": "人天"}
+    {"type": "chart", "title": "云刷机月度使用", "chart": "line", "unit": "次",
+     "categories": ["1月", "2月"], "series": [{"name": "云刷机", "values": [10211, 12267]}]}
+
+Chart XML is generated with python-pptx's ChartXmlWriter and styled once per (chart
+kind, series count, category count, theme); every later chart of that shape is a deep
+copy with only the cached values filled in, so hundreds of charted decks do not
+rebuild chart parts from scratch. Charts carry their data in the chart part's caches
+only (no embedded workbook): PowerPoint displays them normally, but "Edit Data" has no
+sheet to open.
+"""
+import copy
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+from pptx.chart.chart import Chart
+from pptx.chart.data import CategoryChartData
+from pptx.chart.xmlwriter import ChartXmlWriter
+from pptx.enum.chart import XL_CHART_TYPE
+from pptx.opc.constants import CONTENT_TYPE as CT
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import qn
+from pptx.parts.chart import ChartPart
+from pptx.util import Pt
+
+# --- Parsing ---
+# text: the original string; value: the part after "：" (the whole text without one);
+# number: first number in value (None for e.g. "千万级"); unit: what follows the number
+Metric = namedtuple("Metric", ["text", "label", "value", "number", "unit"])
+
+_NUMBER_RE = re.compile(r"(\d[\d,]*(?:\.\d+)?)\s*\+?\s*")
+
+@lru_cache(maxsize=4096)
+def parse_metric(text):
+    """Metric for one key_metrics string ("研发测试节省：140.6人天" -> 140.6, "人天")"""
+    label, sep, value = text.partition("：")
+    if not sep:
+        label, value = None, text
+    m = _NUMBER_RE.search(value)
+    if m is None:
+        return Metric(text, label, value, None, None)
+    number = float(m.group(1).replace(",", ""))
+    if number.is_integer():
+        number = int(number)
+    return Metric(text, label, value, number, value[m.end():].strip() or None)
+
+def metric_chart_data(slides, unit):
+    """
+    (categories, values) for a "from_metrics" chart: one category per project slide with
+    metrics in unit, valued at the sum of those metrics.
+    """
+    categories, values = [], []
+    for slide in slides:
+        if slide["type"] != "project":
+            continue
+        numbers = [m.number for m in map(parse_metric, slide.get("key_metrics") or ())
+                   if m.number is not None and m.unit == unit]
+        if numbers:
+            categories.append(slide["title"])
+            values.append(sum(numbers))
+    return categories, values
+
+# --- Chart templates ---
+CHART_TYPES = {
+    "bar": XL_CHART_TYPE.COLUMN_CLUSTERED,
+    "line": XL_CHART_TYPE.LINE_MARKERS,
+}
+CHART_FONT_SIZE = Pt(12)
+
+_templates = {}
+
+def _build_template(kind, series_count, category_count, theme):
+    data = CategoryChartData()
+    data.categories = [f"c{i}" for i in range(category_count)]
+    for s in range(series_count):
+        data.add_series(f"s{s}", [0] * category_count)
+    chart_space = parse_xml(ChartXmlWriter(CHART_TYPES[kind], data).xml.encode("utf-8"))
+
+    chart = Chart(chart_space, None)
+    chart.has_title = False  # Single-series charts would otherwise show the series name
+    chart.has_legend = series_count > 1
+    chart.value_axis.has_major_gridlines = False
+    chart.font.size = CHART_FONT_SIZE
+    chart.font.name = theme.font_latin
+    chart.font.color.rgb = theme.color("text")
+    # python-pptx has no East Asian font setter; a:ea goes right after a:latin
+    def_rpr = chart.font._rPr
+    def_rpr.append(def_rpr.makeelement(qn("a:ea"), {"typeface": theme.font_ea}))
+    plot = chart.plots[0]
+    plot.has_data_labels = True
+    plot.data_labels.number_format_is_linked = False
+    # Primary for the first series, then accent; more series fall back to PowerPoint's palette
+    for series, color in zip(plot.series, ("primary", "accent")):
+        if kind == "line":
+            series.format.line.color.rgb = theme.color(color)
+            series.marker.format.fill.solid()
+            series.marker.format.fill.fore_color.rgb = theme.color(color)
+        else:
+            series.format.fill.solid()
+            series.format.fill.fore_color.rgb = theme.color(color)
+    return chart_space
+
+def _number_format(series, unit):
+    decimals = any(isinstance(v, float) and not v.is_integer() for s in series for v in s["values"])
+    number = "#,##0.0" if decimals else "#,##0"
+    return f'{number}"{unit}"' if unit else number
+
+def chart_xml(kind, categories, series, theme, unit=None):
+    """
+    c:chartSpace for one chart, deep-copied from the cached template and filled in.
+    series: [{"name": ..., "values": [...]}], one value per category.
+    """
+    key = (kind, len(series), len(categories), theme)
+    template = _templates.get(key)
+    if template is None:
+        template = _templates[key] = _build_template(kind, len(series), len(categories), theme)
+
+    chart_space = copy.deepcopy(template)
+    for ser, s in zip(chart_space.iter(qn("c:ser")), series):
+        ser.find(qn("c:tx")).find(".//" + qn("c:v")).text = s["name"]
+        for v, category in zip(ser.find(qn("c:cat")).iter(qn("c:v")), categories):
+            v.text = category
+        for v, value in zip(ser.find(qn("c:val")).iter(qn("c:v")), s["values"]):
+            v.text = str(value)
+    chart_space.find(".//" + qn("c:dLbls")).find(qn("c:numFmt")).set("formatCode", _number_format(series, unit))
+    return chart_space
+
+def add_chart(slide, kind, categories, series, box, theme, unit=None):
+    """Adds a native chart in box (left, top, width, height); returns its graphic frame"""
+    package = slide.part.package
+    chart_part = ChartPart(package.next_partname(ChartPart.partname_template), CT.DML_CHART, package,
+                           chart_xml(kind, categories, series, theme, unit))
+    r_id = slide.part.relate_to(chart_part, RT.CHART)
+    return slide.shapes._shape_factory(slide.shapes._add_chart_graphicFrame(r_id, *box))
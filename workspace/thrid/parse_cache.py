@@ -0,0 +1,156 @@
+"""
+Persistent cache of parsed reference files (decks, .docx inputs) in one SQLite file.
+
+Each entry holds the extracted structure of one file for one parser ("pptx", "docx"),
+as zlib-compressed JSON, keyed by the file's absolute path. A lookup stats the file:
+
+  - same size and mtime as the entry: a hit, without reading the file
+  - size or mtime changed: the file is hashed, and an entry with the same SHA-256 (for
+    this path or any other, e.g. a copied or touched file) is reused; only new content
+    is parsed
+  - verify=True hashes the file on every lookup, for sources whose mtime cannot be trusted
+
+Entries record the parser source hash (PARSER_MODULES), so changing a reader invalidates
+them. The cache is bounded by max_bytes of payload; the least recently used entries are
+evicted first.
+
+    with ParseCache() as cache:
+        info = cache.get_or_parse("example.pptx", "pptx", read_pptx)
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+
+from ingest import file_hash
+
+DEFAULT_CACHE_PATH = os.path.join(os.getcwd(), ".parse_cache.sqlite")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Source files whose changes must invalidate every cached parse
+PARSER_MODULES = ["extract_info.py", "pptx_reader.py", "pptx_parts.py", "docx_reader.py"]
+
+def _parser_hash():
+    h = hashlib.sha256()
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    for name in PARSER_MODULES:
+        with open(os.path.join(base_dir, name), "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+PARSER_HASH = _parser_hash()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    path TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    parser TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    bytes INTEGER NOT NULL,
+    last_used INTEGER NOT NULL,
+    PRIMARY KEY (path, kind)
+);
+CREATE INDEX IF NOT EXISTS entries_by_content ON entries (sha256, kind, parser);
+CREATE INDEX IF NOT EXISTS entries_by_use ON entries (last_used);
+"""
+
+class ParseCache:
+    """Parsed structures per (file, parser); see the module docstring"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES, verify=False):
+        self.max_bytes = max_bytes
+        self.verify = verify
+        self.hits = self.misses = 0
+        self._db = sqlite3.connect(path, timeout=30)
+        # WAL: several extract runs can share one cache file
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        # A lower max_bytes than the cache was filled with applies right away, not on the next miss
+        self._evict()
+        self._db.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._db.commit()
+        self._db.close()
+
+    def _touch(self, path, kind, st=None, sha256=None):
+        if st is None:
+            self._db.execute("UPDATE entries SET last_used = ? WHERE path = ? AND kind = ?",
+                             (time.time_ns(), path, kind))
+        else:
+            self._db.execute("UPDATE entries SET last_used = ?, size = ?, mtime_ns = ?, sha256 = ? "
+                             "WHERE path = ? AND kind = ?",
+                             (time.time_ns(), st.st_size, st.st_mtime_ns, sha256, path, kind))
+
+    def get_or_parse(self, path, kind, parse):
+        """Cached parse(path) for this kind of parser; parse must return JSON-serializable data"""
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        row = self._db.execute("SELECT size, mtime_ns, sha256, parser, payload FROM entries "
+                               "WHERE path = ? AND kind = ?", (path, kind)).fetchone()
+        current = row is not None and row[3] == PARSER_HASH
+        if current and not self.verify and (row[0], row[1]) == (st.st_size, st.st_mtime_ns):
+            self.hits += 1
+            self._touch(path, kind)
+            return json.loads(zlib.decompress(row[4]))
+
+        # Stat changed (or verify is on): the content hash decides
+        sha256 = file_hash(path)
+        if current and row[2] == sha256:
+            payload = row[4]
+            self._touch(path, kind, st, sha256)
+        else:
+            same = self._db.execute("SELECT payload FROM entries WHERE sha256 = ? AND kind = ? AND parser = ? "
+                                    "LIMIT 1", (sha256, kind, PARSER_HASH)).fetchone()
+            payload = same[0] if same else None
+            if payload is None:
+                self.misses += 1
+                value = parse(path)
+                payload = zlib.compress(json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+                                        .encode("utf-8"))
+                self._put(path, kind, st, sha256, payload)
+                return value
+            self._put(path, kind, st, sha256, payload)
+        self.hits += 1
+        return json.loads(zlib.decompress(payload))
+
+    def _put(self, path, kind, st, sha256, payload):
+        self._db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                         (path, kind, st.st_size, st.st_mtime_ns, sha256, PARSER_HASH, payload,
+                          len(payload), time.time_ns()))
+        self._evict()
+        self._db.commit()
+
+    def _evict(self):
+        """Drops least recently used entries until the payloads fit in max_bytes"""
+        total = self._db.execute("SELECT COALESCE(SUM(bytes), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        doomed = []
+        for rowid, size in self._db.execute("SELECT rowid, bytes FROM entries ORDER BY last_used"):
+            if total <= self.max_bytes:
+                break
+            doomed.append((rowid,))
+            total -= size
+        self._db.executemany("DELETE FROM entries WHERE rowid = ?", doomed)
+
+    def stats(self):
+        """{"entries", "bytes"} currently stored"""
+        entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM entries").fetchone()
+        return {"entries": entries, "bytes": size}
+
+    def clear(self):
+        self._db.execute("DELETE FROM entries")
+        self._db.commit()
+        self._db.execute("VACUUM")
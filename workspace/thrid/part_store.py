@@ -0,0 +1,209 @@
+"""
+Content-addressed store for generated decks.
+
+Decks rendered from the same template carry byte-identical layouts, masters, theme,
+fonts and logos, and only their slide parts differ. PartStore splits each .pptx into
+its zip members, keeps every distinct member once (compressed, named by its SHA-256)
+and records a small manifest per deck. Any deck can be rematerialized on demand with
+the same parts: every member's content, name, order, timestamp, compression method and
+attributes are kept, but members are compressed again on the way out. Decks written by
+this Python's zipfile (every deck generated here) therefore come back byte-for-byte,
+while decks saved by other tools come back with equal parts and different zip bytes.
+
+    store = PartStore("deck_store")
+    store.add_deck("alice.pptx", "output/alice.pptx")
+    store.materialize("alice.pptx", "/tmp/alice.pptx")
+
+Layout on disk:
+    objects/<2 hex>/<sha256>   zlib-compressed part blobs
+    manifests/<deck>.json      [[zip name, sha256, date_time, compress_type, external_attr], ...]
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+import zipfile
+import zlib
+
+DEFAULT_STORE_DIR = os.path.join(os.getcwd(), "deck_store")
+
+def _atomic_write(path, blob):
+    # Batch workers add decks to one store concurrently; identical objects race harmlessly
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(blob)
+    os.replace(tmp_path, path)
+
+class PartStore:
+    """Zip members of many decks, deduplicated by content hash; see the module docstring"""
+
+    def __init__(self, store_dir=DEFAULT_STORE_DIR):
+        self.object_dir = os.path.join(store_dir, "objects")
+        self.manifest_dir = os.path.join(store_dir, "manifests")
+        os.makedirs(self.object_dir, exist_ok=True)
+        os.makedirs(self.manifest_dir, exist_ok=True)
+
+    # --- Objects ---
+    def _object_path(self, digest):
+        return os.path.join(self.object_dir, digest[:2], digest)
+
+    def put_part(self, blob):
+        """Stores blob unless already present; returns (sha256, bytes added to the store)"""
+        digest = hashlib.sha256(blob).hexdigest()
+        path = self._object_path(digest)
+        if os.path.exists(path):
+            return digest, 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        packed = zlib.compress(blob)
+        _atomic_write(path, packed)
+        return digest, len(packed)
+
+    def get_part(self, digest):
+        with open(self._object_path(digest), "rb") as f:
+            return zlib.decompress(f.read())
+
+    # --- Decks ---
+    def _manifest_path(self, name):
+        # Deck names are output file names, kept flat inside the manifest directory
+        if not name or os.path.basename(name) != name:
+            raise ValueError(f"deck name must be a plain file name: {name!r}")
+        return os.path.join(self.manifest_dir, name + ".json")
+
+    def add_deck(self, name, source):
+        """
+        Splits source (a .pptx path, bytes or file object) into the store under name.
+        Returns {"parts", "new_parts", "bytes_added"}.
+        """
+        if isinstance(source, (bytes, bytearray)):
+            source = io.BytesIO(source)
+        entries, new_parts, bytes_added = [], 0, 0
+        with zipfile.ZipFile(source) as zf:
+            for info in zf.infolist():
+                digest, added = self.put_part(zf.read(info))
+                new_parts += added > 0
+                bytes_added += added
+                entries.append([info.filename, digest, list(info.date_time), info.compress_type,
+                                info.external_attr])
+        manifest = json.dumps({"parts": entries}, separators=(",", ":")).encode("utf-8")
+        _atomic_write(self._manifest_path(name), manifest)
+        return {"parts": len(entries), "new_parts": new_parts, "bytes_added": bytes_added + len(manifest)}
+
+    def manifest(self, name):
+        try:
+            with open(self._manifest_path(name), encoding="utf-8") as f:
+                return json.load(f)["parts"]
+        except FileNotFoundError:
+            raise KeyError(name) from None
+
+    def materialize(self, name, output):
+        """Writes deck name back out as a .pptx (path or file object) with the same parts"""
+        entries = self.manifest(name)
+        with zipfile.ZipFile(output, "w") as zf:
+            for filename, digest, date_time, compress_type, external_attr in entries:
+                info = zipfile.ZipInfo(filename, tuple(date_time))
+                info.compress_type = compress_type
+                info.external_attr = external_attr
+                zf.writestr(info, self.get_part(digest))
+
+    def decks(self):
+        return sorted(n[:-len(".json")] for n in os.listdir(self.manifest_dir)
+                      if n.endswith(".json"))
+
+    def remove_deck(self, name):
+        """Drops a deck's manifest; its parts stay until gc()"""
+        try:
+            os.remove(self._manifest_path(name))
+        except FileNotFoundError:
+            raise KeyError(name) from None
+
+    # --- Maintenance ---
+    def _objects(self):
+        for shard in os.listdir(self.object_dir):
+            shard_dir = os.path.join(self.object_dir, shard)
+            for digest in os.listdir(shard_dir):
+                if not digest.endswith(".tmp"):
+                    yield digest, os.path.join(shard_dir, digest)
+
+    def stats(self):
+        """Deck / part counts and stored vs logical (uncompressed member) bytes"""
+        logical, parts = 0, 0
+        sizes = {}
+        for name in self.decks():
+            for entry in self.manifest(name):
+                parts += 1
+                digest = entry[1]
+                if digest not in sizes:
+                    with open(self._object_path(digest), "rb") as f:
+                        sizes[digest] = len(zlib.decompress(f.read()))
+                logical += sizes[digest]
+        stored = sum(os.path.getsize(path) for _, path in self._objects())
+        stored += sum(os.path.getsize(os.path.join(self.manifest_dir, n)) for n in os.listdir(self.manifest_dir))
+        return {"decks": len(self.decks()), "parts": parts, "objects": sum(1 for _ in self._objects()),
+                "logical_bytes": logical, "stored_bytes": stored}
+
+    def gc(self):
+        """Deletes objects no manifest references; returns how many were removed"""
+        live = {entry[1] for name in self.decks() for entry in self.manifest(name)}
+        removed = 0
+        for digest, path in list(self._objects()):
+            if digest not in live:
+                os.remove(path)
+                removed += 1
+        return removed
+
+# --- CLI ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Store decks deduplicated by part, and rebuild them on demand.")
+    parser.add_argument("--store", default=DEFAULT_STORE_DIR, help="Store directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("add", help="Add .pptx files (stored under their file names)")
+    add.add_argument("decks", nargs="+")
+    get = commands.add_parser("materialize", help="Write stored decks back out as .pptx files")
+    get.add_argument("names", nargs="*", help="Deck names (default: all)")
+    get.add_argument("-o", "--output-dir", default=os.getcwd())
+    remove = commands.add_parser("remove", help="Drop decks from the store (run gc to free their parts)")
+    remove.add_argument("names", nargs="+")
+    commands.add_parser("list", help="List stored decks")
+    commands.add_parser("stats", help="Show how much deduplication saves")
+    commands.add_parser("gc", help="Delete parts no stored deck uses")
+    args = parser.parse_args(argv)
+
+    store = PartStore(args.store)
+    if args.command == "add":
+        for path in args.decks:
+            r = store.add_deck(os.path.basename(path), path)
+            print(f"{os.path.basename(path)}: {r['parts']} parts, {r['new_parts']} new, "
+                  f"{r['bytes_added'] / 1024:.1f} KB added")
+    elif args.command == "materialize":
+        os.makedirs(args.output_dir, exist_ok=True)
+        for name in args.names or store.decks():
+            try:
+                store.materialize(name, os.path.join(args.output_dir, name))
+            except KeyError:
+                print(f"Not in store: {name}", file=sys.stderr)
+                return 1
+            print(f"Wrote {os.path.join(args.output_dir, name)}")
+    elif args.command == "remove":
+        for name in args.names:
+            try:
+                store.remove_deck(name)
+            except KeyError:
+                print(f"Not in store: {name}", file=sys.stderr)
+                return 1
+    elif args.command == "list":
+        for name in store.decks():
+            print(name)
+    elif args.command == "stats":
+        s = store.stats()
+        ratio = s["logical_bytes"] / s["stored_bytes"] if s["stored_bytes"] else 0
+        print(f"{s['decks']} decks, {s['parts']} parts in {s['objects']} objects: "
+              f"{s['logical_bytes'] / 1024:.1f} KB of parts stored in {s['stored_bytes'] / 1024:.1f} KB "
+              f"({ratio:.1f}x)")
+    elif args.command == "gc":
+        print(f"Removed {store.gc()} unused parts")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
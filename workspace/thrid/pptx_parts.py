@@ -0,0 +1,54 @@
+"""
+Zip-level helpers for reading PPTX packages without python-pptx's object model.
+"""
+import posixpath
+
+from lxml import etree
+
+NS = {
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+    "p": "http://schemas.openxmlformats.org/presentationml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+R_ID = f"{{{NS['r']}}}id"
+
+def rels_path(partname):
+    """Zip member holding the relationships of partname ('ppt/slides/slide1.xml')"""
+    directory, name = posixpath.split(partname)
+    return posixpath.join(directory, "_rels", name + ".rels")
+
+def read_rels(zf, partname):
+    """{rId: (reltype, zip member name or external URL, is_external)} for one part"""
+    try:
+        root = etree.fromstring(zf.read(rels_path(partname)))
+    except KeyError:
+        return {}
+    base = posixpath.dirname(partname)
+    rels = {}
+    for rel in root:
+        target = rel.get("Target")
+        external = rel.get("TargetMode") == "External"
+        if not external:
+            target = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join(base, target))
+        rels[rel.get("Id")] = (rel.get("Type"), target, external)
+    return rels
+
+def slide_partnames(zf):
+    """Slide part names in presentation order"""
+    pres = etree.fromstring(zf.read("ppt/presentation.xml"))
+    rels = read_rels(zf, "ppt/presentation.xml")
+    return [rels[sld_id.get(R_ID)][1] for sld_id in pres.iterfind("p:sldIdLst/p:sldId", NS)]
+
+def slide_size(zf):
+    """(cx, cy) in EMU from presentation.xml"""
+    sld_sz = etree.fromstring(zf.read("ppt/presentation.xml")).find("p:sldSz", NS)
+    return int(sld_sz.get("cx")), int(sld_sz.get("cy"))
+
+def shape_tree(slide_root):
+    return slide_root.find("p:cSld/p:spTree", NS)
+
+def top_level_shapes(slide_root):
+    """Shape elements of a slide (sp, pic, graphicFrame, grpSp, cxnSp), in z-order"""
+    return [el for el in shape_tree(slide_root)
+            if etree.QName(el).localname in ("sp", "pic", "graphicFrame", "grpSp", "cxnSp")]
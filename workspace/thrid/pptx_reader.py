@@ -0,0 +1,97 @@
+"""
+Lightweight, lazy PPTX reader.
+
+Reads presentation.xml for the slide list and size, then stream-parses one slide part
+at a time with iterparse, yielding each slide's text without building python-pptx's
+object model. Layout names are read once per layout part and cached.
+
+    with LazyDeck(path) as deck:
+        print(deck.slide_count, deck.slide_width, deck.slide_height)
+        for slide in deck.iter_slides():
+            print(slide.index, slide.layout, slide.texts)
+"""
+import zipfile
+from collections import namedtuple
+
+from lxml import etree
+
+from pptx_parts import NS, read_rels, slide_partnames, slide_size
+
+P_SP = f"{{{NS['p']}}}sp"
+P_SP_TREE = f"{{{NS['p']}}}spTree"
+P_C_SLD = f"{{{NS['p']}}}cSld"
+A_P = f"{{{NS['a']}}}p"
+A_T = f"{{{NS['a']}}}t"
+A_BR = f"{{{NS['a']}}}br"
+RT_SLIDE_LAYOUT = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/slideLayout"
+
+SlideText = namedtuple("SlideText", ["index", "partname", "layout", "texts"])
+
+def paragraph_text(p):
+    """Text of an a:p the way python-pptx reports it (a:br as vertical tab)"""
+    parts = []
+    for el in p.iter(A_T, A_BR):
+        parts.append("\v" if el.tag == A_BR else (el.text or ""))
+    return "".join(parts)
+
+def sp_text(sp):
+    return "\n".join(paragraph_text(p) for p in sp.iter(A_P))
+
+class LazyDeck:
+    """Opens the zip and presentation part only; slide parts are parsed on demand"""
+
+    def __init__(self, path):
+        self._zip = zipfile.ZipFile(path)
+        self.slide_width, self.slide_height = slide_size(self._zip)
+        self._slides = slide_partnames(self._zip)
+        self._layout_names = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._zip.close()
+
+    @property
+    def slide_count(self):
+        return len(self._slides)
+
+    def layout_name(self, layout_partname):
+        """cSld@name of a layout part, parsed only up to the cSld start tag"""
+        if layout_partname not in self._layout_names:
+            name = None
+            with self._zip.open(layout_partname) as f:
+                for _, el in etree.iterparse(f, events=("start",), tag=P_C_SLD):
+                    name = el.get("name")
+                    break
+            self._layout_names[layout_partname] = name
+        return self._layout_names[layout_partname]
+
+    def _slide_layout(self, partname):
+        for reltype, target, external in read_rels(self._zip, partname).values():
+            if reltype == RT_SLIDE_LAYOUT and not external:
+                return self.layout_name(target)
+        return None
+
+    def iter_shape_elements(self, partname):
+        """Yields each top-level p:sp of a slide part, freeing it once the caller is done"""
+        with self._zip.open(partname) as f:
+            for _, el in etree.iterparse(f, events=("end",), tag=P_SP):
+                parent = el.getparent()
+                if parent is None or parent.tag != P_SP_TREE:
+                    continue  # Nested group members; python-pptx's slide.shapes skips them too
+                yield el
+                el.clear()
+                while el.getprevious() is not None:
+                    del parent[0]
+
+    def slide_texts(self, partname):
+        return [sp_text(sp) for sp in self.iter_shape_elements(partname)]
+
+    def iter_slides(self):
+        """Generator of SlideText(index, partname, layout, texts), one slide at a time"""
+        for i, partname in enumerate(self._slides, 1):
+            yield SlideText(i, partname, self._slide_layout(partname), self.slide_texts(partname))
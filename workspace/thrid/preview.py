@@ -0,0 +1,333 @@
+"""
+PDF and PNG previews of generated decks for review.
+
+A pool of long-lived headless office converters is started once and fed from a queue,
+so each deck costs a conversion instead of an office start-up:
+
+  - unoserver (pip install unoserver) when available: one "unoserver" per worker on its
+    own port, driven with "unoconvert"
+  - otherwise LibreOffice itself: one headless soffice per worker with a private profile;
+    "soffice --convert-to" calls with the same profile are handed to that running instance
+
+Each deck gets <name>.pdf and <name>/slide-<n>.png thumbnails (pdftoppm, from poppler).
+<name> is the deck's file name without .pptx; decks from different directories that share
+a name are told apart by their directories (second__<name>, thrid__<name>).
+A conversion that fails or exceeds --timeout restarts its converter and is retried up to
+--retries times. Decks whose PDF is newer than the .pptx are skipped unless --force.
+
+    python preview.py output/ 2025_Year_End_Summary_Final_Styled.pptx -o previews -j 4
+"""
+import argparse
+import glob
+import json
+import os
+import queue
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# --- Configuration ---
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)  # Each converter holds a full office instance
+DEFAULT_TIMEOUT = 120       # Seconds per conversion
+DEFAULT_RETRIES = 2
+DEFAULT_THUMB_WIDTH = 320   # Pixels
+DEFAULT_BASE_PORT = 2003    # unoserver ports: base_port + 2 * slot (+1 for its UNO port)
+STARTUP_TIMEOUT = 60
+
+# Where LibreOffice lives when it is not on PATH (Windows installs never are)
+SOFFICE_CANDIDATES = [
+    "soffice", "libreoffice",
+    r"C:\Program Files\LibreOffice\program\soffice.exe",
+    r"C:\Program Files (x86)\LibreOffice\program\soffice.exe",
+    "/Applications/LibreOffice.app/Contents/MacOS/soffice",
+]
+
+class ConverterError(RuntimeError):
+    """Raised when no converter is installed or a converter cannot be started"""
+
+def _which(candidates):
+    for name in candidates:
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+# --- Converters: start() once, convert() per deck, restart() after a failure ---
+class _Converter:
+    def __init__(self):
+        self._proc = None
+
+    def restart(self):
+        self.stop()
+        self.start()
+
+    def stop(self):
+        if self._proc is not None and self._proc.poll() is None:
+            self._proc.terminate()
+            try:
+                self._proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+                self._proc.wait()
+        self._proc = None
+
+class UnoserverConverter(_Converter):
+    def __init__(self, unoserver, unoconvert, port):
+        super().__init__()
+        self.unoserver = unoserver
+        self.unoconvert = unoconvert
+        self.port = port
+
+    def start(self):
+        self._proc = subprocess.Popen(
+            [self.unoserver, "--interface", "127.0.0.1", "--port", str(self.port),
+             "--uno-port", str(self.port + 1)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if self._proc.poll() is not None:
+                raise ConverterError(f"unoserver exited with code {self._proc.returncode} on port {self.port}")
+            try:
+                socket.create_connection(("127.0.0.1", self.port), timeout=1).close()
+                return
+            except OSError:
+                time.sleep(0.2)
+        self.stop()
+        raise ConverterError(f"unoserver did not come up on port {self.port}")
+
+    def convert(self, pptx_path, pdf_path, timeout):
+        subprocess.run([self.unoconvert, "--host", "127.0.0.1", "--port", str(self.port),
+                        "--convert-to", "pdf", pptx_path, pdf_path],
+                       check=True, capture_output=True, timeout=timeout)
+
+class SofficeConverter(_Converter):
+    def __init__(self, soffice):
+        super().__init__()
+        self.soffice = soffice
+        self._profile = None
+
+    def _env_arg(self):
+        return "-env:UserInstallation=" + Path(self._profile).as_uri()
+
+    def start(self):
+        # A private profile per worker; LibreOffice allows one running instance per profile
+        self._profile = tempfile.mkdtemp(prefix="preview_profile_")
+        self._proc = subprocess.Popen(
+            [self.soffice, self._env_arg(), "--headless", "--invisible", "--norestore", "--nologo"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def convert(self, pptx_path, pdf_path, timeout):
+        with tempfile.TemporaryDirectory(dir=os.path.dirname(pdf_path)) as out_dir:
+            subprocess.run([self.soffice, self._env_arg(), "--headless", "--convert-to", "pdf",
+                            "--outdir", out_dir, pptx_path],
+                           check=True, capture_output=True, timeout=timeout)
+            produced = os.path.join(out_dir, Path(pptx_path).stem + ".pdf")
+            if not os.path.exists(produced):
+                raise ConverterError("soffice reported success but wrote no PDF")
+            os.replace(produced, pdf_path)
+
+    def stop(self):
+        super().stop()
+        if self._profile is not None:
+            shutil.rmtree(self._profile, ignore_errors=True)
+            self._profile = None
+
+def converter_factory(backend="auto", base_port=DEFAULT_BASE_PORT):
+    """Returns (backend name, slot -> converter); raises ConverterError when none is installed"""
+    unoserver, unoconvert = shutil.which("unoserver"), shutil.which("unoconvert")
+    if backend in ("auto", "unoserver") and unoserver and unoconvert:
+        return "unoserver", lambda slot: UnoserverConverter(unoserver, unoconvert, base_port + 2 * slot)
+    soffice = _which(SOFFICE_CANDIDATES)
+    if backend in ("auto", "soffice") and soffice:
+        return "soffice", lambda slot: SofficeConverter(soffice)
+    wanted = "unoserver/unoconvert" if backend == "unoserver" else "LibreOffice (soffice) or unoserver"
+    raise ConverterError(f"No headless office converter found; install {wanted}")
+
+# --- Thumbnails ---
+def render_thumbnails(pdftoppm, pdf_path, thumb_dir, width, timeout):
+    """Renders every PDF page to thumb_dir/slide-<n>.png; returns the paths in page order"""
+    shutil.rmtree(thumb_dir, ignore_errors=True)
+    os.makedirs(thumb_dir)
+    subprocess.run([pdftoppm, "-png", "-scale-to-x", str(width), "-scale-to-y", "-1",
+                    pdf_path, os.path.join(thumb_dir, "slide")],
+                   check=True, capture_output=True, timeout=timeout)
+    # pdftoppm zero-pads page numbers to the page count's width (slide-01.png ...)
+    return sorted(glob.glob(os.path.join(thumb_dir, "slide-*.png")),
+                  key=lambda p: int(Path(p).stem.rsplit("-", 1)[1]))
+
+# --- Pool ---
+def _worker(slot, make_converter, jobs, results, options):
+    converter = make_converter(slot)
+    try:
+        converter.start()
+    except (OSError, ConverterError) as e:
+        # Leave this worker's share of the queue to the others
+        print(f"  worker {slot}: {e}")
+        return
+    try:
+        while True:
+            try:
+                index, pptx_path, name = jobs.get_nowait()
+            except queue.Empty:
+                return
+            results[index] = _preview_deck(converter, pptx_path, name, options)
+    finally:
+        converter.stop()
+
+def _preview_deck(converter, pptx_path, name, options):
+    pdf_path = os.path.join(options["output_dir"], name + ".pdf")
+    result = {"deck": pptx_path, "pdf": pdf_path, "thumbnails": [], "ok": False, "error": None,
+              "attempts": 0, "skipped": False, "seconds": 0.0}
+    start = time.perf_counter()
+    if not options["force"] and os.path.exists(pdf_path) \
+            and os.path.getmtime(pdf_path) >= os.path.getmtime(pptx_path):
+        result.update(ok=True, skipped=True)
+        return result
+
+    src = os.path.abspath(pptx_path)
+    for attempt in range(1, options["retries"] + 2):
+        result["attempts"] = attempt
+        try:
+            converter.convert(src, os.path.abspath(pdf_path), options["timeout"])
+            if options["pdftoppm"]:
+                result["thumbnails"] = render_thumbnails(options["pdftoppm"], pdf_path,
+                                                         os.path.join(options["output_dir"], name),
+                                                         options["thumb_width"], options["timeout"])
+            result["ok"], result["error"] = True, None
+            break
+        except subprocess.TimeoutExpired:
+            result["error"] = f"timed out after {options['timeout']}s"
+        except subprocess.CalledProcessError as e:
+            detail = (e.stderr or b"").decode("utf-8", "replace").strip().splitlines()
+            result["error"] = f"{Path(e.cmd[0]).name} exited with {e.returncode}" + \
+                (f": {detail[-1]}" if detail else "")
+        except (OSError, ConverterError) as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+        # A hung or crashed office instance poisons every later job; start a fresh one
+        try:
+            converter.restart()
+        except (OSError, ConverterError) as e:
+            result["error"] += f"; restart failed: {e}"
+            break
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+def preview_names(decks):
+    """
+    Output name per deck (without extension): the file name, or for decks sharing a file
+    name, their path below the directories they have in common, joined with "__".
+    Concurrent converters must never write the same PDF or thumbnail directory.
+    """
+    paths = [os.path.abspath(path) for path in decks]
+    by_stem = {}
+    for path in paths:
+        by_stem.setdefault(Path(path).stem.lower(), []).append(path)
+    names, taken = [], set()
+    for path in paths:
+        same = by_stem[Path(path).stem.lower()]
+        if len(same) == 1:
+            name = Path(path).stem
+        else:
+            base = os.path.commonpath([os.path.dirname(p) for p in same])
+            name = "__".join(Path(os.path.relpath(path, base)).with_suffix("").parts)
+        # Case-insensitive file systems, or one deck listed twice
+        unique, n = name, 1
+        while unique.lower() in taken:
+            n += 1
+            unique = f"{name}-{n}"
+        taken.add(unique.lower())
+        names.append(unique)
+    return names
+
+def render_previews(decks, output_dir, workers=DEFAULT_WORKERS, timeout=DEFAULT_TIMEOUT,
+                    retries=DEFAULT_RETRIES, thumb_width=DEFAULT_THUMB_WIDTH, thumbnails=True,
+                    backend="auto", base_port=DEFAULT_BASE_PORT, force=False):
+    """
+    Converts decks (paths) to PDFs and thumbnails under output_dir across a converter pool.
+    Returns one result dict per deck, in input order.
+    """
+    backend, make_converter = converter_factory(backend, base_port)
+    pdftoppm = None
+    if thumbnails:
+        pdftoppm = shutil.which("pdftoppm")
+        if pdftoppm is None:
+            raise ConverterError("pdftoppm (poppler-utils) is needed for thumbnails; "
+                                 "install it or pass --no-thumbnails")
+    os.makedirs(output_dir, exist_ok=True)
+    options = {"output_dir": output_dir, "timeout": timeout, "retries": retries,
+               "thumb_width": thumb_width, "pdftoppm": pdftoppm, "force": force}
+
+    jobs = queue.Queue()
+    for index, (path, name) in enumerate(zip(decks, preview_names(decks))):
+        jobs.put((index, path, name))
+    results = [None] * len(decks)
+    threads = [threading.Thread(target=_worker, args=(slot, make_converter, jobs, results, options))
+               for slot in range(max(1, min(workers, len(decks))))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for index, path in enumerate(decks):
+        if results[index] is None:
+            results[index] = {"deck": path, "pdf": None, "thumbnails": [], "ok": False,
+                              "error": f"no {backend} converter could be started", "attempts": 0,
+                              "skipped": False, "seconds": 0.0}
+    return results
+
+def find_decks(inputs):
+    """.pptx paths from files and directories, skipping Office lock files (~$name.pptx)"""
+    decks = []
+    for item in inputs:
+        paths = sorted(glob.glob(os.path.join(item, "*.pptx"))) if os.path.isdir(item) else [item]
+        decks.extend(p for p in paths if not os.path.basename(p).startswith("~$"))
+    return decks
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render decks to PDF and PNG thumbnails for review.")
+    parser.add_argument("inputs", nargs="+", help=".pptx files or directories of them")
+    parser.add_argument("-o", "--output-dir", default=os.path.join(os.getcwd(), "previews"))
+    parser.add_argument("-j", "--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Seconds per conversion")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES)
+    parser.add_argument("--thumb-width", type=int, default=DEFAULT_THUMB_WIDTH)
+    parser.add_argument("--no-thumbnails", action="store_true", help="PDFs only")
+    parser.add_argument("--backend", choices=("auto", "unoserver", "soffice"), default="auto")
+    parser.add_argument("--base-port", type=int, default=DEFAULT_BASE_PORT)
+    parser.add_argument("--force", action="store_true", help="Re-render decks whose PDF is up to date")
+    parser.add_argument("--report", help="Write per-deck results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    decks = find_decks(args.inputs)
+    if not decks:
+        print("No .pptx files found")
+        return 1
+    start = time.perf_counter()
+    try:
+        results = render_previews(decks, args.output_dir, args.workers, args.timeout, args.retries,
+                                  args.thumb_width, not args.no_thumbnails, args.backend,
+                                  args.base_port, args.force)
+    except ConverterError as e:
+        print(f"Cannot render previews: {e}")
+        return 2
+    elapsed = time.perf_counter() - start
+
+    failed = [r for r in results if not r["ok"]]
+    for r in failed:
+        print(f"  FAILED {r['deck']}: {r['error']}")
+    converted = sum(1 for r in results if r["ok"] and not r["skipped"])
+    rate = converted / elapsed * 60 if elapsed else 0.0
+    print(f"Previewed {len(results) - len(failed)}/{len(results)} decks into {args.output_dir} "
+          f"in {elapsed:.1f}s ({rate:.1f} decks/min, {len(results) - len(failed) - converted} up to date)")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0 if not failed else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""
+Opt-in profiling hooks for the builder pipeline.
+
+The builders, theme styling, text fitting, layout planning and save steps are wrapped
+with profiled() / stage(). While profiling is off (the default) a hook costs one global
+lookup. enable() installs a Tracer that records, per stage, wall time, the net change
+in tracemalloc's traced memory and call counts. Slides are recorded as "slide.<type>"
+and whole decks as "deck" stages, so time can be broken down per stage, per slide type
+and per deck.
+
+    tracer = profiling.enable()
+    prs = render_spec(spec)
+    with profiling.stage("save"):
+        prs.save(path)
+    profiling.disable()
+    tracer.write_trace("trace.json")   # chrome://tracing or https://ui.perfetto.dev
+    print(tracer.format_summary())
+
+Memory and time are inclusive: a stage's figures include its nested stages. tracemalloc
+slows Python down noticeably, so use memory=False when only timings matter.
+
+    python profiling.py specs/2025_year_end_summary.json -o trace.json
+"""
+import argparse
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+_tracer = None
+
+class Tracer:
+    """Chrome trace events plus per-stage [calls, seconds, net allocated bytes]"""
+
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.events = []
+        self.stats = {}
+        self._started_tracemalloc = False
+
+    def start(self):
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def stop(self):
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def begin(self):
+        mem = tracemalloc.get_traced_memory()[0] if self.memory else 0
+        return time.perf_counter_ns(), mem
+
+    def end(self, name, token, cat="stage", args=None, trace=True):
+        start_ns, start_mem = token
+        elapsed_ns = time.perf_counter_ns() - start_ns
+        alloc = tracemalloc.get_traced_memory()[0] - start_mem if self.memory else 0
+
+        stat = self.stats.get(name)
+        if stat is None:
+            stat = self.stats[name] = [0, 0.0, 0]
+        stat[0] += 1
+        stat[1] += elapsed_ns / 1e9
+        stat[2] += alloc
+        if trace:
+            event_args = dict(args or {})
+            if self.memory:
+                event_args["alloc_kb"] = round(alloc / 1024, 1)
+            self.events.append({"name": name, "cat": cat, "ph": "X", "ts": start_ns / 1000,
+                                "dur": elapsed_ns / 1000, "pid": os.getpid(),
+                                "tid": threading.get_native_id(), "args": event_args})
+
+    # --- Combining runs (e.g. from batch worker processes) ---
+    def export(self):
+        """Plain data, picklable across processes"""
+        return {"events": self.events, "stats": self.stats}
+
+    def merge(self, data):
+        self.events.extend(data["events"])
+        for name, (calls, seconds, alloc) in data["stats"].items():
+            stat = self.stats.setdefault(name, [0, 0.0, 0])
+            stat[0] += calls
+            stat[1] += seconds
+            stat[2] += alloc
+
+    # --- Output ---
+    def write_trace(self, path):
+        """Chrome trace-event JSON (one process row per worker)"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+
+    def summary(self):
+        """[(stage, calls, total s, mean ms, net alloc KB)], slowest first"""
+        rows = [(name, calls, seconds, seconds / calls * 1000, alloc / 1024)
+                for name, (calls, seconds, alloc) in self.stats.items()]
+        return sorted(rows, key=lambda row: row[2], reverse=True)
+
+    def format_summary(self):
+        lines = [f"{'stage':<28} {'calls':>8} {'total s':>10} {'mean ms':>10}"
+                 + (f" {'alloc KB':>11}" if self.memory else "")]
+        for name, calls, seconds, mean_ms, alloc_kb in self.summary():
+            lines.append(f"{name:<28} {calls:>8} {seconds:>10.3f} {mean_ms:>10.3f}"
+                         + (f" {alloc_kb:>11.1f}" if self.memory else ""))
+        decks = [e for e in self.events if e["cat"] == "deck"]
+        if decks:
+            lines.append("")
+            lines.append(f"{'deck':<40} {'slides':>8} {'seconds':>10}")
+            for e in sorted(decks, key=lambda e: e["dur"], reverse=True):
+                lines.append(f"{e['args'].get('deck', '?'):<40} {e['args'].get('slides', ''):>8} "
+                             f"{e['dur'] / 1e6:>10.3f}")
+        return "\n".join(lines)
+
+def enable(memory=True):
+    """Starts recording into a new Tracer and returns it"""
+    global _tracer
+    _tracer = Tracer(memory)
+    _tracer.start()
+    return _tracer
+
+def disable():
+    """Stops recording; returns the Tracer that was active (or None)"""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None:
+        tracer.stop()
+    return tracer
+
+@contextmanager
+def stage(name, cat="stage", **args):
+    """Records the with-block as one stage; args go into the trace event"""
+    tracer = _tracer
+    if tracer is None:
+        yield
+        return
+    token = tracer.begin()
+    try:
+        yield
+    finally:
+        tracer.end(name, token, cat, args)
+
+def profiled(name=None, trace=True):
+    """
+    Decorator recording every call as a stage (default name: the function's).
+    trace=False keeps only the aggregate numbers, for hot helpers called per paragraph.
+    """
+    def decorate(fn):
+        stage_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            tracer = _tracer
+            if tracer is None:
+                return fn(*args, **kwargs)
+            token = tracer.begin()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                tracer.end(stage_name, token, trace=trace)
+        return wrapper
+    return decorate
+
+# --- CLI: profile one deck build ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render one content spec with profiling on.")
+    parser.add_argument("spec", help="Content spec (see content_spec.py)")
+    parser.add_argument("-o", "--trace", default=os.path.join(os.getcwd(), "trace.json"),
+                        help="Chrome trace-event JSON output")
+    parser.add_argument("--output", help="Save the deck here (default: the spec's output name)")
+    parser.add_argument("--stamped", action="store_true", help="Render via the prototype cache")
+    parser.add_argument("--no-memory", action="store_true", help="Skip tracemalloc (timings only)")
+    args = parser.parse_args(argv)
+
+    from content_spec import load_spec
+    from generate_ppt_styled import render_spec
+    from slide_templates import render_spec_stamped
+
+    spec = load_spec(args.spec)
+    output_path = args.output or os.path.join(os.getcwd(), spec.get("output", "deck.pptx"))
+    tracer = enable(memory=not args.no_memory)
+    try:
+        with stage("deck", cat="deck", deck=os.path.basename(output_path), slides=len(spec["slides"])):
+            prs = (render_spec_stamped if args.stamped else render_spec)(spec)
+            with stage("save"):
+                prs.save(output_path)
+    finally:
+        disable()
+
+    print(tracer.format_summary())
+    tracer.write_trace(args.trace)
+    print(f"Trace written to {args.trace}")
+    return 0
+
+if __name__ == "__main__":
+    # Run main() from the importable module so it shares the hooks' global tracer
+    from profiling import main
+    sys.exit(main())
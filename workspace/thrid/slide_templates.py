@@ -0,0 +1,176 @@
+"""
+Prototype cache for the styled slide archetypes.
+
+The first time a slide shape is needed (e.g. a project slide with 3 content bullets,
+2 insights and 2 "label：value" metrics) the regular builder runs once on a scratch
+presentation with placeholder text. The resulting shape tree is kept as an lxml
+prototype, and every later slide of the same shape is a deep copy with only the
+a:t text nodes filled in. Output is identical to calling the builder directly.
+"""
+import copy
+import re
+import sys
+import time
+
+from pptx.oxml.ns import qn
+
+from content_spec import DEFAULT_SLIDE_SIZE
+from generate_ppt_styled import SLIDE_BUILDERS, create_presentation
+from images import prefetch_images
+from layout_plan import plan_slides
+from profiling import profiled, stage
+from text_fit import fit_slide
+from theme import DEFAULT_THEME
+
+BLANK_LAYOUT = 6
+
+# Placeholder text is built from private-use characters that never occur in real content
+_SENTINEL = "\ue000{}\ue001"
+_SENTINEL_RE = re.compile("\ue000(\\d+)\ue001")
+# Characters python-pptx rewrites when assigning text; such values go through the builder
+_UNSAFE_RE = re.compile("[\x00-\x08\x0b-\x1f]")
+
+# Spec fields the builders branch on rather than print
+_LITERAL_KEYS = {"type", "metrics_display"}
+# Slides that own parts of their own (a chart, an image) cannot be cloned from a shape tree
+_UNSTAMPABLE_TYPES = {"chart"}
+
+_prototypes = {}
+
+class _Unstampable(Exception):
+    pass
+
+def _sentinelize(value, values):
+    """
+    Replaces every text leaf of a slide spec with numbered placeholders.
+    Leading indentation and the first "：" are kept literally, because the builders
+    branch on them (sub-entries in the directory, label/value metrics).
+    """
+    if isinstance(value, dict):
+        return {k: (v if k in _LITERAL_KEYS else _sentinelize(v, values)) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_sentinelize(v, values) for v in value]
+    if not isinstance(value, str):
+        return value
+
+    if _UNSAFE_RE.search(value):
+        raise _Unstampable()
+    body = value.lstrip(" ")
+    indent = value[:len(value) - len(body)]
+    parts = []
+    for part in body.split("：", 1):
+        if not part:
+            raise _Unstampable()  # Empty text produces a different run structure
+        parts.append(_SENTINEL.format(len(values)))
+        values.append(part)
+    return indent + "：".join(parts)
+
+@profiled()
+def _build_prototype(sentinel_spec, width, height, theme):
+    prs = create_presentation()
+    prs.slide_width, prs.slide_height = width, height
+    SLIDE_BUILDERS[sentinel_spec["type"]](prs, sentinel_spec, theme)
+    sp_tree = prs.slides[0].shapes._spTree
+
+    # Position (in document order) of every a:t holding placeholders, and whether it is
+    # nothing but one placeholder (only those may take multi-line values)
+    slots = []
+    for i, t in enumerate(sp_tree.iter(qn("a:t"))):
+        if t.text and _SENTINEL_RE.search(t.text):
+            whole = _SENTINEL_RE.fullmatch(t.text)
+            slots.append((i, t.text, int(whole.group(1)) if whole else None))
+    return list(sp_tree), slots
+
+def _get_prototype(prs, sentinel_spec, theme):
+    key = (prs.slide_width, prs.slide_height, theme, repr(sentinel_spec))
+    proto = _prototypes.get(key)
+    if proto is None:
+        proto = _prototypes[key] = _build_prototype(sentinel_spec, prs.slide_width, prs.slide_height, theme)
+    return proto
+
+def _fill(t, template, values):
+    text = _SENTINEL_RE.sub(lambda m: values[int(m.group(1))], template)
+    lines = text.replace("\v", "\n").split("\n")
+    t.text = lines[0]
+    # Same structure python-pptx writes for "\n": a:br followed by a bare run
+    anchor = t.getparent()
+    for line in lines[1:]:
+        br = anchor.makeelement(qn("a:br"), {})
+        r = anchor.makeelement(qn("a:r"), {})
+        r.append(r.makeelement(qn("a:t"), {}))
+        r[0].text = line
+        anchor.addnext(br)
+        br.addnext(r)
+        anchor = r
+
+def stamp_slide(prs, slide_spec, theme=DEFAULT_THEME):
+    """Adds one slide for slide_spec, cloned from the cached prototype when possible"""
+    _stamp(prs, slide_spec, theme)
+    # Prototypes hold placeholder text, so fitting happens on every stamped copy
+    fit_slide(prs.slides[-1], prs.slide_height)
+
+def _stamp(prs, slide_spec, theme):
+    if slide_spec["type"] in _UNSTAMPABLE_TYPES or slide_spec.get("image"):
+        SLIDE_BUILDERS[slide_spec["type"]](prs, slide_spec, theme)
+        return
+    values = []
+    try:
+        sentinel_spec = _sentinelize(slide_spec, values)
+    except _Unstampable:
+        SLIDE_BUILDERS[slide_spec["type"]](prs, slide_spec, theme)
+        return
+
+    proto_children, slots = _get_prototype(prs, sentinel_spec, theme)
+    if any(whole is None and "\n" in _SENTINEL_RE.sub(lambda m: values[int(m.group(1))], template)
+           for _, template, whole in slots):
+        SLIDE_BUILDERS[slide_spec["type"]](prs, slide_spec, theme)
+        return
+
+    slide = prs.slides.add_slide(prs.slide_layouts[BLANK_LAYOUT])
+    sp_tree = slide.shapes._spTree
+    for child in list(sp_tree):
+        sp_tree.remove(child)
+    for child in proto_children:
+        sp_tree.append(copy.deepcopy(child))
+
+    text_nodes = list(sp_tree.iter(qn("a:t")))
+    for index, template, _ in slots:
+        _fill(text_nodes[index], template, values)
+
+def render_spec_stamped(spec, prs=None, theme=DEFAULT_THEME):
+    """render_spec() equivalent that stamps slides from the prototype cache"""
+    if prs is None:
+        prs = create_presentation(spec.get("slide_size", DEFAULT_SLIDE_SIZE))
+    slides = plan_slides(spec["slides"], prs.slide_width, prs.slide_height, theme)
+    prefetch_images(slides, prs.slide_width, prs.slide_height)
+    for slide in slides:
+        with stage("slide." + slide["type"]):
+            stamp_slide(prs, slide, theme)
+    return prs
+
+def benchmark(spec, rounds=20):
+    """Per-slide build cost: shape-by-shape builders vs. prototype stamping"""
+    slides = len(spec["slides"]) * rounds
+    results = {}
+    for label, build in (("builders", SLIDE_BUILDERS), ("stamped", None)):
+        prs = create_presentation()
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for slide in spec["slides"]:
+                if build is None:
+                    stamp_slide(prs, slide)
+                else:
+                    build[slide["type"]](prs, slide)
+        results[label] = (time.perf_counter() - start) / slides * 1000
+    return results
+
+if __name__ == "__main__":
+    from content_spec import load_spec
+    from generate_ppt_styled import DEFAULT_SPEC
+
+    spec = load_spec(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_SPEC)
+    stamp_slide(create_presentation(), spec["slides"][0])  # Warm up imports
+    results = benchmark(spec)
+    for label, ms in results.items():
+        print(f"{label:>9}: {ms:.3f} ms/slide")
+    print(f"  speedup: {results['builders'] / results['stamped']:.1f}x")
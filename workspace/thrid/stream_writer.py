@@ -0,0 +1,227 @@
+"""
+Streaming PPTX output.
+
+prs.save() keeps every slide part in memory until the end. StreamingDeckWriter renders
+each slide on a skeleton presentation, writes the slide part (and any media/chart parts
+it references) straight into the zip, then drops the slide from the skeleton. The
+presentation part, its relationships and [Content_Types].xml are written at close, so
+memory stays flat however many slides the deck has. A path is written to a temporary
+file next to it and renamed at close, so a deck that fails halfway leaves nothing behind.
+
+    with StreamingDeckWriter("rollup.pptx") as writer:
+        for slide_spec in slide_specs:
+            writer.add_slide(slide_spec)
+"""
+import hashlib
+import io
+import os
+import posixpath
+import sys
+import zipfile
+
+from lxml import etree
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.packuri import PackURI
+
+from content_spec import DEFAULT_SLIDE_SIZE
+from generate_ppt_styled import create_presentation
+from images import prefetch_images
+from layout_plan import plan_slides
+from pptx_parts import rels_path
+from profiling import profiled, stage
+from slide_templates import stamp_slide
+
+NS_P = "http://schemas.openxmlformats.org/presentationml/2006/main"
+NS_R = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+NS_RELS = "http://schemas.openxmlformats.org/package/2006/relationships"
+NS_CT = "http://schemas.openxmlformats.org/package/2006/content-types"
+CT_SLIDE = "application/vnd.openxmlformats-officedocument.presentationml.slide+xml"
+
+# Parts the writer regenerates at close instead of copying from the skeleton
+_GENERATED = ("[Content_Types].xml", "ppt/presentation.xml", "ppt/_rels/presentation.xml.rels")
+
+def rels_xml(rels):
+    """Serializes (rId, reltype, target, is_external) tuples as a .rels part"""
+    root = etree.Element(f"{{{NS_RELS}}}Relationships", nsmap={None: NS_RELS})
+    for rId, reltype, target, external in rels:
+        rel = etree.SubElement(root, f"{{{NS_RELS}}}Relationship", Id=rId, Type=reltype, Target=target)
+        if external:
+            rel.set("TargetMode", "External")
+    return etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+def add_content_type_overrides(ct_blob, overrides):
+    """Returns [Content_Types].xml with an Override per (partname, content_type) added"""
+    root = etree.fromstring(ct_blob)
+    for partname, content_type in overrides:
+        etree.SubElement(root, f"{{{NS_CT}}}Override", PartName="/" + partname, ContentType=content_type)
+    return etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+def add_presentation_slides(pres_blob, pres_rels_blob, slide_partnames):
+    """
+    Returns (presentation.xml, presentation.xml.rels) listing slide_partnames in order.
+    Existing slide entries, if any, are kept ahead of the new ones.
+    """
+    rels = etree.fromstring(pres_rels_blob)
+    used = {rel.get("Id") for rel in rels}
+    pres = etree.fromstring(pres_blob)
+    sld_id_lst = pres.find(f"{{{NS_P}}}sldIdLst")
+    if sld_id_lst is None:
+        # Schema order: sldMasterIdLst, notesMasterIdLst?, handoutMasterIdLst?, sldIdLst
+        anchor = pres.find(f"{{{NS_P}}}sldMasterIdLst")
+        for tag in ("notesMasterIdLst", "handoutMasterIdLst"):
+            found = pres.find(f"{{{NS_P}}}{tag}")
+            if found is not None:
+                anchor = found
+        sld_id_lst = etree.Element(f"{{{NS_P}}}sldIdLst")
+        anchor.addnext(sld_id_lst)
+
+    next_id = max([int(e.get("id")) for e in sld_id_lst] + [255]) + 1
+    next_rid = 1
+    for partname in slide_partnames:
+        while f"rId{next_rid}" in used:
+            next_rid += 1
+        rId = f"rId{next_rid}"
+        used.add(rId)
+        target = posixpath.relpath(partname, "ppt")
+        etree.SubElement(rels, f"{{{NS_RELS}}}Relationship", Id=rId, Type=RT.SLIDE, Target=target)
+        sld_id = etree.SubElement(sld_id_lst, f"{{{NS_P}}}sldId", id=str(next_id))
+        sld_id.set(f"{{{NS_R}}}id", rId)
+        next_id += 1
+
+    return (etree.tostring(pres, xml_declaration=True, encoding="UTF-8", standalone=True),
+            etree.tostring(rels, xml_declaration=True, encoding="UTF-8", standalone=True))
+
+class StreamingDeckWriter:
+    """Writes slides to a .pptx as they are produced; see the module docstring"""
+
+    def __init__(self, output_path, prs=None, build_slide=stamp_slide):
+        self._prs = prs if prs is not None else create_presentation()
+        self._build_slide = build_slide
+        # File objects (e.g. a BytesIO for part_store) are written directly
+        self._output_path = output_path if isinstance(output_path, (str, os.PathLike)) else None
+        self._tmp_path = f"{os.fspath(output_path)}.{os.getpid()}.tmp" if self._output_path is not None else None
+        self._zip = zipfile.ZipFile(self._tmp_path or output_path, "w", zipfile.ZIP_DEFLATED)
+        self._slides = []        # Zip partnames of written slides, in order
+        self._overrides = []     # (partname, content type) for every part written so far
+        self._written = {}       # Content hash -> partname, so shared media is stored once
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._discard()
+
+    def _discard(self):
+        """Closes the zip after a failure and removes the partial file"""
+        try:
+            self._zip.close()
+        finally:
+            if self._tmp_path is not None and os.path.exists(self._tmp_path):
+                os.remove(self._tmp_path)
+
+    @property
+    def slide_count(self):
+        return len(self._slides)
+
+    @property
+    def slide_width(self):
+        return self._prs.slide_width
+
+    @property
+    def slide_height(self):
+        return self._prs.slide_height
+
+    def add_slide(self, slide_spec):
+        """Renders one slide spec and flushes it to the zip"""
+        with stage("slide." + slide_spec["type"]):
+            self._build_slide(self._prs, slide_spec)
+        slides = self._prs.slides
+        sld_id = slides._sldIdLst[-1]
+        slide_part = self._prs.part.related_part(sld_id.rId)
+
+        partname = f"ppt/slides/slide{len(self._slides) + 1}.xml"
+        with stage("save"):
+            self._write_part(slide_part, partname)
+        self._slides.append(partname)
+
+        # Forget the slide so its part can be garbage collected
+        slides._sldIdLst.remove(sld_id)
+        self._prs.part.drop_rel(sld_id.rId)
+
+    def _write_part(self, part, partname):
+        self._zip.writestr(partname, part.blob)
+        self._overrides.append((partname, part.content_type))
+
+        rels = []
+        for rel in part.rels.values():
+            if rel.is_external:
+                rels.append((rel.rId, rel.reltype, rel.target_ref, True))
+                continue
+            target = rel.target_part
+            if rel.reltype in (RT.SLIDE_LAYOUT, RT.NOTES_MASTER):
+                # Template parts live in the skeleton and are written once at close
+                target_name = target.partname.lstrip("/")
+            else:
+                target_name = self._write_related(target)
+            rels.append((rel.rId, rel.reltype,
+                         PackURI("/" + target_name).relative_ref(PackURI("/" + partname).baseURI), False))
+        if rels:  # Media parts have no relationships, so no empty .rels beside them
+            self._zip.writestr(rels_path(partname), rels_xml(rels))
+
+    def _write_related(self, part):
+        """Writes a media/chart/embedding part once per distinct content; returns its zip name"""
+        digest = hashlib.sha1(part.blob).hexdigest()
+        if digest not in self._written:
+            directory, name = posixpath.split(part.partname.lstrip("/"))
+            stem, ext = posixpath.splitext(name)
+            # Skeleton partnames are reused after every dropped slide; the hash keeps them unique
+            self._written[digest] = f"{directory}/{stem}_{digest[:12]}{ext}"
+            self._write_part(part, self._written[digest])
+        return self._written[digest]
+
+    @profiled("save")
+    def close(self):
+        """Writes the skeleton parts, presentation part and content types; closes the zip"""
+        try:
+            self._finish()
+        except BaseException:
+            self._discard()
+            raise
+        if self._tmp_path is not None:
+            os.replace(self._tmp_path, self._output_path)
+
+    def _finish(self):
+        buf = io.BytesIO()
+        self._prs.save(buf)
+        with zipfile.ZipFile(buf) as skeleton:
+            for info in skeleton.infolist():
+                if info.filename not in _GENERATED:
+                    self._zip.writestr(info, skeleton.read(info.filename))
+            pres, pres_rels = add_presentation_slides(skeleton.read("ppt/presentation.xml"),
+                                                      skeleton.read("ppt/_rels/presentation.xml.rels"),
+                                                      self._slides)
+            content_types = add_content_type_overrides(skeleton.read("[Content_Types].xml"), self._overrides)
+        self._zip.writestr("ppt/presentation.xml", pres)
+        self._zip.writestr("ppt/_rels/presentation.xml.rels", pres_rels)
+        self._zip.writestr("[Content_Types].xml", content_types)
+        self._zip.close()
+
+def stream_spec(spec, output_path):
+    """Streams a whole content spec to output_path; returns the slide count"""
+    prs = create_presentation(spec.get("slide_size", DEFAULT_SLIDE_SIZE))
+    with StreamingDeckWriter(output_path, prs) as writer:
+        slides = plan_slides(spec["slides"], writer.slide_width, writer.slide_height)
+        prefetch_images(slides, writer.slide_width, writer.slide_height)
+        for slide_spec in slides:
+            writer.add_slide(slide_spec)
+    return writer.slide_count
+
+if __name__ == "__main__":
+    from content_spec import load_spec
+
+    spec = load_spec(sys.argv[1])
+    output_path = sys.argv[2] if len(sys.argv) > 2 else spec.get("output", "deck.pptx")
+    print(f"Streamed {stream_spec(spec, output_path)} slides to {output_path}")
@@ -0,0 +1,214 @@
+"""
+Turns a year-end summary dump (text or .docx) into a content spec.
+
+The source documents number their projects ("1. vCube平台：构建统一协作底座") and split
+each project into parts such as 工作量 / 实现内容 / 核心价值 / 量化收益. Some dumps keep
+one paragraph per line, others (full_content_utf8.txt) lost every newline, so the parser
+does not rely on line breaks: a single precompiled tokenizer walks the text once, the
+text between tokens goes to the current part, and each project is emitted as soon as the
+next one starts. Metrics (versions, 人天, TB, 次 ...) come from one combined pattern run
+over each project's text.
+
+    python summary_parser.py 25年年终总结.docx temp_content.txt -o specs/
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from decimal import ROUND_HALF_UP, Decimal
+
+from content_spec import SPEC_VERSION, validate_spec
+from ingest import DEFAULT_CACHE_DIR, read_text
+
+MAX_CONTENT_ITEMS = 3
+MAX_INSIGHT_ITEMS = 2
+MAX_METRICS = 2
+
+# --- Patterns ---
+# Part names -> what the builders use them for
+PART_KINDS = {
+    "工作量": "workload",
+    "实现内容": "content",
+    "核心功能详细列举": "content",
+    "核心价值与量化收益": "benefit",
+    "核心价值": "insight",
+    "量化收益": "benefit",
+    "量化效益": "benefit",
+    "算法说明": "benefit",
+    "度量建议": "insight",
+}
+_PART_NAMES = "|".join(sorted(PART_KINDS, key=len, reverse=True))
+
+# One alternation, so the text is scanned once:
+#   doc      "--- 25年年终总结.docx ---" separators of multi-file dumps
+#   chapter  "一、 概述" / "二、 各模块工作详述" (ends the current project)
+#   project  "1. vCube平台：构建统一协作底座", only when a part heading follows
+#   part     "实现内容：" ("核心价值与量化收益" is written without a colon)
+TOKEN_RE = re.compile(
+    r"(?P<doc>^---[^\n]*---$)"
+    r"|(?P<chapter>[一二三四五六七八九十]+、)"
+    r"|(?<![0-9A-Za-z.,])(?P<number>\d{1,2})\.(?!\d)\s*(?P<name>[^：:。\n]{1,30}?)"
+    r"(?:[：:](?P<subtitle>[^。\n]{0,60}?))?(?=\s*(?:" + _PART_NAMES + r")[：:]?)"
+    r"|(?P<part>" + _PART_NAMES + r")(?:[：:]|(?<=核心价值与量化收益))",
+    re.M,
+)
+
+_NUM = r"\d[\d,]*(?:\.\d+)?"
+# Metric kind -> (label, value format); the pattern below has one group per kind
+METRIC_LABELS = {
+    "days": ("节省人天", "{}人天"),
+    "tb": ("数据规模", "{} TB"),
+    "times": ("使用次数", "{}次"),
+    "cases": ("风险事件", "{}起"),
+    "scale": ("业务收益", "{}"),
+    "percent": ("关键指标", "{}"),
+    "versions": ("版本迭代", "{}个版本"),
+}
+METRIC_RE = re.compile(
+    rf"(?P<days>{_NUM})\s*(?:人天|个工作日)"
+    rf"|(?P<tb>{_NUM})\s*TB"
+    rf"|(?P<versions>\d+)\s*个版本"
+    rf"|(?P<times>{_NUM})\s*次"
+    rf"|(?P<cases>{_NUM})\s*起"
+    rf"|(?P<scale>[千百]万级|亿级)"
+    rf"|(?P<percent>[>＞~约]?\d+(?:\.\d+)?%)"
+)
+
+_SENTENCE_RE = re.compile(r"[^。；;\n]+")
+
+# --- Project assembly ---
+def _number(value):
+    return float(value.replace(",", ""))
+
+def _format_number(value):
+    """Source figure with at most one decimal ("140.625" -> "140.6"), keeping thousands separators"""
+    if "." in value and len(value.rsplit(".", 1)[1]) > 1:
+        return f"{Decimal(value.replace(',', '')).quantize(Decimal('0.1'), ROUND_HALF_UP):,}"
+    return value
+
+def extract_metrics(text, limit=MAX_METRICS):
+    """"label：value" strings for the biggest figure of each metric kind, in METRIC_LABELS order"""
+    best = {}
+    for match in METRIC_RE.finditer(text):
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind in ("scale", "percent"):
+            best.setdefault(kind, value)  # Not comparable; keep the first one
+        elif kind not in best or _number(value) > _number(best[kind]):
+            best[kind] = value
+    metrics = []
+    for kind, (label, fmt) in METRIC_LABELS.items():
+        if kind in best:
+            value = best[kind] if kind in ("scale", "percent") else _format_number(best[kind])
+            metrics.append(f"{label}：{fmt.format(value)}")
+    return metrics[:limit]
+
+def _sentences(text):
+    for match in _SENTENCE_RE.finditer(text):
+        sentence = match.group().strip(" ，,*")
+        if len(sentence) >= 6:  # Drops stray fragments such as "2版本"
+            yield sentence
+
+class _Project:
+    def __init__(self, name, subtitle):
+        self.title = name.strip()
+        self.subtitle = (subtitle or "").strip()
+        self.parts = {"workload": [], "content": [], "insight": [], "benefit": []}
+        self.kind = "content"  # Text before the first part heading counts as content
+
+    def add(self, text):
+        if text.strip():
+            self.parts[self.kind].append(text)
+
+    def to_slide(self):
+        content = [s for text in self.parts["content"] for s in _sentences(text)]
+        insights = [s for text in self.parts["insight"] for s in _sentences(text)]
+        if self.subtitle:
+            insights.insert(0, f"核心价值：{self.subtitle}")
+        if not content:
+            content = [s for text in self.parts["benefit"] for s in _sentences(text)]
+        all_text = "".join(t for texts in self.parts.values() for t in texts)
+        return {
+            "type": "project",
+            "title": self.title,
+            "work_content": content[:MAX_CONTENT_ITEMS],
+            "work_insights": insights[:MAX_INSIGHT_ITEMS],
+            "key_metrics": extract_metrics(all_text),
+        }
+
+def iter_project_slides(text):
+    """Yields a project slide spec per numbered project section, in document order"""
+    project = None
+    pos = 0
+    for match in TOKEN_RE.finditer(text):
+        if project is not None:
+            project.add(text[pos:match.start()])
+        pos = match.end()
+        kind = match.lastgroup
+        if kind == "part":
+            if project is not None:
+                project.kind = PART_KINDS[match.group("part")]
+            continue
+        # A new project, chapter or document closes the current project
+        if project is not None:
+            yield project.to_slide()
+            project = None
+        if match.group("number") is not None:
+            project = _Project(match.group("name"), match.group("subtitle"))
+    if project is not None:
+        project.add(text[pos:])
+        yield project.to_slide()
+
+def directory_content(project_slides):
+    return ["01. 年度工作总结"] + [f"    1.{i} {s['title']}" for i, s in enumerate(project_slides, 1)]
+
+def parse_summary(path, cache_dir=DEFAULT_CACHE_DIR):
+    """Content spec (directory slide + one project slide per section) for a summary dump"""
+    projects = list(iter_project_slides(read_text(path, cache_dir)))
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return validate_spec({
+        "version": SPEC_VERSION,
+        "output": f"{stem}.pptx",
+        "slides": [{"type": "directory", "content": directory_content(projects)}] + projects,
+    })
+
+def _convert(args):
+    path, output_dir, cache_dir = args
+    try:
+        spec = parse_summary(path, cache_dir)
+    except (OSError, ValueError) as e:
+        return path, None, f"{type(e).__name__}: {e}"
+    out_path = os.path.join(output_dir, os.path.splitext(os.path.basename(path))[0] + ".json")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(spec, f, ensure_ascii=False, indent=2)
+    return path, len(spec["slides"]) - 1, None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert summary dumps (.txt/.docx) into content specs.")
+    parser.add_argument("inputs", nargs="+")
+    parser.add_argument("-o", "--output-dir", default="specs")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    jobs = [(path, args.output_dir, args.cache_dir) for path in args.inputs]
+    if args.workers <= 1 or len(jobs) == 1:
+        results = [_convert(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(_convert, jobs, chunksize=16))
+    failed = 0
+    for path, count, error in results:
+        if error:
+            failed += 1
+            print(f"  FAILED {path}: {error}")
+        elif not count:
+            print(f"  {path}: no numbered project sections found")
+    print(f"Converted {len(jobs) - failed}/{len(jobs)} summaries into {args.output_dir}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,443 @@
+"""
+Text measurement and auto-shrink for fixed-size text boxes.
+
+Advance widths are kept in one array('H') per (Latin font, East Asian font, bold) with
+an entry per BMP code point, in 1/1000 em. They come from the font files when fontTools
+and the fonts (HarmonyOS Sans SC / Inter) are installed, otherwise from a
+metric-compatible fallback: full-width CJK, Arial/Helvetica widths for ASCII widened
+to Inter's proportions. A paragraph's widths are summed with accumulate() and line
+breaks are found with bisect(), so measuring costs a few C-level passes per paragraph.
+
+fit_shapes() checks every text shape of a slide against its box (and the slide
+bottom) and scales the font sizes down just enough for the text to fit. It runs after
+the builders and after prototype stamping, and works on any deck:
+
+    python text_fit.py deck.pptx            # report overflowing shapes
+    python text_fit.py deck.pptx -o out.pptx
+"""
+import argparse
+import os
+import sys
+import zipfile
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
+from functools import lru_cache
+from itertools import accumulate
+
+from lxml import etree
+
+from profiling import profiled
+from pptx_parts import NS, slide_partnames, slide_size, top_level_shapes
+
+try:
+    from fontTools.ttLib import TTFont
+except ImportError:
+    TTFont = None
+
+A = "{%s}" % NS["a"]
+P = "{%s}" % NS["p"]
+
+EMU_PER_PT = 12700
+DEFAULT_SIZE = 1800               # a:rPr@sz when nothing sets it (1/100 pt)
+LINE_HEIGHT = 1.2                 # Single line spacing as a multiple of the font size
+LEVEL_INDENT = 457200             # marL per outline level in the default text styles
+DEFAULT_INSETS = (91440, 45720, 91440, 45720)   # bodyPr l/t/r/b insets
+MIN_SCALE = 0.6
+SCALE_STEP = 0.05
+FIT_TOLERANCE = 50                # 1/100 pt; boxes sized exactly to one line must still fit
+
+# --- Glyph metrics ---
+FONT_DIRS = [
+    os.path.join(os.environ.get("WINDIR", r"C:\Windows"), "Fonts"),
+    os.path.join(os.environ.get("LOCALAPPDATA", ""), "Microsoft", "Windows", "Fonts"),
+    "/Library/Fonts",
+    os.path.expanduser("~/Library/Fonts"),
+    "/usr/share/fonts",
+    os.path.expanduser("~/.fonts"),
+    os.path.expanduser("~/.local/share/fonts"),
+]
+FONT_EXTENSIONS = (".ttf", ".otf", ".ttc")
+
+# Arial/Helvetica advance widths for U+0020..U+007E
+_ASCII_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+LATIN_FALLBACK_SCALE = 1.07       # Inter sets about 7% wider than Arial
+BOLD_LATIN_SCALE = 1.06
+# Full-width blocks: CJK radicals..Yi, Hangul syllables, compatibility ideographs,
+# vertical/compatibility forms, full-width forms
+_FULL_WIDTH = [(0x2E80, 0xA4CF), (0xAC00, 0xD7AF), (0xF900, 0xFAFF), (0xFE30, 0xFE4F), (0xFF00, 0xFF60)]
+_LATIN_END = 0x2E80               # Code points below are drawn with the Latin font
+
+@lru_cache(maxsize=None)
+def find_font(family):
+    """Path of an installed font file whose name matches family, or None"""
+    key = family.lower().replace(" ", "")
+    for directory in FONT_DIRS:
+        if not os.path.isdir(directory):
+            continue
+        for root, _, files in os.walk(directory):
+            for name in sorted(files):
+                stem, ext = os.path.splitext(name.lower())
+                if ext in FONT_EXTENSIONS and stem.replace("_", "").replace("-", "").startswith(key) \
+                        and "bold" not in stem and "italic" not in stem:
+                    return os.path.join(root, name)
+    return None
+
+def _font_widths(family):
+    """{code point: advance in 1/1000 em} read with fontTools, or None"""
+    path = find_font(family) if TTFont is not None and family else None
+    if path is None:
+        return None
+    try:
+        font = TTFont(path, lazy=True, fontNumber=0)
+        units = font["head"].unitsPerEm
+        hmtx = font["hmtx"].metrics
+        return {cp: round(hmtx[glyph][0] * 1000 / units)
+                for cp, glyph in font.getBestCmap().items() if cp < 0x10000 and glyph in hmtx}
+    except Exception:
+        return None  # Unreadable font file; the fallback table is close enough
+
+@lru_cache(maxsize=None)
+def _fallback_table():
+    table = array("H", [556]) * 0x10000
+    for cp in range(0x300, 0x370):
+        table[cp] = 0  # Combining marks
+    for start, end in _FULL_WIDTH:
+        table[start:end + 1] = array("H", [1000]) * (end + 1 - start)
+    table[0xFF61:0xFFDD] = array("H", [500]) * (0xFFDD - 0xFF61)
+    for i, width in enumerate(_ASCII_WIDTHS):
+        table[0x20 + i] = round(width * LATIN_FALLBACK_SCALE)
+    table[0x09] = table[0x20] * 4
+    table[0x0B] = 0
+    return table
+
+@lru_cache(maxsize=None)
+def glyph_widths(latin_font, ea_font, bold=False):
+    """array('H') of BMP advance widths (1/1000 em) for text set in latin_font / ea_font"""
+    table = array("H", _fallback_table())
+    ea = _font_widths(ea_font)
+    if ea:
+        for cp, width in ea.items():
+            table[cp] = width
+    latin = _font_widths(latin_font)
+    if latin:
+        for cp, width in latin.items():
+            if cp < _LATIN_END:
+                table[cp] = width
+    if bold:
+        for cp in range(_LATIN_END):
+            table[cp] = min(0xFFFF, round(table[cp] * BOLD_LATIN_SCALE))
+    return table
+
+def _advances(text, table):
+    """Advance widths of text in 1/1000 em (code points outside the BMP count as full width)"""
+    if text.isascii() or max(text) < "\U00010000":
+        return map(table.__getitem__, map(ord, text))
+    return (table[cp] if cp < 0x10000 else 1000 for cp in map(ord, text))
+
+# --- Line breaking ---
+_NO_LINE_START = set("，。、；：！？）》」』】〉”’,.;:!?)]}%")
+
+def _is_word_char(ch):
+    return ch.isascii() and (ch.isalnum() or ch in "-_'")
+
+def wrap_count(text, cum, width):
+    """
+    Lines needed for text whose cumulative advances are cum, in a line width of the same
+    unit. Latin words move to the next line whole; closing punctuation stays with the
+    character before it.
+    """
+    n = len(text)
+    if n == 0:
+        return 1
+    lines, start, base = 0, 0, 0
+    while start < n:
+        end = bisect_right(cum, base + width, start)
+        if end <= start:
+            end = start + 1  # A single glyph wider than the line
+        elif end < n:
+            if _is_word_char(text[end]) and _is_word_char(text[end - 1]):
+                space = text.rfind(" ", start, end)
+                if space > start:
+                    end = space + 1
+            elif text[end] in _NO_LINE_START and end - 1 > start:
+                end -= 1
+        lines += 1
+        base = cum[end - 1]
+        start = end
+    return lines
+
+# --- Text body measurement ---
+Run = namedtuple("Run", ["text", "size", "table"])
+
+def _font_attrs(rpr, default):
+    """(size, bold, latin, ea) of an a:rPr/a:defRPr, falling back to default"""
+    if rpr is None:
+        return default
+    size, bold, latin, ea = default
+    if rpr.get("sz"):
+        size = int(rpr.get("sz"))
+    if rpr.get("b") is not None:
+        bold = rpr.get("b") in ("1", "true")
+    latin_el = rpr.find(A + "latin")
+    if latin_el is not None:
+        latin = latin_el.get("typeface")
+    ea_el = rpr.find(A + "ea")
+    # Theme.apply() stores the East Asian typeface as an a:ea attribute on the run
+    ea = ea_el.get("typeface") if ea_el is not None else rpr.get(A + "ea", ea)
+    return size, bold, latin, ea
+
+def _paragraph_runs(p, default):
+    """(segments, spacing): segments is a list of lines split at a:br, each a list of Runs"""
+    ppr = p.find(A + "pPr")
+    para = _font_attrs(ppr.find(A + "defRPr") if ppr is not None else None, default)
+    segments = [[]]
+    for child in p:
+        if child.tag in (A + "r", A + "fld"):
+            size, bold, latin, ea = _font_attrs(child.find(A + "rPr"), para)
+            t = child.find(A + "t")
+            if t is not None and t.text:
+                segments[-1].append(Run(t.text, size, glyph_widths(latin, ea, bold)))
+        elif child.tag == A + "br":
+            segments.append([])
+    if not any(segments):
+        end = p.find(A + "endParaRPr")
+        segments = [[Run("", _font_attrs(end, para)[0], None)]]
+    return segments, para[0]
+
+def _spacing(ppr, size):
+    """(space before, space after, line spacing factor) in 1/100 pt for an a:pPr"""
+    if ppr is None:
+        return 0, 0, 1.0
+    result = []
+    for tag in ("spcBef", "spcAft"):
+        el = ppr.find(f"{A}{tag}")
+        value = 0
+        if el is not None:
+            pts, pct = el.find(A + "spcPts"), el.find(A + "spcPct")
+            if pts is not None:
+                value = int(pts.get("val"))
+            elif pct is not None:
+                value = size * int(pct.get("val")) / 100000
+        result.append(value)
+    ln = ppr.find(f"{A}lnSpc/{A}spcPct")
+    result.append(int(ln.get("val")) / 100000 if ln is not None else 1.0)
+    return tuple(result)
+
+def _sized(sz, scale):
+    """Font size after scaling, rounded down to half points like PowerPoint's shrink"""
+    return sz if scale == 1 else max(100, int(sz * scale) // 50 * 50)
+
+def text_height(tx_body, width, scale=1.0, wrap=True):
+    """
+    Height in 1/100 pt of a p:txBody laid out in width EMU with font sizes scaled by
+    scale; None when wrap is off and a line is wider than the box.
+    """
+    default = (DEFAULT_SIZE, False, None, None)
+    width_pt100 = width * 100 / EMU_PER_PT
+    total = 0
+    for p in tx_body.iterfind(A + "p"):
+        ppr = p.find(A + "pPr")
+        segments, para_size = _paragraph_runs(p, default)
+        indent = 0
+        if ppr is not None:
+            indent = int(ppr.get("marL", int(ppr.get("lvl", 0)) * LEVEL_INDENT)) + max(0, int(ppr.get("indent", 0)))
+        line_width = (width_pt100 - indent * 100 / EMU_PER_PT) * 1000
+        before, after, line_factor = _spacing(ppr, _sized(para_size, scale))
+
+        lines, biggest = 0, 0
+        for runs in segments:
+            text = "".join(run.text for run in runs)
+            cum = list(accumulate(_sized(run.size, scale) * w
+                                  for run in runs if run.text for w in _advances(run.text, run.table)))
+            if not wrap:
+                if cum and cum[-1] > line_width:
+                    return None
+                lines += 1
+            else:
+                lines += wrap_count(text, cum, line_width)
+            biggest = max([biggest] + [_sized(run.size, scale) for run in runs])
+        total += lines * biggest * LINE_HEIGHT * line_factor + (before + after) * scale
+    return total
+
+def line_count(text, size, width, latin_font=None, ea_font=None, bold=False):
+    """Wrapped lines of plain text set at size (1/100 pt) in width EMU; "\\n" forces a break"""
+    table = glyph_widths(latin_font, ea_font, bold)
+    line_width = width * 100 / EMU_PER_PT * 1000
+    return sum(wrap_count(segment, list(accumulate(size * w for w in _advances(segment, table))), line_width)
+               for segment in text.replace("\v", "\n").split("\n"))
+
+def line_height(size):
+    """Height in EMU of one single-spaced line at size (1/100 pt)"""
+    return size * LINE_HEIGHT * EMU_PER_PT / 100
+
+# --- Fitting ---
+FitResult = namedtuple("FitResult", ["name", "scale", "fits"])
+
+def _box(sp, slide_height):
+    """(text width, available text height) in EMU for a p:sp, or None without geometry"""
+    xfrm = sp.find(f"{P}spPr/{A}xfrm")
+    ext = xfrm.find(A + "ext") if xfrm is not None else None
+    if ext is None:
+        return None
+    off = xfrm.find(A + "off")
+    top = int(off.get("y")) if off is not None else 0
+    cx, cy = int(ext.get("cx")), int(ext.get("cy"))
+    body_pr = sp.find(f"{P}txBody/{A}bodyPr")
+    l, t, r, b = (int(body_pr.get(attr, default)) if body_pr is not None else default
+                  for attr, default in zip(("lIns", "tIns", "rIns", "bIns"), DEFAULT_INSETS))
+    bottom = top + cy if slide_height is None else min(top + cy, slide_height)
+    return cx - l - r, bottom - top - t - b
+
+def _fits(tx_body, width, height, scale, wrap):
+    needed = text_height(tx_body, width, scale, wrap)
+    return needed is not None and needed <= height * 100 / EMU_PER_PT + FIT_TOLERANCE
+
+def _apply_scale(tx_body, scale):
+    """Writes the scaled size on every run, inherited sizes included"""
+    for p in tx_body.iterfind(A + "p"):
+        def_rpr = p.find(f"{A}pPr/{A}defRPr")
+        para_size = int(def_rpr.get("sz", DEFAULT_SIZE)) if def_rpr is not None else DEFAULT_SIZE
+        if def_rpr is not None and def_rpr.get("sz"):
+            def_rpr.set("sz", str(_sized(para_size, scale)))
+        has_runs = False
+        for run in p.iterfind(A + "*"):
+            if run.tag not in (A + "r", A + "fld"):
+                continue
+            has_runs = True
+            rpr = run.find(A + "rPr")
+            if rpr is None:
+                rpr = etree.Element(A + "rPr")
+                run.insert(0, rpr)
+            rpr.set("sz", str(_sized(int(rpr.get("sz", para_size)), scale)))
+        end = p.find(A + "endParaRPr")
+        if end is None and not has_runs:
+            end = etree.SubElement(p, A + "endParaRPr")  # Empty paragraphs still take up a line
+        if end is not None:
+            end.set("sz", str(_sized(int(end.get("sz", para_size)), scale)))
+    for el in tx_body.iter(A + "spcPts"):
+        el.set("val", str(int(int(el.get("val")) * scale)))
+
+def _choose_scale(tx_body, width, height, min_scale):
+    """(scale, fits) for a text body; scale 1.0 when it already fits"""
+    body_pr = tx_body.find(A + "bodyPr")
+    wrap = body_pr is None or body_pr.get("wrap") != "none"
+    if _fits(tx_body, width, height, 1.0, wrap):
+        return 1.0, True
+    if not _fits(tx_body, width, height, min_scale, wrap):
+        return min_scale, False
+    # Largest scale on the SCALE_STEP grid that fits (height only grows with scale)
+    scales = [min_scale + i * SCALE_STEP for i in range(int(round((1.0 - min_scale) / SCALE_STEP)))]
+    lo, hi = 0, len(scales) - 1
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if _fits(tx_body, width, height, scales[mid], wrap):
+            lo = mid
+        else:
+            hi = mid - 1
+    return scales[lo], True
+
+# Serialized text body + box -> (scale, fits). Headers, labels and stamped slides repeat
+# the same boxes over and over, so most shapes of a bulk run are decided by one lookup.
+_decisions = {}
+_MAX_DECISIONS = 4096
+
+def fit_shape(sp, slide_height=None, min_scale=MIN_SCALE):
+    """
+    Shrinks the text of one p:sp until it fits its box; returns a FitResult, or None when
+    the shape has no text or already fits.
+    """
+    tx_body = sp.find(P + "txBody")
+    if tx_body is None:
+        return None
+    box = _box(sp, slide_height)
+    if box is None:
+        return None
+    key = (etree.tostring(tx_body), box, min_scale)
+    decision = _decisions.get(key)
+    if decision is None:
+        if not "".join(tx_body.itertext()).strip():
+            decision = (1.0, True)
+        else:
+            decision = _choose_scale(tx_body, box[0], box[1], min_scale)
+        if len(_decisions) >= _MAX_DECISIONS:
+            _decisions.clear()
+        _decisions[key] = decision
+    scale, fits = decision
+    if scale == 1.0:
+        return None
+    _apply_scale(tx_body, scale)
+    name = sp.find(f"{P}nvSpPr/{P}cNvPr")
+    return FitResult(name.get("name") if name is not None else None, round(scale, 2), fits)
+
+def fit_shapes(shapes, slide_height=None, min_scale=MIN_SCALE):
+    """fit_shape() over the p:sp elements of shapes; returns the FitResults of changed shapes"""
+    results = []
+    for sp in shapes:
+        if sp.tag == P + "sp":
+            result = fit_shape(sp, slide_height, min_scale)
+            if result is not None:
+                results.append(result)
+    return results
+
+@profiled()
+def fit_slide(slide, slide_height=None):
+    """fit_shapes() for a python-pptx slide"""
+    return fit_shapes(list(slide.shapes._spTree), slide_height)
+
+def fit_deck(deck_path, output_path=None, min_scale=MIN_SCALE):
+    """
+    Fits every slide of a .pptx; returns [(slide number, FitResult)]. The package is
+    only rewritten when output_path is given.
+    """
+    report, dirty = [], {}
+    with zipfile.ZipFile(deck_path) as src:
+        slide_height = slide_size(src)[1]
+        for number, partname in enumerate(slide_partnames(src), 1):
+            root = etree.fromstring(src.read(partname))
+            results = fit_shapes(top_level_shapes(root), slide_height, min_scale)
+            if results:
+                dirty[partname] = root
+                report.extend((number, r) for r in results)
+        if output_path and dirty:
+            tmp_path = output_path + ".tmp"
+            with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as dst:
+                for info in src.infolist():
+                    if info.filename in dirty:
+                        blob = etree.tostring(dirty[info.filename], xml_declaration=True,
+                                              encoding="UTF-8", standalone=True)
+                    else:
+                        blob = src.read(info.filename)
+                    dst.writestr(info, blob)
+    if output_path and dirty:
+        os.replace(tmp_path, output_path)
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shrink overflowing text to fit its boxes.")
+    parser.add_argument("decks", nargs="+")
+    parser.add_argument("-o", "--output", help="Output path (single deck only)")
+    parser.add_argument("--in-place", action="store_true", help="Rewrite the decks themselves")
+    parser.add_argument("--min-scale", type=float, default=MIN_SCALE)
+    args = parser.parse_args(argv)
+    if args.output and len(args.decks) > 1:
+        parser.error("-o takes a single deck; use --in-place for several")
+
+    overflowing = 0
+    for deck in args.decks:
+        output = deck if args.in_place else args.output
+        for number, result in fit_deck(deck, output, args.min_scale):
+            status = f"shrunk to {result.scale:.0%}" if result.fits else "STILL OVERFLOWS"
+            overflowing += not result.fits
+            print(f"  {deck} slide {number} {result.name}: {status}")
+    return 1 if overflowing else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
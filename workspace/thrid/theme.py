@@ -0,0 +1,109 @@
+"""
+Brand themes: colors, fonts and the named text styles the builders use.
+
+set_font() used to go through python-pptx's font proxies for every paragraph (size,
+bold, color, Latin face, then the East Asian face on the first run), rebuilding the
+same few elements each time. A Theme compiles every named style once into the two
+elements set_font produced, the paragraph's a:defRPr and the run's a:rPr, and apply()
+attaches deep copies of them. The XML is the same as before, so existing decks, slide
+caches and text_fit keep working.
+
+Themes are plain objects, so decks in different brand themes can be rendered side by
+side in one process:
+
+    DEFAULT_THEME.apply(p, "metric_value")
+    Theme("partner", dict(DEFAULT_THEME.colors, primary=RGBColor(0, 120, 80))).apply(p, "title")
+"""
+import copy
+from collections import namedtuple
+
+from pptx.dml.color import RGBColor
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls, qn
+from pptx.util import Pt
+
+from profiling import profiled
+
+# size: Length; color: a key of Theme.colors
+TextStyle = namedtuple("TextStyle", ["size", "bold", "color"])
+
+STYLES = {
+    "title": TextStyle(Pt(28), True, "primary"),
+    "section_header": TextStyle(Pt(18), True, "primary"),
+    "section_header_accent": TextStyle(Pt(18), True, "accent"),
+    "column_header": TextStyle(Pt(16), True, "primary"),
+    "body": TextStyle(Pt(16), False, "text"),
+    "insight": TextStyle(Pt(14), False, "text"),
+    "metric_label": TextStyle(Pt(12), False, "text_light"),
+    "metric_value": TextStyle(Pt(22), True, "accent"),
+    "metric": TextStyle(Pt(14), True, "accent"),
+    "problem_title": TextStyle(Pt(14), True, "accent"),
+    "problem_desc": TextStyle(Pt(12), False, "text"),
+    "solution": TextStyle(Pt(13), True, "primary"),
+    "plan_header": TextStyle(Pt(18), True, "inverse"),
+    "plan_sub": TextStyle(Pt(14), True, "text"),
+    "plan_detail": TextStyle(Pt(12), False, "text_light"),
+    "directory_entry": TextStyle(Pt(20), True, "text"),
+    "directory_sub_entry": TextStyle(Pt(16), False, "text"),
+}
+
+DEFAULT_COLORS = {
+    "primary": RGBColor(0, 80, 158),       # Corporate Blue
+    "accent": RGBColor(220, 50, 50),       # Highlight Red
+    "text": RGBColor(50, 50, 50),          # Dark Grey
+    "text_light": RGBColor(100, 100, 100), # Lighter Grey
+    "inverse": RGBColor(255, 255, 255),    # Text on primary fills
+    "surface": RGBColor(245, 247, 250),    # Very light blue/grey for boxes
+}
+
+# East Asian typeface, stored as an a:ea attribute on the run (as set_font always did)
+_EA = qn("a:ea")
+
+class Theme:
+    """Colors, Latin / East Asian fonts and compiled text styles of one brand"""
+
+    def __init__(self, name, colors=DEFAULT_COLORS, font_latin="Inter", font_ea="HarmonyOS Sans SC",
+                 styles=STYLES):
+        self.name = name
+        self.colors = dict(colors)
+        self.font_latin = font_latin
+        self.font_ea = font_ea
+        self.styles = dict(styles)
+        self._compiled = {}
+
+    def color(self, key):
+        return self.colors[key]
+
+    def _compile(self, name, size):
+        style = self.styles[name]
+        size = style.size if size is None else size
+        def_rpr = parse_xml(f'<a:defRPr {nsdecls("a")}><a:solidFill><a:srgbClr/></a:solidFill>'
+                            f'<a:latin/></a:defRPr>')
+        def_rpr.set("sz", str(round(size.pt * 100)))
+        def_rpr.set("b", "1" if style.bold else "0")
+        def_rpr[0][0].set("val", str(self.colors[style.color]))
+        def_rpr[1].set("typeface", self.font_latin)
+        r_pr = parse_xml(f'<a:rPr {nsdecls("a")}/>')
+        r_pr.set(_EA, self.font_ea)
+        return def_rpr, r_pr
+
+    @profiled("theme.apply", trace=False)
+    def apply(self, paragraph, name, size=None):
+        """Gives paragraph the named style; size overrides the style's own size"""
+        key = (name, size)
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            compiled = self._compiled[key] = self._compile(name, size)
+        def_rpr, r_pr = compiled
+
+        pPr = paragraph._p.get_or_add_pPr()
+        pPr._remove_defRPr()
+        pPr._insert_defRPr(copy.deepcopy(def_rpr))
+
+        r = paragraph.runs[0]._r if paragraph.runs else paragraph.add_run()._r
+        if r.rPr is None:
+            r._insert_rPr(copy.deepcopy(r_pr))
+        else:
+            r.rPr.set(_EA, self.font_ea)
+
+DEFAULT_THEME = Theme("default")